@@ -0,0 +1,126 @@
+"""Benchmarks of the bar's startup and event handling, for regression checks.
+
+The bar runs against a fake Hyprland, with a throwaway cache directory. It still
+needs a display and a session bus, so run it from the repository root inside a
+headless compositor and a private bus, for example:
+
+    dbus-run-session -- cage -- python -m benchmarks --output results.json
+
+and compare a later run to it, failing when a measure regressed:
+
+    python -m benchmarks --baseline results.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_hyprland import FakeHyprland
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "--output",
+        default="benchmark-results.json",
+        help="file the results are written to",
+    )
+    parser.add_argument(
+        "--baseline",
+        help="results of a previous run, exits with 1 if a measure regressed",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="relative slowdown allowed against the baseline",
+    )
+    parser.add_argument(
+        "--hours",
+        type=float,
+        default=1,
+        help="simulated hours of activity for the memory growth run",
+    )
+    return parser.parse_args()
+
+
+def flatten(results: dict, prefix: str = "") -> dict[str, float]:
+    """Return the measures of nested results by their dotted path."""
+    measures = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            measures.update(flatten(value, f"{path}."))
+        elif isinstance(value, int | float):
+            measures[path] = value
+    return measures
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """List the durations and memory growths that exceed the baseline."""
+    current = flatten(results)
+    found = []
+    for path, previous in flatten(baseline).items():
+        # Only lower-is-better measures are gated
+        if not path.endswith(("_ms", "growth_mb")) or path not in current:
+            continue
+        # Sub-millisecond timings are mostly noise
+        if current[path] > max(previous, 1) * (1 + tolerance):
+            found.append(f"{path}: {previous:.2f} -> {current[path]:.2f}")
+    return found
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    args = parse_args()
+
+    # Caches, notifications and sockets stay out of the user's directories
+    root = tempfile.mkdtemp(prefix="tsumiki-benchmarks-")
+    os.environ["XDG_CACHE_HOME"] = os.path.join(root, "cache")
+    os.environ["XDG_STATE_HOME"] = os.path.join(root, "state")
+
+    hyprland = FakeHyprland(os.path.join(root, "runtime"))
+    os.environ.update(hyprland.environment)
+
+    # Only imported now, as the paths above are read on import
+    from benchmarks.suite import Suite
+    from utils.config import widget_config
+
+    results = Suite(hyprland, widget_config, args.hours).run()
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+        found = regressions(results, baseline["results"], args.tolerance)
+        for regression in found:
+            print(f"Regression: {regression}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
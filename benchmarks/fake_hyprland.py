@@ -0,0 +1,181 @@
+import json
+import os
+import socket
+import threading
+
+# Window classes given to synthetic windows, so lookups hit and miss apps
+WINDOW_CLASSES = (
+    "firefox",
+    "kitty",
+    "org.gnome.Nautilus",
+    "code",
+    "discord",
+    "spotify",
+    "thunderbird",
+    "unknown-app",
+)
+
+MONITOR = {
+    "id": 0,
+    "name": "HEADLESS-1",
+    "x": 0,
+    "y": 0,
+    "width": 1920,
+    "height": 1080,
+    "transform": 0,
+    "focused": True,
+    "activeWorkspace": {"id": 1, "name": "1"},
+    "reserved": [0, 32, 0, 0],
+}
+
+
+def make_client(index: int) -> dict:
+    """Return a window as listed by `j/clients`, spread over ten workspaces."""
+    workspace = index % 10 + 1
+    column = index // 10 % 4
+    return {
+        "address": f"0x{0x1000 + index:x}",
+        "mapped": True,
+        "hidden": False,
+        "at": [column * 480, 32],
+        "size": [480, 1048],
+        "workspace": {"id": workspace, "name": str(workspace)},
+        "floating": False,
+        "fullscreen": 0,
+        "monitor": 0,
+        "class": WINDOW_CLASSES[index % len(WINDOW_CLASSES)],
+        "initialClass": WINDOW_CLASSES[index % len(WINDOW_CLASSES)],
+        "title": f"Window {index}",
+        "initialTitle": f"Window {index}",
+        "pid": 1000 + index,
+    }
+
+
+class FakeHyprland:
+    """A Hyprland instance answering on its two sockets, without a compositor.
+
+    The command socket replies to the json requests widgets make and accepts any
+    dispatch. Events are written to every client of the event socket with `emit`.
+    """
+
+    def __init__(self, runtime_dir: str, signature: str = "benchmark"):
+        self.signature = signature
+        self.directory = os.path.join(runtime_dir, "hypr", signature)
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.clients: list[dict] = []
+        self.active_address = ""
+        self.requests = 0
+
+        self._lock = threading.Lock()
+        self._listeners: list[socket.socket] = []
+
+        self._commands = self._listen(".socket.sock", self._serve_command)
+        self._events = self._listen(".socket2.sock", self._serve_events)
+
+    @property
+    def environment(self) -> dict[str, str]:
+        """Variables pointing Hyprland clients at this instance."""
+        return {
+            "HYPRLAND_INSTANCE_SIGNATURE": self.signature,
+            "XDG_RUNTIME_DIR": os.path.dirname(os.path.dirname(self.directory)),
+        }
+
+    def set_windows(self, count: int):
+        with self._lock:
+            self.clients = [make_client(index) for index in range(count)]
+            self.active_address = self.clients[0]["address"] if self.clients else ""
+
+    def open_window(self, index: int) -> dict:
+        client = make_client(index)
+        with self._lock:
+            self.clients.append(client)
+        self.emit("openwindow", f"{client['address'][2:]},1,{client['class']},x")
+        return client
+
+    def close_window(self, address: str):
+        with self._lock:
+            self.clients = [c for c in self.clients if c["address"] != address]
+        self.emit("closewindow", address[2:])
+
+    def retitle_window(self, address: str, title: str):
+        with self._lock:
+            for client in self.clients:
+                if client["address"] == address:
+                    client["title"] = title
+        self.emit("windowtitlev2", f"{address[2:]},{title}")
+
+    def focus_window(self, address: str):
+        with self._lock:
+            self.active_address = address
+        self.emit("activewindowv2", address[2:])
+
+    def emit(self, event: str, data: str):
+        message = f"{event}>>{data}\n".encode()
+        for listener in list(self._listeners):
+            try:
+                listener.sendall(message)
+            except OSError:
+                self._listeners.remove(listener)
+
+    def _listen(self, name: str, serve) -> socket.socket:
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(os.path.join(self.directory, name))
+        server.listen()
+        threading.Thread(target=serve, args=(server,), daemon=True).start()
+        return server
+
+    def _serve_events(self, server: socket.socket):
+        while True:
+            connection, _ = server.accept()
+            self._listeners.append(connection)
+
+    def _serve_command(self, server: socket.socket):
+        while True:
+            connection, _ = server.accept()
+            with connection:
+                request = connection.recv(65536).decode()
+                self.requests += 1
+                connection.sendall(self._reply(request).encode())
+
+    def _reply(self, request: str) -> str:
+        if request.startswith("[[BATCH]]"):
+            return "\n\n\n".join(
+                self._reply(command) for command in request[9:].split(";")
+            )
+
+        # Flags, like "j" for json, come before a "/"
+        command = request.partition(" ")[0].rpartition("/")[2]
+
+        with self._lock:
+            match command:
+                case "clients":
+                    return json.dumps(self.clients)
+                case "monitors":
+                    return json.dumps([MONITOR])
+                case "activewindow":
+                    return json.dumps(
+                        next(
+                            (
+                                client
+                                for client in self.clients
+                                if client["address"] == self.active_address
+                            ),
+                            {},
+                        )
+                    )
+                case "activeworkspace":
+                    return json.dumps({"id": 1, "name": "1", "monitor": "HEADLESS-1"})
+                case "workspaces":
+                    return json.dumps(
+                        [
+                            {"id": i, "name": str(i), "monitor": "HEADLESS-1"}
+                            for i in range(1, 11)
+                        ]
+                    )
+                case "devices":
+                    return json.dumps({"keyboards": []})
+                case "submap":
+                    return "default"
+                case _:
+                    return "ok"
@@ -0,0 +1,263 @@
+import statistics
+import time
+
+import psutil
+from gi.repository import Gio, GLib
+
+from benchmarks.fake_hyprland import FakeHyprland
+
+# Synthetic sessions the window benchmarks run with
+WINDOW_COUNTS = (10, 100, 500)
+
+# Size of the synthetic clipboard history
+CLIPHIST_ENTRIES = 10_000
+
+# Typed one character at a time, then searched from scratch
+CLIPHIST_QUERIES = ("entry 1234", "kitty", "zz-missing")
+
+# Activity simulated per minute in the memory run: window opened, focused,
+# retitled and closed
+ROUNDS_PER_MINUTE = 30
+
+
+def measure(function, repeat: int = 20) -> dict:
+    """Call a function a number of times, returns its durations in ms."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "min_ms": min(durations),
+        "median_ms": statistics.median(durations),
+        "max_ms": max(durations),
+    }
+
+
+def pump(duration: float = 0):
+    """Run the main loop until nothing is pending, and for at least `duration`."""
+    context = GLib.MainContext.default()
+    deadline = time.monotonic() + duration
+    while context.pending() or time.monotonic() < deadline:
+        context.iteration(False)
+
+
+def pump_until(condition, timeout: float = 5):
+    """Run the main loop until `condition` returns True, or `timeout` passed."""
+    context = GLib.MainContext.default()
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        context.iteration(False)
+    pump()
+
+
+def sync(state):
+    """Read the windows again, waiting for the reply to be applied."""
+    synced = []
+    handler = state.connect("changed", lambda *_: synced.append(True))
+    state._sync()
+    pump_until(lambda: synced)
+    state.disconnect(handler)
+
+
+def rss_mb() -> float:
+    return psutil.Process().memory_info().rss / 1024**2
+
+
+class Suite:
+    """The benchmarks, sharing one fake Hyprland and the widgets they build."""
+
+    def __init__(self, hyprland: FakeHyprland, config: dict, hours: float):
+        self.hyprland = hyprland
+        self.config = config
+        self.hours = hours
+
+        self.dock = None
+        self.overview = None
+
+    def run(self) -> dict:
+        results = {}
+        for name, benchmark in (
+            ("statusbar", self.bench_statusbar),
+            ("windows", self.bench_windows),
+            ("notifications", self.bench_notifications),
+            ("cliphist", self.bench_cliphist),
+            ("memory", self.bench_memory),
+        ):
+            try:
+                results[name] = benchmark()
+            except Exception as e:
+                # A missing display or bus only skips what depends on it
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+
+        return results
+
+    def bench_statusbar(self) -> dict:
+        from modules.bar import StatusBar
+
+        start = time.perf_counter()
+        bar = StatusBar(self.config, profile=True)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        return {
+            "construction_ms": elapsed,
+            "widgets": {
+                name: {"import_ms": import_time * 1000, "init_ms": init_time * 1000}
+                for name, import_time, init_time in bar.startup_times
+            },
+        }
+
+    def bench_windows(self) -> dict:
+        from modules.dock import Dock
+        from services.hyprland_state import HyprlandStateService
+        from widgets.overview import OverviewMenu
+
+        state = HyprlandStateService()
+        self.dock = Dock(self.config)
+        self.overview = OverviewMenu()
+        pump_until(lambda: state.ready)
+
+        results = {}
+        for count in WINDOW_COUNTS:
+            self.hyprland.set_windows(0)
+            sync(state)
+
+            # Reading the new windows, and every widget following them
+            self.hyprland.set_windows(count)
+            start = time.perf_counter()
+            sync(state)
+            sync_ms = (time.perf_counter() - start) * 1000
+
+            results[str(count)] = {
+                "sync_ms": sync_ms,
+                "dock_update": measure(self.dock.update_dock),
+                "overview_update": measure(self.overview.update),
+            }
+
+        return results
+
+    def bench_notifications(self, count: int = 200) -> dict:
+        from services import notification_service
+
+        durations = self._cache_notifications()
+        start = time.perf_counter()
+        for index in range(count):
+            self._notify(index)
+
+        deadline = time.monotonic() + 30
+        while len(durations) < count and time.monotonic() < deadline:
+            pump()
+        elapsed = time.perf_counter() - start
+
+        notification_service.clear_all_notifications()
+
+        return {
+            "received": len(durations),
+            "per_second": len(durations) / elapsed,
+            "cache_median_ms": statistics.median(durations) if durations else None,
+            "cache_max_ms": max(durations, default=None),
+        }
+
+    def _cache_notifications(self) -> list[float]:
+        """Cache notifications as they are received, like the popups do.
+
+        Returns the list the duration of each caching is added to.
+        """
+        from services import notification_service
+
+        max_count = self.config["modules"]["notification"]["max_count"]
+        durations = []
+
+        def on_added(service, id):
+            notification = service.get_notification_from_id(id)
+            start = time.perf_counter()
+            service.cache_notification(self.config, notification, max_count)
+            durations.append((time.perf_counter() - start) * 1000)
+
+        notification_service.connect("notification-added", on_added)
+        return durations
+
+    def _notify(self, index: int):
+        # The service answers on the main loop, so it is called asynchronously
+        Gio.bus_get_sync(Gio.BusType.SESSION).call(
+            "org.freedesktop.Notifications",
+            "/org/freedesktop/Notifications",
+            "org.freedesktop.Notifications",
+            "Notify",
+            GLib.Variant(
+                "(susssasa{sv}i)",
+                ("benchmark", 0, "", f"Notification {index}", "Body", [], {}, -1),
+            ),
+            None,
+            Gio.DBusCallFlags.NONE,
+            -1,
+            None,
+            lambda *_: None,
+        )
+
+    def bench_cliphist(self) -> dict:
+        from services.cliphist import ClipHistoryService, ClipItem
+
+        service = ClipHistoryService()
+        pump(0.1)
+        service._set_items(
+            [
+                ClipItem(f"{index}\tclipboard entry {index} from kitty {index * 7}")
+                for index in range(CLIPHIST_ENTRIES, 0, -1)
+            ]
+        )
+
+        results = {}
+        for query in CLIPHIST_QUERIES:
+            service.search("")
+
+            def typing(query=query):
+                for end in range(1, len(query) + 1):
+                    service.search(query[:end])
+
+            def searching(query=query):
+                service.search("")
+                service.search(query)
+
+            results[query] = {
+                "typing": measure(typing, repeat=5),
+                "search": measure(searching),
+            }
+
+        return results
+
+    def bench_memory(self) -> dict:
+        minutes = int(self.hours * 60)
+        samples = [rss_mb()]
+        open_windows = []
+        opened = 0
+
+        for minute in range(minutes):
+            for index in range(ROUNDS_PER_MINUTE):
+                window = self.hyprland.open_window(10_000 + opened)
+                opened += 1
+                open_windows.append(window["address"])
+                self.hyprland.focus_window(window["address"])
+                self.hyprland.retitle_window(window["address"], f"Title {index}")
+                if len(open_windows) > 20:
+                    self.hyprland.close_window(open_windows.pop(0))
+                pump(0.001)
+
+            if minute % 10 == 0:
+                self._notify(minute)
+
+            if minute % 10 == 9:
+                samples.append(rss_mb())
+
+        pump(0.5)
+        samples.append(rss_mb())
+
+        return {
+            "simulated_minutes": minutes,
+            "windows_opened": opened,
+            "rss_start_mb": samples[0],
+            "rss_end_mb": samples[-1],
+            "growth_mb": samples[-1] - samples[0],
+            "samples_mb": samples,
+        }
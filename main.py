@@ -1,4 +1,6 @@
+import argparse
 import os
+import time
 
 import setproctitle
 from fabric import Application
@@ -41,15 +43,47 @@ if not general_options["debug"]:
         logger.disable(log)
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(prog=APPLICATION_NAME)
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="report the import and construction time of each bar widget",
+    )
+    parser.add_argument(
+        "--watchdog",
+        type=float,
+        nargs="?",
+        const=50,
+        metavar="MS",
+        help="log main loop stalls longer than MS (default: 50), "
+        "and callback timings on SIGUSR1",
+    )
+    return parser.parse_args()
+
+
 def main():
     """Main function to run the application."""
+    args = parse_args()
+
+    if args.watchdog is not None:
+        # Installed first, so that the widgets' callbacks are timed
+        from utils.watchdog import MainLoopWatchdog
+
+        MainLoopWatchdog(args.watchdog).install()
 
     helpers.ensure_directory(APP_CACHE_DIRECTORY)
     helpers.copy_theme(theme_config["name"])
     helpers.check_executable_exists("sass")
 
     # Create the status bar
-    bar = StatusBar(widget_config)
+    start = time.perf_counter()
+    bar = StatusBar(widget_config, profile=args.profile_startup)
+
+    if args.profile_startup:
+        elapsed = (time.perf_counter() - start) * 1000
+        logger.info(f"{Colors.INFO}[Main] Bar widgets startup:\n{bar.startup_report()}")
+        logger.info(f"{Colors.INFO}[Main] Status bar created in {elapsed:.1f} ms")
 
     windows = [bar]
 
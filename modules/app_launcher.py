@@ -1,19 +1,18 @@
-import operator
-from collections.abc import Iterator
 from enum import Enum
 from typing import Callable, Dict, Tuple
 
-from fabric.utils import DesktopApp, get_desktop_applications, idle_add, remove_handler
+from fabric.utils import DesktopApp
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.entry import Entry
 from fabric.widgets.image import Image
 from fabric.widgets.label import Label
-from fabric.widgets.scrolledwindow import ScrolledWindow
 from fabric.widgets.wayland import WaylandWindow as Window
 from gi.repository import Gdk
 
+from services.app_catalogue import AppCatalogueService
 from shared.buttons import HoverButton
+from shared.list import VirtualList
 from shared.tagentry import TagEntry
 
 
@@ -43,15 +42,14 @@ class AppLauncher(Window):
             all_visible=False,
             **kwargs,
         )
-        self._arranger_handler: int = 0
-        self._all_apps = get_desktop_applications()
+        # Applications are listed once, the catalogue reloads changed entries
+        self.catalogue = AppCatalogueService()
 
         self.connect("key-press-event", self._on_key_press)
 
         self._commands = {}
         self._command_handler = None
 
-        self.viewport = Box(spacing=2, orientation="v")
         self.search_entry = Entry(
             name="launcher-prompt",
             placeholder="Search Applications...",
@@ -63,10 +61,14 @@ class AppLauncher(Window):
             h_expand=True, placeholder="Tags", available_tags=["tag1", "tag2", "tag3"]
         )
 
-        self.scrolled_window = ScrolledWindow(
+        # Only the slots in view are created, and recycled while scrolling
+        self.viewport = VirtualList(
+            spacing=2,
+            row_height=self.config["icon_size"] + 8,
+            row_factory=self.bake_application_slot,
+            bind_row=self.bind_application_slot,
             min_content_size=(280, 320),
             max_content_size=(280 * 2, 320),
-            child=self.viewport,
         )
 
         self.add(
@@ -93,7 +95,7 @@ class AppLauncher(Window):
                     ),
                     # self.tag_entry,
                     # the actual slots holder
-                    self.scrolled_window,
+                    self.viewport,
                 ],
             )
         )
@@ -106,14 +108,6 @@ class AppLauncher(Window):
             self.destroy()
 
     def arrange_viewport(self, query: str = ""):
-        # reset everything so we can filter current viewport's slots...
-        # remove the old handler so we can avoid race conditions
-        remove_handler(self._arranger_handler) if self._arranger_handler else None
-
-        # remove all children from the viewport
-        self.viewport.children = []
-
-        # make a new iterator containing the filtered apps
         command = None
         prompt = ""
         try:
@@ -134,49 +128,24 @@ class AppLauncher(Window):
                 else:
                     ...
                 return False
-        filtered_apps_iter = iter(
-            [
-                app
-                for app in self._all_apps
-                if query.casefold()
-                in (
-                    (app.display_name or "")
-                    + (" " + app.name + " ")
-                    + (app.generic_name or "")
-                ).casefold()
-            ]
-        )
-        should_resize = operator.length_hint(filtered_apps_iter) == len(self._all_apps)
-
-        # all aboard...
-        # start the process of adding slots with a lazy executor
-        # using this method makes the process of adding slots way more less
-        # resource expensive without blocking the main thread and resulting in a lock
-        self._arranger_handler = idle_add(
-            lambda *args: self.add_next_application(*args)
-            or (self.resize_viewport() if should_resize else False),
-            filtered_apps_iter,
-            pin=True,
-        )
-
-        return False
-
-    def add_next_application(self, apps_iter: Iterator[DesktopApp]):
-        if not (app := next(apps_iter, None)):
-            return False
 
-        self.viewport.add(self.bake_application_slot(app))
-        return True
-
-    def resize_viewport(self):
-        self.scrolled_window.set_min_content_width(
-            self.viewport.get_allocation().width  # type: ignore
+        # only the visible slots are bound again when the filter changes
+        self.viewport.set_items(
+            app
+            for app in self.catalogue.apps
+            if query.casefold()
+            in (
+                (app.display_name or "")
+                + (" " + app.name + " ")
+                + (app.generic_name or "")
+            ).casefold()
         )
+
         return False
 
-    def bake_application_slot(self, app: DesktopApp, **kwargs) -> Button:
-        def on_clicked(*_):
-            app.launch()
+    def bake_application_slot(self) -> Button:
+        def on_clicked(button):
+            self.viewport.get_item(button).launch()
             self.hide()
             self.search_entry.set_text("")
 
@@ -186,22 +155,19 @@ class AppLauncher(Window):
                 orientation="h",
                 spacing=12,
                 children=[
-                    Image(
-                        pixbuf=app.get_icon_pixbuf(self.config["icon_size"]),
-                        h_align="start",
-                    ),
-                    Label(
-                        label=app.display_name or "Unknown",
-                        v_align="center",
-                        h_align="center",
-                    ),
+                    Image(h_align="start"),
+                    Label(v_align="center", h_align="center"),
                 ],
             ),
-            tooltip_text=app.description if self.config["tooltip"] else None,
             on_clicked=on_clicked,
-            **kwargs,
         )
 
+    def bind_application_slot(self, button: Button, app: DesktopApp, index: int):
+        image, label = button.get_child().get_children()
+        image.set_from_pixbuf(app.get_icon_pixbuf(self.config["icon_size"]))
+        label.set_label(app.display_name or "Unknown")
+        button.set_tooltip_text(app.description if self.config["tooltip"] else None)
+
     def set_commands(self, commands: Dict):
         self._commands = commands
 
@@ -211,7 +177,6 @@ class AppLauncher(Window):
     def toggle(self):
         if self.is_visible():
             return self.set_visible(False)
-        self._all_apps = get_desktop_applications()
         (self.search_entry.set_text(""),)
         self.search_entry.grab_focus_without_selecting()
         return self.set_visible(True)
@@ -1,3 +1,6 @@
+import time
+from functools import partial
+
 from fabric.utils import (
     exec_shell_command_async,
     get_relative_path,
@@ -7,97 +10,62 @@ from fabric.widgets.centerbox import CenterBox
 from fabric.widgets.wayland import WaylandWindow as Window
 
 from shared.widget_container import BaseWidget, WidgetGroup
-from widgets.battery import BatteryWidget
-from widgets.bluetooth import BlueToothWidget
-from widgets.brightness import BrightnessWidget
-from widgets.cava import CavaWidget
-from widgets.click_counter import ClickCounterWidget
-from widgets.cliphist import ClipHistoryWidget
-from widgets.datetime_menu import DateTimeWidget
-from widgets.emoji_picker import EmojiPickerWidget
-from widgets.hypridle import HyprIdleWidget
-from widgets.hyprpicker import HyprPickerWidget
-from widgets.hyprsunset import HyprSunsetWidget
-from widgets.kanban import KanbanWidget
-from widgets.keyboard_layout import KeyboardLayoutWidget
-from widgets.language import LanguageWidget
-from widgets.microphone import MicrophoneIndicatorWidget
-from widgets.mpris import MprisWidget
-from widgets.ocr import OCRWidget
-from widgets.overview import OverviewWidget
-from widgets.power_button import PowerWidget
-from widgets.quick_settings.quick_settings import QuickSettingsButtonWidget
-from widgets.recorder import RecorderWidget
-from widgets.screenshot import ScreenShotWidget
-from widgets.stats import (
-    CpuWidget,
-    GpuWidget,
-    MemoryWidget,
-    NetworkUsageWidget,
-    StorageWidget,
-)
-from widgets.stopwatch import StopWatchWidget
-from widgets.submap import SubMapWidget
-from widgets.system_tray import SystemTrayWidget
-from widgets.taskbar import TaskBarWidget
-from widgets.theme import ThemeSwitcherWidget
-from widgets.updates import UpdatesWidget
-from widgets.utility_widgets import DividerWidget, SpacingWidget
-from widgets.volume import VolumeWidget
-from widgets.weather import WeatherWidget
-from widgets.window_count import WindowCountWidget
-from widgets.window_title import WindowTitleWidget
-from widgets.workspaces import WorkSpacesWidget
-from widgets.world_clock import WorldClockWidget
+from utils.widget_utils import lazy_load_widget
+
+# Widget classes by name, only those used by the layout are imported
+WIDGETS = {
+    "battery": "widgets.battery.BatteryWidget",
+    "bluetooth": "widgets.bluetooth.BlueToothWidget",
+    "world_clock": "widgets.world_clock.WorldClockWidget",
+    "brightness": "widgets.brightness.BrightnessWidget",
+    "cava": "widgets.cava.CavaWidget",
+    "cliphist": "widgets.cliphist.ClipHistoryWidget",
+    "gpu": "widgets.stats.GpuWidget",
+    "kanban": "widgets.kanban.KanbanWidget",
+    "emoji_picker": "widgets.emoji_picker.EmojiPickerWidget",
+    "click_counter": "widgets.click_counter.ClickCounterWidget",
+    "cpu": "widgets.stats.CpuWidget",
+    "date_time": "widgets.datetime_menu.DateTimeWidget",
+    "hypridle": "widgets.hypridle.HyprIdleWidget",
+    "hyprpicker": "widgets.hyprpicker.HyprPickerWidget",
+    "hyprsunset": "widgets.hyprsunset.HyprSunsetWidget",
+    "keyboard": "widgets.keyboard_layout.KeyboardLayoutWidget",
+    "language": "widgets.language.LanguageWidget",
+    "memory": "widgets.stats.MemoryWidget",
+    "microphone": "widgets.microphone.MicrophoneIndicatorWidget",
+    "mpris": "widgets.mpris.MprisWidget",
+    "network_usage": "widgets.stats.NetworkUsageWidget",
+    "ocr": "widgets.ocr.OCRWidget",
+    "overview": "widgets.overview.OverviewWidget",
+    "power": "widgets.power_button.PowerWidget",
+    "recorder": "widgets.recorder.RecorderWidget",
+    "screenshot": "widgets.screenshot.ScreenShotWidget",
+    "storage": "widgets.stats.StorageWidget",
+    "system_tray": "widgets.system_tray.SystemTrayWidget",
+    "taskbar": "widgets.taskbar.TaskBarWidget",
+    "theme_switcher": "widgets.theme.ThemeSwitcherWidget",
+    "updates": "widgets.updates.UpdatesWidget",
+    "volume": "widgets.volume.VolumeWidget",
+    "submap": "widgets.submap.SubMapWidget",
+    "weather": "widgets.weather.WeatherWidget",
+    "window_title": "widgets.window_title.WindowTitleWidget",
+    "workspaces": "widgets.workspaces.WorkSpacesWidget",
+    "spacing": "widgets.utility_widgets.SpacingWidget",
+    "stopwatch": "widgets.stopwatch.StopWatchWidget",
+    "divider": "widgets.utility_widgets.DividerWidget",
+    "quick_settings": "widgets.quick_settings.quick_settings.QuickSettingsButtonWidget",
+    "window_count": "widgets.window_count.WindowCountWidget",
+}
 
 
 class StatusBar(Window, BaseWidget):
     """A widget to display the status bar panel."""
 
-    def __init__(self, config, **kwargs):
-        self.widgets_list = {
-            "battery": BatteryWidget,
-            "bluetooth": BlueToothWidget,
-            "world_clock": WorldClockWidget,
-            "brightness": BrightnessWidget,
-            "cava": CavaWidget,
-            "cliphist": ClipHistoryWidget,
-            "gpu": GpuWidget,
-            "kanban": KanbanWidget,
-            "emoji_picker": EmojiPickerWidget,
-            "click_counter": ClickCounterWidget,
-            "cpu": CpuWidget,
-            "date_time": DateTimeWidget,
-            "hypridle": HyprIdleWidget,
-            "hyprpicker": HyprPickerWidget,
-            "hyprsunset": HyprSunsetWidget,
-            "keyboard": KeyboardLayoutWidget,
-            "language": LanguageWidget,
-            "memory": MemoryWidget,
-            "microphone": MicrophoneIndicatorWidget,
-            "mpris": MprisWidget,
-            "network_usage": NetworkUsageWidget,
-            "ocr": OCRWidget,
-            "overview": OverviewWidget,
-            "power": PowerWidget,
-            "recorder": RecorderWidget,
-            "screenshot": ScreenShotWidget,
-            "storage": StorageWidget,
-            "system_tray": SystemTrayWidget,
-            "taskbar": TaskBarWidget,
-            "theme_switcher": ThemeSwitcherWidget,
-            "updates": UpdatesWidget,
-            "volume": VolumeWidget,
-            "submap": SubMapWidget,
-            "weather": WeatherWidget,
-            "window_title": WindowTitleWidget,
-            "workspaces": WorkSpacesWidget,
-            "spacing": SpacingWidget,
-            "stopwatch": StopWatchWidget,
-            "divider": DividerWidget,
-            "quick_settings": QuickSettingsButtonWidget,
-            "window_count": WindowCountWidget,
-        }
+    def __init__(self, config, profile: bool = False, **kwargs):
+        self.widgets_list = WIDGETS
+        self.profile = profile
+        # Import and construction seconds of each widget, when profiling
+        self.startup_times: list[tuple[str, float, float]] = []
 
         options = config["general"]
         bar_config = config["modules"]["bar"]
@@ -163,13 +131,45 @@ class StatusBar(Window, BaseWidget):
                     if group_config:
                         group = WidgetGroup.from_config(
                             group_config,
-                            self.widgets_list,
+                            {
+                                name: partial(self.make_widget, name)
+                                for name in group_config.get("widgets", [])
+                                if name in self.widgets_list
+                            },
                         )
                         layout[key].append(group)
                 else:
                     # Handle regular widgets
                     if widget_name in self.widgets_list:
-                        widget_class = self.widgets_list[widget_name]
-                        layout[key].append(widget_class())
+                        layout[key].append(self.make_widget(widget_name))
 
         return layout
+
+    def make_widget(self, widget_name):
+        """imports the widget's module on first use and creates the widget"""
+        start = time.perf_counter()
+        widget_class = lazy_load_widget(widget_name, self.widgets_list)
+        imported = time.perf_counter()
+        widget = widget_class()
+
+        if self.profile:
+            self.startup_times.append(
+                (widget_name, imported - start, time.perf_counter() - imported)
+            )
+
+        return widget
+
+    def startup_report(self) -> str:
+        """returns the import and construction time of each widget"""
+        lines = [f"{'widget':<20}{'import (ms)':>14}{'init (ms)':>14}"]
+        for widget_name, import_time, init_time in self.startup_times:
+            lines.append(
+                f"{widget_name:<20}{import_time * 1000:>14.1f}{init_time * 1000:>14.1f}"
+            )
+
+        import_total = sum(times[1] for times in self.startup_times)
+        init_total = sum(times[2] for times in self.startup_times)
+        lines.append(
+            f"{'total':<20}{import_total * 1000:>14.1f}{init_total * 1000:>14.1f}"
+        )
+        return "\n".join(lines)
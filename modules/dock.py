@@ -1,4 +1,3 @@
-import json
 import logging
 from typing import ClassVar
 
@@ -7,9 +6,7 @@ from fabric.utils import (
     bulk_connect,
     exec_shell_command_async,
     idle_add,
-    remove_handler,
 )
-from fabric.utils.helpers import get_desktop_applications
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.eventbox import EventBox
@@ -17,10 +14,13 @@ from fabric.widgets.image import Image
 from fabric.widgets.wayland import WaylandWindow as Window
 from gi.repository import Gdk, GLib
 
+from services.app_catalogue import AppCatalogueService, normalize_window_class
+from services.hyprland_ipc import HyprlandIPC
+from services.hyprland_state import HyprlandStateService
+from services.occlusion import OcclusionService
 from shared.widget_container import BaseWidget
 from utils.icon_resolver import IconResolver
 from utils.icons import symbolic_icons
-from utils.occlusion import check_occlusion
 
 
 class Dock(Window, BaseWidget):
@@ -28,14 +28,6 @@ class Dock(Window, BaseWidget):
 
     _instances: ClassVar[list] = []
 
-    def get_desktop_applications(self):
-        apps = get_desktop_applications()
-        # Filter out apps that are in the ignored_apps list
-        ignored_apps = self.config.get("ignored_apps", [])
-        filtered_apps = [app for app in apps if app.name not in ignored_apps]
-
-        return filtered_apps
-
     def __init__(self, config, **kwargs):
         self.config = config["modules"]["dock"]
 
@@ -52,17 +44,18 @@ class Dock(Window, BaseWidget):
         # Add this instance to the registry
         Dock._instances.append(self)
         self.conn = get_hyprland_connection()
+        self.state = HyprlandStateService()
+        self.ipc = HyprlandIPC()
         self.icon = IconResolver()
         self.pinned = self.config.get("pinned_apps", [])
         self.OCCLUSION = 36 + self.config["icon_size"]
-        self.app_map = {}  # Initialize the app map
-        self._all_apps = self.get_desktop_applications()  # Get all apps for lookup
+        self.ignored_apps = set(self.config.get("ignored_apps", []))
 
-        # Create app identifiers mapping
-        self.app_identifiers = self._build_app_identifiers_map()
+        # Desktop apps are parsed once and shared, reloaded when files change
+        self.catalogue = AppCatalogueService()
+        self.catalogue.connect("changed", self.update_app_map)
         self.is_hidden = False
         self.hide_id = None
-        self._arranger_handler = None
         self._drag_in_progress = False  # Drag lock flag
         self.is_hovered = False
 
@@ -74,6 +67,16 @@ class Dock(Window, BaseWidget):
         )
         self.wrapper = Box(name="dock", orientation="v", children=[self.view])
 
+        # Buttons by pinned index or window class, kept across updates
+        self._buttons: dict[tuple[str, int | str], Button] = {}
+        self._class_identifiers: dict[str, dict | str] = {}
+        self.separator = Box(
+            orientation="v" if self.config["anchor"] == "bottom-center" else "h",
+            v_expand=self.config["anchor"] != "bottom-center",
+            h_expand=self.config["anchor"] == "bottom-center",
+            name="dock-separator",
+        )
+
         # Main dock container with hover handling
         self.dock_eventbox = EventBox()
         self.dock_eventbox.add(self.wrapper)
@@ -113,54 +116,24 @@ class Dock(Window, BaseWidget):
                 {"event::ready": self.check_hide},
             )
 
-        for ev in ("activewindow", "openwindow", "closewindow", "changefloatingmode"):
-            self.conn.connect(f"event::{ev}", self.update_dock)
-        self.conn.connect("event::workspace", self.check_hide)
-
-        GLib.timeout_add(250, self.check_occlusion_state)
-
-    def _build_app_identifiers_map(self):
-        """Build a mapping of app identifiers to DesktopApp objects"""
-        identifiers = {}
-        for app in self._all_apps:
-            # Map by name (lowercase)
-            if app.name:
-                identifiers[app.name.lower()] = app
-
-            # Map by display name
-            if app.display_name:
-                identifiers[app.display_name.lower()] = app
-
-            # Map by window class if available
-            if app.window_class:
-                identifiers[app.window_class.lower()] = app
-
-            # Map by executable name if available
-            if app.executable:
-                exe_basename = app.executable.split("/")[-1].lower()
-                identifiers[exe_basename] = app
-
-            # Map by command line if available (without parameters)
-            if app.command_line:
-                cmd_base = app.command_line.split()[0].split("/")[-1].lower()
-                identifiers[cmd_base] = app
-
-        return identifiers
-
-    def _normalize_window_class(self, class_name: str):
-        """Normalize window class by removing common suffixes and lowercase."""
-        if not class_name:
-            return ""
-
-        normalized = class_name.lower()
-
-        # Remove common suffixes
-        suffixes = [".bin", ".exe", ".so", "-bin", "-gtk"]
-        for suffix in suffixes:
-            if normalized.endswith(suffix):
-                normalized = normalized[: -len(suffix)]
+        # Clients and focus are kept by the shared state, no need to request them
+        for signal in (
+            "client-added",
+            "client-removed",
+            "client-changed",
+            "focus-changed",
+        ):
+            self.state.connect(signal, self.update_dock)
+        self.state.connect("workspace-changed", self.check_hide)
 
-        return normalized
+        # Windows covering the dock's edge are tracked from Hyprland events
+        self.occlusion = OcclusionService()
+        self.occlusion_side = (
+            "bottom" if self.config["anchor"] == "bottom-center" else "right"
+        )
+        self.occlusion.watch(
+            self.occlusion_side, self.OCCLUSION, self.check_occlusion_state
+        )
 
     def _classes_match(self, class1: str, class2: str):
         """Check if two window class names match with stricter comparison."""
@@ -168,8 +141,8 @@ class Dock(Window, BaseWidget):
             return False
 
         # Normalize both classes
-        norm1 = self._normalize_window_class(class1)
-        norm2 = self._normalize_window_class(class2)
+        norm1 = normalize_window_class(class1)
+        norm2 = normalize_window_class(class2)
 
         # Direct match after normalization
         return norm1 == norm2
@@ -201,18 +174,8 @@ class Dock(Window, BaseWidget):
 
         self.is_hovered = False
         self.delay_hide()
-        # Immediate occlusion check on true leave using simplified format
-
-        occlusion_region = (
-            ("bottom", self.OCCLUSION)
-            if self.config["anchor"] == "bottom-center"
-            else ("right", self.OCCLUSION)
-        )
-        # Only add occlusion style if not dragging an icon.
-        if not self._drag_in_progress and (
-            check_occlusion(occlusion_region) or not self.view.get_children()
-        ):
-            self.wrapper.add_style_class("occluded")
+        # Immediate occlusion check on true leave
+        self.check_occlusion_state()
         return True
 
     # Enhanced app lookup methods
@@ -243,41 +206,20 @@ class Dock(Window, BaseWidget):
         # Simple string identifier (backward compatibility)
         return self.find_app_by_key(app_identifier)
 
-    def find_app_by_key(self, key_value: str):
-        """Find app by a single identifier value"""
-        if not key_value:
+    def find_app_by_key(self, key_value: str, fuzzy: bool = True):
+        """Find app by a single identifier value, skipping ignored apps"""
+        app = self.catalogue.find(key_value, fuzzy=fuzzy)
+        if app is not None and app.name in self.ignored_apps:
             return None
+        return app
 
-        # Try direct lookup in our identifiers map
-        normalized_id = str(key_value).lower()
-        if normalized_id in self.app_identifiers:
-            return self.app_identifiers[normalized_id]
-
-        # Try fuzzy matching - find apps where the identifier is part of their names
-        for app in self._all_apps:
-            if app.name and normalized_id in app.name.lower():
-                return app
-            if app.display_name and normalized_id in app.display_name.lower():
-                return app
-            if app.window_class and normalized_id in app.window_class.lower():
-                return app
-            if app.executable and normalized_id in app.executable.lower():
-                return app
-            if app.command_line and normalized_id in app.command_line.lower():
-                return app
-
-        return None
-
-    # Update the dock's app map using DesktopApp objects from the system.
-    def update_app_map(self):
-        """Updates the mapping of commands to DesktopApp objects."""
-        self._all_apps = self.get_desktop_applications()  # Refresh all apps
-        self.app_map = {
-            app.name: app for app in self._all_apps if app.name
-        }  # Map app names to DesktopApp objects
-        self.app_identifiers = (
-            self._build_app_identifiers_map()
-        )  # Rebuild identifiers map
+    def update_app_map(self, *_):
+        """Rebuild the buttons once installed applications have changed."""
+        self._class_identifiers.clear()
+        for button in self._buttons.values():
+            button.destroy()
+        self._buttons.clear()
+        self.update_dock()
 
     def create_button(self, app_identifier, instances):
         """Create dock application button"""
@@ -316,8 +258,6 @@ class Dock(Window, BaseWidget):
         items = [Image(pixbuf=icon_img)]
 
         tooltip = display_name or (id_value if isinstance(id_value, str) else "Unknown")
-        if not display_name and instances and instances[0].get("title"):
-            tooltip = instances[0]["title"]
 
         button = Button(
             child=Box(
@@ -326,8 +266,9 @@ class Dock(Window, BaseWidget):
                 h_align="center",
                 children=items,
             ),
-            on_clicked=lambda *a: self.handle_app(
-                app_identifier, instances, desktop_app
+            # Instances change while the button is kept, read them on click
+            on_clicked=lambda button: self.handle_app(
+                button.app_identifier, button.instances, button.desktop_app
             ),  # Pass desktop_app as well
             tooltip_text=tooltip,
             name="dock-app-button",
@@ -336,13 +277,31 @@ class Dock(Window, BaseWidget):
         # Store app data with the button for future reference
         button.app_identifier = app_identifier
         button.desktop_app = desktop_app
+        button.instances = []
+
+        self.update_button(button, instances)
+
+        button.connect("enter-notify-event", self._on_child_enter)
+        return button
+
+    def update_button(self, button, instances):
+        """Update the running state of a button, without touching its icon"""
+        focused = self.get_focused()
         button.instances = instances
 
         if instances:
             button.add_style_class("instance")  # Style running apps
+        else:
+            button.remove_style_class("instance")
 
-        button.connect("enter-notify-event", self._on_child_enter)
-        return button
+        if any(i["address"] == focused for i in instances):
+            button.add_style_class("focused")
+        else:
+            button.remove_style_class("focused")
+
+        # Apps without a desktop entry are named after their window
+        if not button.desktop_app and instances and instances[0].get("title"):
+            button.set_tooltip_text(instances[0]["title"])
 
     # Enhanced app launching with multiple fallbacks
     def handle_app(self, app_identifier, instances, desktop_app=None):
@@ -401,9 +360,7 @@ class Dock(Window, BaseWidget):
                 -1,
             )
             next_inst = instances[(idx + 1) % len(instances)]
-            exec_shell_command_async(
-                f"hyprctl dispatch focuswindow address:{next_inst['address']}"
-            )
+            self.ipc.dispatch(f"focuswindow address:{next_inst['address']}")
 
     def _on_child_enter(self, widget, event):
         """Maintain hover state when entering child widgets"""
@@ -456,10 +413,6 @@ class Dock(Window, BaseWidget):
 
     def update_dock(self, *_):
         """Refresh dock contents and clear drag lock."""
-        self.update_app_map()  # Update app map before creating buttons
-        arranger_handler = getattr(self, "_arranger_handler", None)
-        if arranger_handler:
-            remove_handler(arranger_handler)
         clients = self.get_clients()
 
         # Create a mapping of window class to instances
@@ -499,17 +452,17 @@ class Dock(Window, BaseWidget):
             running_windows.setdefault(window_id, []).append(c)
 
             # Also store with normalized key for more flexible matching
-            normalized_id = self._normalize_window_class(window_id)
+            normalized_id = normalize_window_class(window_id)
             if normalized_id != window_id:
                 running_windows.setdefault(normalized_id, []).extend(
                     running_windows[window_id]
                 )
 
         # Map pinned apps to their running instances
-        pinned_buttons = []
+        pinned_entries = []
         used_window_classes = set()  # Track which window classes we've already assigned
 
-        for app_data in self.pinned:
+        for index, app_data in enumerate(self.pinned):
             app = self.find_app(app_data)
 
             # Try to find running instances for this pinned app
@@ -559,7 +512,7 @@ class Dock(Window, BaseWidget):
                     break
 
                 # Try normalized version
-                normalized = self._normalize_window_class(identifier)
+                normalized = normalize_window_class(identifier)
                 if normalized in running_windows:
                     instances = running_windows[normalized]
                     matched_class = normalized
@@ -584,36 +537,35 @@ class Dock(Window, BaseWidget):
             if matched_class:
                 used_window_classes.add(matched_class)
                 # Also mark the normalized version as used
-                used_window_classes.add(self._normalize_window_class(matched_class))
+                used_window_classes.add(normalize_window_class(matched_class))
                 logging.debug(
                     f"""Matched pinned app {app_data} to running
                       instances via {matched_class}"""
                 )
 
-            # Create button for this pinned app with any found instances
-            pinned_buttons.append(self.create_button(app_data, instances))
+            # Keep a button for this pinned app with any found instances
+            pinned_entries.append((("pinned", index), app_data, instances))
 
         # For any remaining window classes that aren't assigned to pinned apps
-        open_buttons = []
+        open_entries = []
         for class_name, instances in running_windows.items():
-            if class_name not in used_window_classes:
+            if class_name in used_window_classes:
+                continue
+
+            # Classes are only matched to an app once, focus changes reuse it
+            if class_name not in self._class_identifiers:
                 # Enhanced app identification for running windows
                 app = None
 
                 # Try multiple methods to find the correct app
-                # 1. Direct lookup by class name
-                app = self.app_identifiers.get(class_name)
-
-                # 2. Try with normalized class name
-                if not app:
-                    norm_class = self._normalize_window_class(class_name)
-                    app = self.app_identifiers.get(norm_class)
+                # 1. Direct lookup by class name, then normalized class name
+                app = self.find_app_by_key(class_name, fuzzy=False)
 
-                # 3. Try with our more robust find_app method
+                # 2. Try with the catalogue's fuzzy matching
                 if not app:
                     app = self.find_app_by_key(class_name)
 
-                # 4. Try using window title which often contains app name
+                # 3. Try using window title which often contains app name
                 if not app and instances and instances[0].get("title"):
                     title = instances[0].get("title", "")
                     # Extract app name from title (format: "App Name - Document")
@@ -635,27 +587,53 @@ class Dock(Window, BaseWidget):
                     # Fallback to just class name
                     identifier = class_name
 
-                open_buttons.append(self.create_button(identifier, instances))
+                self._class_identifiers[class_name] = identifier
+
+            open_entries.append(
+                (("open", class_name), self._class_identifiers[class_name], instances)
+            )
+
+        self.reconcile(pinned_entries, open_entries)
+        self._drag_in_progress = False  # Clear the drag lock
+        self.check_occlusion_state()
+
+    def reconcile(self, pinned_entries, open_entries):
+        """Update the dock's buttons in place, only creating those of new apps"""
+        buttons = {}
+        for key, app_identifier, instances in (*pinned_entries, *open_entries):
+            button = self._buttons.pop(key, None)
+            if button is not None and button.app_identifier == app_identifier:
+                self.update_button(button, instances)
+            else:
+                if button is not None:
+                    button.destroy()
+                button = self.create_button(app_identifier, instances)
+            buttons[key] = button
+
+        # Buttons of apps that are not pinned nor running anymore
+        for button in self._buttons.values():
+            button.destroy()
+        self._buttons = buttons
 
         # Assemble dock layout
-        children = pinned_buttons
+        children = [buttons[key] for key, *_ in pinned_entries]
         # Only add separator if both pinned and open buttons exist
-        if pinned_buttons and open_buttons:
-            children += [
-                Box(
-                    orientation="v"
-                    if self.config["anchor"] == "bottom-center"
-                    else "h",
-                    v_expand=self.config["anchor"] != "bottom-center",
-                    h_expand=self.config["anchor"] == "bottom-center",
-                    name="dock-separator",
-                )
-            ]
-        children += open_buttons
+        if pinned_entries and open_entries:
+            children.append(self.separator)
+        children += [buttons[key] for key, *_ in open_entries]
+
+        if children == self.view.get_children():
+            return
+
+        if self.separator not in children and self.separator.get_parent():
+            self.view.remove(self.separator)
+
+        for position, child in enumerate(children):
+            if child.get_parent() is None:
+                self.view.add(child)
+            self.view.reorder_child(child, position)
 
-        self.view.children = children
         idle_add(self._update_size)
-        self._drag_in_progress = False  # Clear the drag lock
 
     def _update_size(self):
         """Update window size based on content"""
@@ -665,45 +643,29 @@ class Dock(Window, BaseWidget):
 
     def get_clients(self):
         """Get current client list"""
-        try:
-            return json.loads(self.conn.send_command("j/clients").reply.decode())
-        except json.JSONDecodeError:
-            return []
+        return list(self.state.clients.values())
 
     def get_focused(self):
         """Get focused window address"""
-        try:
-            return json.loads(
-                self.conn.send_command("j/activewindow").reply.decode()
-            ).get("address", "")
-        except json.JSONDecodeError:
-            return ""
+        return self.state.active_address
 
     def get_workspace(self):
         """Get current workspace ID"""
-        try:
-            return json.loads(
-                self.conn.send_command("j/activeworkspace").reply.decode()
-            ).get("id", 0)
-        except json.JSONDecodeError:
-            return 0
-
-    def check_occlusion_state(self):
-        """Periodic occlusion check"""
+        return self.state.active_workspace
+
+    def check_occlusion_state(self, *_):
+        """Update the occluded style, when windows or the dock's state change"""
         # Skip occlusion check if hovered or dragging an icon
         if self.is_hovered or self._drag_in_progress:
             self.wrapper.remove_style_class("occluded")
-            return True
-        occlusion_region = (
-            ("bottom", self.OCCLUSION)
-            if self.config["anchor"] == "bottom-center"
-            else ("right", self.OCCLUSION)
-        )
-        if check_occlusion(occlusion_region) or not self.view.get_children():
+            return
+        if (
+            self.occlusion.is_occluded(self.occlusion_side, self.OCCLUSION)
+            or not self.view.get_children()
+        ):
             self.wrapper.add_style_class("occluded")
         else:
             self.wrapper.remove_style_class("occluded")
-        return True
 
     def _find_drag_target(self, widget):
         """Find valid drag target in viewport"""
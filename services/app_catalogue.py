@@ -0,0 +1,293 @@
+import json
+import os
+import threading
+
+from fabric.core.service import Service, Signal
+from fabric.utils import DesktopApp
+from gi.repository import Gio, GLib, Gtk
+from loguru import logger
+
+from utils.constants import DESKTOP_INDEX_CACHE_FILE
+from utils.icon_resolver import INDEX_KEYS, DesktopIndex
+from utils.thread import thread
+
+# Delay used to reload the entries of a burst of file changes at once
+RELOAD_DELAY_MS = 500
+
+# Bumped when the layout of the saved icon index changes
+ICON_INDEX_VERSION = 2
+
+# Suffixes dropped from window classes before matching them to apps
+WINDOW_CLASS_SUFFIXES = (".bin", ".exe", ".so", "-bin", "-gtk")
+
+
+def normalize_window_class(class_name: str) -> str:
+    """Normalize window class by removing common suffixes and lowercase."""
+    if not class_name:
+        return ""
+
+    normalized = class_name.lower()
+
+    for suffix in WINDOW_CLASS_SUFFIXES:
+        if normalized.endswith(suffix):
+            normalized = normalized[: -len(suffix)]
+
+    return normalized
+
+
+def app_identifiers(app: DesktopApp) -> list[str]:
+    """Return the lowercase names an app may be looked up by."""
+    identifiers = []
+
+    if app.name:
+        identifiers.append(app.name.lower())
+    if app.display_name:
+        identifiers.append(app.display_name.lower())
+    if app.window_class:
+        identifiers.append(app.window_class.lower())
+    # Executable and command line, without path nor parameters
+    if app.executable:
+        identifiers.append(app.executable.split("/")[-1].lower())
+    if app.command_line:
+        identifiers.append(app.command_line.split()[0].split("/")[-1].lower())
+
+    return identifiers
+
+
+def application_directories() -> list[str]:
+    """Return the directories desktop files are read from, by precedence."""
+    return [
+        os.path.join(data_dir, "applications")
+        for data_dir in (GLib.get_user_data_dir(), *GLib.get_system_data_dirs())
+    ]
+
+
+def directory_mtimes() -> dict[str, float]:
+    mtimes = {}
+    for directory in application_directories():
+        try:
+            mtimes[directory] = os.stat(directory).st_mtime
+        except OSError:
+            continue
+    return mtimes
+
+
+def load_icon_index(
+    mtimes: dict[str, float], cache_file: str = DESKTOP_INDEX_CACHE_FILE
+) -> DesktopIndex | None:
+    """Return the saved icon index, unless desktop files changed since."""
+    try:
+        with open(cache_file, "r") as file:
+            data = json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    if (
+        not isinstance(data, dict)
+        or data.get("version") != ICON_INDEX_VERSION
+        or data.get("mtimes") != mtimes
+        or not isinstance(data.get("keys"), dict)
+        or set(data["keys"]) != set(INDEX_KEYS)
+    ):
+        return None
+
+    return DesktopIndex(data["keys"])
+
+
+def save_icon_index(
+    index: DesktopIndex,
+    mtimes: dict[str, float],
+    cache_file: str = DESKTOP_INDEX_CACHE_FILE,
+):
+    temp_file = f"{cache_file}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(temp_file, "w") as file:
+            json.dump(
+                {"version": ICON_INDEX_VERSION, "mtimes": mtimes, "keys": index.keys},
+                file,
+                ensure_ascii=False,
+            )
+        os.replace(temp_file, cache_file)
+    except OSError as e:
+        logger.warning(f"[Apps] Failed to save the icon index: {e}")
+
+
+def build_icon_index(infos: dict[str, Gio.DesktopAppInfo]) -> DesktopIndex:
+    """Index the icons of desktop entries, by the names windows may use."""
+    index = DesktopIndex()
+    for desktop_id, info in infos.items():
+        index.add(
+            desktop_id.removesuffix(".desktop"),
+            info.get_string("Icon"),
+            wm_class=info.get_startup_wm_class(),
+            command=info.get_string("Exec"),
+            name=info.get_name(),
+        )
+    return index
+
+
+class AppCatalogueService(Service):
+    """Service to keep the installed desktop applications, parsed once.
+
+    Applications directories are watched, and only the entries of changed files
+    are loaded again. Apps are indexed by name, display name, window class and
+    executable, with a memoized substring search as a fallback. The icons of all
+    entries, those not shown in menus too, are indexed for window icons. That
+    index is saved, and used right away at startup while the applications
+    directories did not change.
+    """
+
+    @Signal
+    def changed(self) -> None:
+        """Signal emitted when applications are installed, changed or removed."""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, **kwargs):
+        if hasattr(self, "_initialized"):
+            return
+        super().__init__(**kwargs)
+        self._initialized = True
+
+        self._icon_theme = Gtk.IconTheme.get_default()
+
+        # Entries by desktop file id, and the apps shown in menus among them
+        self._infos: dict[str, Gio.DesktopAppInfo] = {}
+        self._apps: dict[str, DesktopApp] = {}
+        self._identifiers: dict[str, DesktopApp] = {}
+        self._fuzzy_matches: dict[str, DesktopApp | None] = {}
+        self.icon_index = load_icon_index(directory_mtimes()) or DesktopIndex()
+        self.loaded = False
+
+        self._changed_ids: set[str] = set()
+        self._reload_id = 0
+        self._monitors = []
+        self._watch()
+
+        # Parsing every desktop file takes a while, so it is kept off startup
+        thread(self._load)
+
+    @property
+    def apps(self) -> list[DesktopApp]:
+        return list(self._apps.values())
+
+    def find(self, key: str, fuzzy: bool = True) -> DesktopApp | None:
+        """Return the app known by a name, window class or executable.
+
+        With `fuzzy`, an app whose identifiers contain the key is returned when
+        none matches it exactly.
+        """
+        if not key:
+            return None
+
+        key = str(key).lower()
+        app = self._identifiers.get(key) or self._identifiers.get(
+            normalize_window_class(key)
+        )
+        if app is not None or not fuzzy:
+            return app
+
+        if key not in self._fuzzy_matches:
+            self._fuzzy_matches[key] = next(
+                (
+                    app
+                    for app in self._apps.values()
+                    if any(key in identifier for identifier in app_identifiers(app))
+                ),
+                None,
+            )
+
+        return self._fuzzy_matches[key]
+
+    def _load(self):
+        # Taken first, so files changed while reading invalidate the saved index
+        mtimes = directory_mtimes()
+        infos = {info.get_id(): info for info in Gio.DesktopAppInfo.get_all()}
+        icon_index = build_icon_index(infos)
+        GLib.idle_add(self._on_loaded, infos, icon_index)
+        save_icon_index(icon_index, mtimes)
+
+    def _on_loaded(
+        self, infos: dict[str, Gio.DesktopAppInfo], icon_index: DesktopIndex
+    ):
+        self._infos = infos
+        self._apps = {
+            desktop_id: DesktopApp(info, self._icon_theme)
+            for desktop_id, info in infos.items()
+            if info.should_show()
+        }
+        self.icon_index = icon_index
+        self._build_index()
+
+        self.loaded = True
+        logger.info(f"[Apps] Loaded {len(infos)} desktop entries")
+        self.emit("changed")
+        return False
+
+    def _build_index(self):
+        self._identifiers = {
+            identifier: app
+            for app in self._apps.values()
+            for identifier in app_identifiers(app)
+        }
+        self._fuzzy_matches = {}
+
+    def _watch(self):
+        for directory in application_directories():
+            if not os.path.isdir(directory):
+                continue
+
+            monitor = Gio.File.new_for_path(directory).monitor_directory(
+                Gio.FileMonitorFlags.WATCH_MOVES, None
+            )
+            monitor.connect("changed", self._on_file_changed, directory)
+            self._monitors.append(monitor)
+
+    def _on_file_changed(self, _monitor, file, other_file, _event, directory):
+        for changed in (file, other_file):
+            path = changed.get_path() if changed else None
+            if path and path.endswith(".desktop"):
+                # Desktop ids name files in subdirectories with dashes
+                desktop_id = os.path.relpath(path, directory).replace("/", "-")
+                self._changed_ids.add(desktop_id)
+
+        if self._changed_ids and not self._reload_id:
+            self._reload_id = GLib.timeout_add(RELOAD_DELAY_MS, self._reload)
+
+    def _reload(self):
+        # Files changed while loading are read again once it is done
+        if not self.loaded:
+            return True
+
+        self._reload_id = 0
+        changed_ids, self._changed_ids = self._changed_ids, set()
+
+        for desktop_id in changed_ids:
+            # Resolves which directory the entry now comes from, if any
+            info = Gio.DesktopAppInfo.new(desktop_id)
+            if info is not None and not info.get_is_hidden():
+                self._infos[desktop_id] = info
+            else:
+                self._infos.pop(desktop_id, None)
+
+            if info is not None and info.should_show():
+                self._apps[desktop_id] = DesktopApp(info, self._icon_theme)
+            else:
+                self._apps.pop(desktop_id, None)
+
+        logger.info(f"[Apps] Reloaded {len(changed_ids)} desktop entries")
+
+        self.icon_index = build_icon_index(self._infos)
+        thread(save_icon_index, self.icon_index, directory_mtimes())
+        self._build_index()
+        self.emit("changed")
+        return False
@@ -0,0 +1,272 @@
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from gi.repository import GLib
+from loguru import logger
+
+from utils.constants import ARTWORK_CACHE_DIRECTORY
+from utils.functions import get_simple_palette
+
+# Downloaded artwork is evicted, least recently used first, past this size
+DISK_CACHE_BYTES = 64 * 1024**2
+
+# Artworks and palettes remembered at most
+MAX_ENTRIES = 512
+
+# Seconds a downloaded artwork is used before asking the server if it changed
+REVALIDATE_SECONDS = 24 * 3600
+
+# Seconds to wait for an artwork server
+FETCH_TIMEOUT = 10
+
+# Colors in the palette of an artwork
+PALETTE_SIZE = 5
+
+# Delay before saving the index after artworks were reused, in seconds
+SAVE_DELAY = 30
+
+INDEX_FILE = "index.json"
+
+Palette = list[tuple[int, int, int]]
+
+
+class ArtworkCache:
+    """A cache of media player artworks and their palettes, kept across restarts.
+
+    Remote artworks are downloaded once under the cache directory, by hash of
+    their URL, and only downloaded again if the server says they changed, once
+    `REVALIDATE_SECONDS` passed. The palette of every artwork, local ones too, is
+    stored in the index next to it, so a track seen before costs nothing.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, directory: str = ARTWORK_CACHE_DIRECTORY):
+        if hasattr(self, "_initialized"):
+            return
+        self._initialized = True
+
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Entries by hash of their source, shared with the workers
+        self._index: dict[str, dict] = self._load_index()
+        self._index_lock = threading.Lock()
+
+        # Snapshots of the index are numbered, so an older one never replaces it
+        self._version = 0
+        self._saved_version = 0
+        self._save_lock = threading.Lock()
+
+        # Only touched from the main loop
+        self._waiting: dict[str, list[Callable]] = {}
+        self._save_id = 0
+
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="artwork")
+
+    def get(self, source: str, callback: Callable[[str | None, Palette | None], None]):
+        """Call `callback` with the local path and the palette of an artwork.
+
+        `source` is a local path or a http(s) URL. The callback is called right
+        away when both are known and fresh, otherwise from the main loop once a
+        worker fetched them. The path is None if the artwork is unavailable.
+        """
+        key = hashlib.sha1(source.encode()).hexdigest()
+
+        with self._index_lock:
+            entry = self._index.get(key)
+            if entry is not None and self._is_fresh(entry):
+                entry["used"] = time.time()
+                path, palette = self._path_of(entry), entry["palette"]
+            else:
+                path = None
+
+        if path is not None:
+            callback(path, [tuple(color) for color in palette])
+            self._schedule_save()
+            return
+
+        if key in self._waiting:
+            self._waiting[key].append(callback)
+        else:
+            self._waiting[key] = [callback]
+            self._pool.submit(self._fetch, key, source)
+
+    def _schedule_save(self):
+        # Reuses only change when entries were last used, saved in one go
+        if not self._save_id:
+            self._save_id = GLib.timeout_add_seconds(SAVE_DELAY, self._on_save)
+
+    def _on_save(self):
+        self._save_id = 0
+        self._pool.submit(self._save_index)
+        return False
+
+    def _is_fresh(self, entry: dict) -> bool:
+        if entry.get("palette") is None:
+            return False
+
+        if entry.get("file") is None:
+            # Local artworks are checked against their modification time
+            try:
+                return os.path.getmtime(entry["source"]) == entry.get("mtime")
+            except OSError:
+                return False
+
+        return time.time() - entry["checked"] < REVALIDATE_SECONDS and os.path.isfile(
+            self._path_of(entry)
+        )
+
+    def _path_of(self, entry: dict) -> str:
+        if entry.get("file") is None:
+            return entry["source"]
+        return os.path.join(self.directory, entry["file"])
+
+    def _fetch(self, key: str, source: str):
+        path = None
+        palette = None
+        try:
+            with self._index_lock:
+                entry = dict(self._index.get(key) or {"source": source})
+
+            scheme = urllib.parse.urlparse(source).scheme
+            changed = (
+                self._download(key, entry)
+                if scheme in ("http", "https")
+                else self._stat(entry)
+            )
+
+            path = self._path_of(entry)
+            if changed or entry.get("palette") is None:
+                entry["palette"] = get_simple_palette(path, PALETTE_SIZE)
+            palette = [tuple(color) for color in entry["palette"]]
+
+            entry["used"] = time.time()
+            with self._index_lock:
+                self._index[key] = entry
+                self._evict()
+            self._save_index()
+        except Exception as e:
+            logger.warning(f"[Media] Failed to fetch artwork {source}: {e}")
+            path = None
+
+        GLib.idle_add(self._on_fetched, key, path, palette)
+
+    def _download(self, key: str, entry: dict) -> bool:
+        """Download an artwork unless the server says it did not change.
+
+        Returns whether the file changed. A stale copy is kept if the server
+        cannot be reached.
+        """
+        request = urllib.request.Request(entry["source"])
+        has_copy = entry.get("file") is not None and os.path.isfile(
+            self._path_of(entry)
+        )
+        if has_copy:
+            if entry.get("etag"):
+                request.add_header("If-None-Match", entry["etag"])
+            if entry.get("last_modified"):
+                request.add_header("If-Modified-Since", entry["last_modified"])
+
+        try:
+            with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+                data = response.read()
+                headers = response.headers
+        except urllib.error.HTTPError as e:
+            if e.code != 304 or not has_copy:
+                raise
+            entry["checked"] = time.time()
+            return False
+        except urllib.error.URLError:
+            if not has_copy:
+                raise
+            return False
+
+        suffix = os.path.splitext(urllib.parse.urlparse(entry["source"]).path)[1]
+        entry["file"] = f"{key}{suffix or '.png'}"
+        path = self._path_of(entry)
+        temp_file = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_file, "wb") as file:
+            file.write(data)
+        os.replace(temp_file, path)
+
+        entry["size"] = len(data)
+        entry["etag"] = headers.get("ETag")
+        entry["last_modified"] = headers.get("Last-Modified")
+        entry["checked"] = time.time()
+        return True
+
+    def _stat(self, entry: dict) -> bool:
+        """Record the modification time of a local artwork, returns if it changed."""
+        mtime = os.path.getmtime(entry["source"])
+        changed = mtime != entry.get("mtime")
+        entry["mtime"] = mtime
+        return changed
+
+    def _on_fetched(self, key: str, path: str | None, palette: Palette | None):
+        for callback in self._waiting.pop(key, ()):
+            callback(path, palette)
+        return False
+
+    def _evict(self):
+        """Drop the least recently used entries, and their files, over budget.
+
+        Called with the index lock held.
+        """
+        usage = sum(entry.get("size", 0) for entry in self._index.values())
+        if usage <= DISK_CACHE_BYTES and len(self._index) <= MAX_ENTRIES:
+            return
+
+        for key, entry in sorted(
+            self._index.items(), key=lambda item: item[1].get("used", 0)
+        ):
+            if usage <= DISK_CACHE_BYTES and len(self._index) <= MAX_ENTRIES:
+                break
+
+            if entry.get("file") is not None:
+                with contextlib.suppress(OSError):
+                    os.remove(self._path_of(entry))
+            usage -= entry.get("size", 0)
+            del self._index[key]
+
+    def _load_index(self) -> dict[str, dict]:
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE), "r") as file:
+                return json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self):
+        with self._index_lock:
+            self._version += 1
+            version = self._version
+            data = json.dumps(self._index)
+
+        # Written without holding the index, which the main loop reads
+        with self._save_lock:
+            if version < self._saved_version:
+                return
+
+            path = os.path.join(self.directory, INDEX_FILE)
+            temp_file = f"{path}.tmp"
+            with open(temp_file, "w") as file:
+                file.write(data)
+            os.replace(temp_file, path)
+            self._saved_version = version
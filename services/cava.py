@@ -0,0 +1,171 @@
+import array
+import os
+import sys
+import threading
+
+from fabric.core.service import Service, Signal
+from gi.repository import Gio, GLib
+from loguru import logger
+
+from utils.constants import APP_CACHE_DIRECTORY
+
+CAVA_CONFIG_FILE = f"{APP_CACHE_DIRECTORY}/cava.conf"
+
+# Frames per second cava outputs, higher only costs CPU in a bar
+FRAMERATE = 30
+
+# Delay before stopping cava once no visualizer is visible, in ms
+STOP_DELAY_MS = 1000
+
+# Largest value of a bar in cava's 16 bit output
+MAX_VALUE = 65535
+
+CAVA_CONFIG = """\
+[general]
+bars = {bars}
+framerate = {framerate}
+
+[input]
+method = pulse
+source = auto
+
+[output]
+method = raw
+raw_target = /dev/stdout
+data_format = binary
+bit_format = 16bit
+"""
+
+
+class CavaService(Service):
+    """Service running a single cava process for all visualizers.
+
+    cava writes its bars as 16 bit integers, read without blocking the main loop,
+    and each frame is emitted with the bars as floats between 0 and 1. cava only
+    runs while at least one visualizer is visible, see `acquire` and `release`.
+    """
+
+    @Signal
+    def frame(self, values: object) -> None:
+        """Signal emitted with the bars of each frame."""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, bars: int = 10, **kwargs):
+        if hasattr(self, "_initialized"):
+            return
+        super().__init__(**kwargs)
+        self._initialized = True
+
+        self.bars = bars
+        self.values = [0.0] * bars
+
+        self._frame_size = bars * 2
+        self._buffer = b""
+
+        self._users = 0
+        self._process: Gio.Subprocess | None = None
+        self._cancellable: Gio.Cancellable | None = None
+        self._stop_id = 0
+
+    def acquire(self):
+        """Note that a visualizer is visible, starting cava if needed."""
+        self._users += 1
+
+        if self._stop_id:
+            GLib.source_remove(self._stop_id)
+            self._stop_id = 0
+
+        if self._process is None:
+            self._start()
+
+    def release(self):
+        """Note that a visualizer is hidden, stopping cava if it was the last one."""
+        self._users = max(0, self._users - 1)
+
+        if not self._users and self._process is not None and not self._stop_id:
+            self._stop_id = GLib.timeout_add(STOP_DELAY_MS, self._stop)
+
+    def _start(self):
+        os.makedirs(APP_CACHE_DIRECTORY, exist_ok=True)
+        with open(CAVA_CONFIG_FILE, "w") as file:
+            file.write(CAVA_CONFIG.format(bars=self.bars, framerate=FRAMERATE))
+
+        try:
+            self._process = Gio.Subprocess.new(
+                ["cava", "-p", CAVA_CONFIG_FILE],
+                Gio.SubprocessFlags.STDOUT_PIPE | Gio.SubprocessFlags.STDERR_SILENCE,
+            )
+        except GLib.Error as e:
+            logger.warning(f"[Cava] Failed to start cava: {e.message}")
+            return
+
+        self._buffer = b""
+        self._cancellable = Gio.Cancellable()
+        self._read(self._process.get_stdout_pipe(), self._cancellable)
+
+    def _stop(self):
+        self._stop_id = 0
+
+        if self._cancellable is not None:
+            self._cancellable.cancel()
+            self._cancellable = None
+        if self._process is not None:
+            self._process.force_exit()
+            self._process = None
+
+        # Visualizers shown later start from silence
+        self.values = [0.0] * self.bars
+        return False
+
+    def _read(self, stream: Gio.InputStream, cancellable: Gio.Cancellable):
+        # Ask for a few frames, so a late read catches up in one go
+        stream.read_bytes_async(
+            self._frame_size * 4,
+            GLib.PRIORITY_DEFAULT,
+            cancellable,
+            self._on_read,
+            cancellable,
+        )
+
+    def _on_read(self, stream: Gio.InputStream, result: Gio.AsyncResult, cancellable):
+        try:
+            data = stream.read_bytes_finish(result).get_data()
+        except GLib.Error as e:
+            if not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                logger.warning(f"[Cava] Failed to read from cava: {e.message}")
+            return
+
+        # The process was stopped, or replaced, since the read was started
+        if cancellable is not self._cancellable:
+            return
+
+        if not data:
+            logger.warning("[Cava] cava exited")
+            self._process = None
+            self._cancellable = None
+            return
+
+        self._buffer += data
+        complete = len(self._buffer) - len(self._buffer) % self._frame_size
+        if complete:
+            # Only the latest frame is drawn, older ones are already late
+            latest = array.array(
+                "H", self._buffer[complete - self._frame_size : complete]
+            )
+            if sys.byteorder == "big":
+                latest.byteswap()
+            self._buffer = self._buffer[complete:]
+
+            self.values = [value / MAX_VALUE for value in latest]
+            self.frame(self.values)
+
+        self._read(stream, cancellable)
@@ -0,0 +1,317 @@
+import subprocess
+import threading
+from operator import attrgetter
+from typing import Callable, Iterable
+
+from fabric.core.service import Service, Signal
+from fabric.utils import exec_shell_command_async
+from gi.repository import GLib
+from loguru import logger
+
+import utils.functions as helpers
+
+# Delay before re-reading the history, so `cliphist store` can save the new entry
+WATCH_DELAY_MS = 300
+
+
+class ClipItem:
+    """A clipboard history entry with its precomputed search key."""
+
+    __slots__ = ("content", "id", "line", "lowered", "number")
+
+    def __init__(self, line: str):
+        parts = line.split("\t", 1)
+        self.line = line
+        self.id = parts[0] if len(parts) > 1 else "0"
+        self.content = parts[1] if len(parts) > 1 else line
+        self.lowered = self.content.lower()
+        # cliphist ids grow with each copy, the newest entry has the largest
+        self.number = int(self.id) if self.id.isdigit() else 0
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def index_items(index: dict[str, set[ClipItem]], items: Iterable[ClipItem]):
+    """Add entries to a trigram index."""
+    for item in items:
+        for trigram in trigrams(item.lowered):
+            index.setdefault(trigram, set()).add(item)
+
+
+def unindex_items(index: dict[str, set[ClipItem]], items: Iterable[ClipItem]):
+    """Remove entries from a trigram index."""
+    for item in items:
+        for trigram in trigrams(item.lowered):
+            postings = index.get(trigram)
+            if postings is not None:
+                postings.discard(item)
+                if not postings:
+                    del index[trigram]
+
+
+class ClipHistory:
+    """The clipboard entries, newest first, with a trigram index to search them.
+
+    The index is kept up to date entry by entry, so new copies and deletions
+    only cost the entries they touch.
+    """
+
+    def __init__(self):
+        self.items: list[ClipItem] = []
+        self._trigram_index: dict[str, set[ClipItem]] = {}
+
+        self._last_query = ""
+        self._last_results: list[ClipItem] = []
+
+    def set(
+        self,
+        items: list[ClipItem],
+        index: dict[str, set[ClipItem]] | None = None,
+    ):
+        """Replace all the entries, indexing them unless `index` is given."""
+        if index is None:
+            index = {}
+            index_items(index, items)
+
+        self.items = items
+        self._trigram_index = index
+        self._reset_search()
+
+    def prepend(self, new_items: list[ClipItem]):
+        """Add new entries on top."""
+        # cliphist moves an entry copied again, like a paste from the history,
+        # to the top under a new id
+        new_ids = {item.id for item in new_items}
+        new_contents = {item.content for item in new_items}
+        kept = []
+        moved = []
+        for item in self.items:
+            if item.id in new_ids or item.content in new_contents:
+                moved.append(item)
+            else:
+                kept.append(item)
+
+        unindex_items(self._trigram_index, moved)
+        index_items(self._trigram_index, new_items)
+        self.items = new_items + kept
+        self._reset_search()
+
+    def remove(self, removed: list[ClipItem]):
+        removed_set = set(removed)
+        unindex_items(self._trigram_index, removed)
+        self.items = [item for item in self.items if item not in removed_set]
+        self._reset_search()
+
+    def _reset_search(self):
+        self._last_query = ""
+        self._last_results = self.items
+
+    def search(self, query: str) -> list[ClipItem]:
+        """Return the entries containing `query`, case insensitively, newest first."""
+        query = query.lower()
+
+        if not query:
+            results = self.items
+
+        elif self._last_query and query.startswith(self._last_query):
+            # Typing narrows the previous results, no need to look at the rest
+            results = [item for item in self._last_results if query in item.lowered]
+
+        elif len(query) >= 3:
+            postings = sorted(
+                (
+                    self._trigram_index.get(trigram, set())
+                    for trigram in trigrams(query)
+                ),
+                key=len,
+            )
+            candidates = set.intersection(*postings)
+            results = sorted(
+                (item for item in candidates if query in item.lowered),
+                key=attrgetter("number"),
+                reverse=True,
+            )
+
+        else:
+            results = [item for item in self.items if query in item.lowered]
+
+        self._last_query = query
+        self._last_results = results
+        return results
+
+
+class ClipHistoryService(Service):
+    """Service to cache the cliphist history and search it without blocking."""
+
+    @Signal
+    def changed(self) -> None:
+        """Signal emitted when the clipboard history changes."""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, **kwargs):
+        if hasattr(self, "_initialized"):
+            return
+        super().__init__(**kwargs)
+        self._initialized = True
+
+        self.history = ClipHistory()
+
+        self._refreshing = False
+        self._refresh_pending = False
+        self._watch_id = 0
+
+        self.refresh(full=True)
+        self._watch_clipboard()
+
+    def _watch_clipboard(self):
+        """Pick up new entries as they are copied, instead of re-listing on open."""
+        if not GLib.find_program_in_path("wl-paste"):
+            logger.warning("[Cliphist] wl-paste not found, history will not update")
+            return
+
+        exec_shell_command_async("wl-paste --watch echo", self._on_clipboard_changed)
+
+    def _on_clipboard_changed(self, *_):
+        if self._watch_id:
+            GLib.source_remove(self._watch_id)
+        self._watch_id = GLib.timeout_add(WATCH_DELAY_MS, self._on_watch_timeout)
+
+    def _on_watch_timeout(self):
+        self._watch_id = 0
+        self.refresh()
+        return False
+
+    def refresh(self, full: bool = False):
+        """Read new entries in a worker thread, or the whole history when `full`."""
+        if self._refreshing:
+            self._refresh_pending = True
+            return
+
+        self._refreshing = True
+        known = tuple(self.items)
+        helpers.thread(self._read_history, known, full)
+
+    def _read_history(self, known: tuple[ClipItem, ...], full: bool):
+        # cliphist lists newest first, so an update only reads up to the known head
+        head_id = known[0].id if known and not full else None
+        new_items = []
+        found_head = False
+
+        try:
+            with subprocess.Popen(
+                ["cliphist", "list"], stdout=subprocess.PIPE, text=True
+            ) as proc:
+                for line in proc.stdout:
+                    line = line.rstrip("\n")
+                    if not line or "<meta http-equiv" in line:
+                        continue
+
+                    item = ClipItem(line)
+                    if item.id == head_id:
+                        found_head = True
+                        proc.kill()
+                        break
+
+                    new_items.append(item)
+        except OSError as e:
+            logger.exception(f"Error loading clipboard history: {e}")
+            GLib.idle_add(self._on_history_read, None, None)
+            return
+
+        if found_head:
+            GLib.idle_add(self._on_history_read, new_items, None)
+        else:
+            # The old head may be gone, in which case the whole list was read,
+            # and its index is built here rather than on the main loop
+            index: dict[str, set[ClipItem]] = {}
+            index_items(index, new_items)
+            GLib.idle_add(self._on_history_read, new_items, index)
+
+    def _on_history_read(
+        self, items: list[ClipItem] | None, index: dict[str, set[ClipItem]] | None
+    ):
+        self._refreshing = False
+        # Items are None when cliphist could not be run
+        if items is not None and index is None:
+            self._prepend_items(items)
+        elif items is not None:
+            self._set_items(items, index)
+
+        if self._refresh_pending:
+            self._refresh_pending = False
+            self.refresh()
+
+        return False
+
+    @property
+    def items(self) -> list[ClipItem]:
+        """The entries, newest first, as listed by cliphist."""
+        return self.history.items
+
+    def search(self, query: str) -> list[ClipItem]:
+        """Return the entries containing `query`, case insensitively, newest first."""
+        return self.history.search(query)
+
+    def _prepend_items(self, new_items: list[ClipItem]):
+        if new_items:
+            self.history.prepend(new_items)
+            self.emit("changed")
+
+    def _remove_items(self, removed: list[ClipItem]):
+        self.history.remove(removed)
+        self.emit("changed")
+
+    def _set_items(
+        self,
+        items: list[ClipItem],
+        index: dict[str, set[ClipItem]] | None = None,
+    ):
+        self.history.set(items, index)
+        self.emit("changed")
+
+    def _run_async(self, args: list[str], on_done: Callable[[], None]):
+        def worker():
+            try:
+                subprocess.run(args, check=True)
+                GLib.idle_add(on_done)
+            except subprocess.CalledProcessError as e:
+                logger.exception(f"Error running {args[0]} {args[1]}: {e}")
+
+        helpers.thread(worker)
+
+    def decode(self, item_id: str) -> bytes:
+        """Return the raw content of an entry. Blocks, so call it off the main loop."""
+        return subprocess.run(
+            ["cliphist", "decode", item_id], capture_output=True, check=True
+        ).stdout
+
+    def paste(self, item_id: str, on_done: Callable[[], None] | None = None):
+        def worker():
+            try:
+                subprocess.run(["wl-copy"], input=self.decode(item_id), check=True)
+                if on_done is not None:
+                    GLib.idle_add(on_done)
+            except subprocess.CalledProcessError as e:
+                logger.exception(f"Error pasting clipboard item: {e}")
+
+        helpers.thread(worker)
+
+    def delete(self, item_id: str):
+        def on_deleted():
+            self._remove_items([item for item in self.items if item.id == item_id])
+
+        self._run_async(["cliphist", "delete", item_id], on_deleted)
+
+    def wipe(self):
+        self._run_async(["cliphist", "wipe"], lambda: self._set_items([]))
@@ -1,17 +1,13 @@
-import json
-import os
 import threading
-from typing import List
+from typing import Dict, List
 
 from fabric import Signal
 from fabric.notifications import Notification, Notifications, NotificationSerializedData
 from loguru import logger
 
 from utils.colors import Colors
-from utils.constants import (
-    NOTIFICATION_CACHE_FILE,
-)
-from utils.functions import write_json_file
+
+from .notification_store import NotificationStore
 
 
 class CustomNotifications(Notifications):
@@ -35,7 +31,7 @@ class CustomNotifications(Notifications):
     @property
     def count(self) -> int:
         """Return the count of notifications."""
-        return len(self.all_notifications)
+        return len(self._notifications)
 
     @property
     def dont_disturb(self) -> bool:
@@ -51,97 +47,65 @@ class CustomNotifications(Notifications):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._lock = threading.Lock()
-        self.all_notifications = []
         self._count = 0  # Will be updated to highest ID when loading
-        self.deserialized_notifications = []
         self._dont_disturb = False
-        self._load_notifications()
-
-    def _load_notifications(self):
-        """Read and validate notifications from the cache file."""
-        if not os.path.exists(NOTIFICATION_CACHE_FILE):
-            return
-
-        try:
-            with open(NOTIFICATION_CACHE_FILE, "r") as file:
-                original_data = json.load(file)
+        self._store = NotificationStore()
 
-            original_data.reverse()
+        # Ids in insertion order, per app, used as ordered sets for O(1) removal
+        self._by_app: Dict[str, Dict[int, None]] = {}
 
-            valid_notifications = []
-            highest_id = self._count
-
-            for notification in original_data:
-                try:
-                    self._deserialize_notification(notification)
-                    valid_notifications.append(notification)
-                    highest_id = max(highest_id, notification.get("id", 0))
-                except Exception as e:
-                    msg = f"[Notification] Invalid: {str(e)[:50]}"
-                    logger.exception(f"{Colors.INFO}{msg}")
-
-            # Write only if the validated data differs from what was originally loaded
-            if valid_notifications != original_data:
-                write_json_file(valid_notifications, NOTIFICATION_CACHE_FILE)
-                logger.info(
-                    f"{Colors.INFO}[Notification] Notifications written successfully."
-                )
-
-            self.all_notifications = valid_notifications
-            self._count = highest_id
+        self._load_notifications()
 
-            del valid_notifications
-            del original_data
+    def _load_notifications(self):
+        """Read notifications from the journal, they were validated when cached."""
+        # The store keeps notifications by id, oldest first
+        self._notifications = self._store.load()
 
-        except (json.JSONDecodeError, KeyError, ValueError, IndexError) as e:
-            logger.exception(f"{Colors.INFO}[Notification] {e}")
+        for id, notification in self._notifications.items():
+            self._by_app.setdefault(notification["app_name"], {})[id] = None
+            self._count = max(self._count, id)
 
     def remove_notification(self, id: int):
         """Remove a notification by ID, ensuring thread safety."""
         with self._lock:
-            item = next((p for p in self.all_notifications if p["id"] == id), None)
-            if item:
-                self.all_notifications.remove(item)
-                self._persist_and_emit()
+            if id in self._notifications:
+                self._remove(id)
+                self._emit_count()
 
-                if len(self.all_notifications) == 0:
+                if len(self._notifications) == 0:
                     self.emit("clear_all", True)
 
     def cache_notification(self, widget_config, data: Notification, max_count: int):
         """Cache a notification, ensuring thread safety."""
         with self._lock:
-            self._cleanup_invalid_notifications()
             new_notification = self._create_serialized_notification(data)
+
+            # Validate once here so stored notifications never need re-checking
+            try:
+                self._deserialize_notification(new_notification)
+            except Exception as e:
+                msg = f"[Notification] Not caching invalid: {str(e)[:50]}"
+                logger.warning(f"{Colors.WARNING}{msg}")
+                return
+
             self._enforce_per_app_limit(widget_config, new_notification, max_count)
-            self.all_notifications.append(new_notification)
+            self._store.add(new_notification)
+            self._by_app.setdefault(new_notification["app_name"], {})[
+                new_notification["id"]
+            ] = None
             self._enforce_global_limit(max_count)
-            self._persist_and_emit()
+            self._emit_count()
 
-    def _cleanup_invalid_notifications(self):
-        """Remove any invalid notifications."""
+    def _remove(self, id: int):
+        """Drop a notification from the store and the per-app index."""
+        notification = self._notifications[id]
+        self._store.remove(id)
 
-        valid_notifications = []
-        invalid_count = 0
-
-        for notification in self.all_notifications:
-            try:
-                self._deserialize_notification(notification)
-                valid_notifications.append(notification)
-            except Exception as e:
-                msg = f"[Notification] Removing invalid: {str(e)[:50]}"
-                logger.debug(msg)
-                invalid_id = notification.get("id", 0)
-                self.emit("notification-closed", invalid_id, "dismissed-by-limit")
-                invalid_count += 1
-
-        if invalid_count > 0:
-            self.all_notifications = valid_notifications
-            self._persist_and_emit()
-            del valid_notifications
-            logger.info(
-                f"{Colors.INFO}[Notification] Cleaned "
-                f"{invalid_count} invalid notifications"
-            )
+        app_ids = self._by_app.get(notification["app_name"])
+        if app_ids is not None:
+            app_ids.pop(id, None)
+            if not app_ids:
+                del self._by_app[notification["app_name"]]
 
     def _create_serialized_notification(self, data: Notification) -> dict:
         """Generate a new notification with a unique ID."""
@@ -157,9 +121,10 @@ class CustomNotifications(Notifications):
 
     def _enforce_global_limit(self, max_count: int):
         """Remove oldest notifications if total count exceeds global limit."""
-        while len(self.all_notifications) > max_count:
-            oldest = self.all_notifications.pop(0)
-            self.emit("notification-closed", oldest["id"], "dismissed-by-limit")
+        while len(self._notifications) > max_count:
+            oldest = next(iter(self._notifications))
+            self._remove(oldest)
+            self.emit("notification-closed", oldest, "dismissed-by-limit")
 
     def _enforce_per_app_limit(
         self, widget_config, new_notification: dict, max_count: int
@@ -169,25 +134,21 @@ class CustomNotifications(Notifications):
         per_app_limits = widget_config.get("notification", {}).get("per_app_limits", {})
         app_limit = per_app_limits.get(app_name, max_count)
 
-        app_notifications = [
-            n for n in self.all_notifications if n["app_name"] == app_name
-        ]
+        app_ids = self._by_app.get(app_name, {})
 
-        if len(app_notifications) >= app_limit:
-            app_notifications.sort(key=lambda x: x["id"])  # Oldest first
-            to_remove = len(app_notifications) - app_limit + 1
-            for old in app_notifications[:to_remove]:
-                self.all_notifications.remove(old)
-                self.emit("notification-closed", old["id"], "dismissed-by-limit")
+        # Ids only grow, so the first one of an app is its oldest notification
+        while app_ids and len(app_ids) >= app_limit:
+            oldest = next(iter(app_ids))
+            self._remove(oldest)
+            self.emit("notification-closed", oldest, "dismissed-by-limit")
 
     def _deserialize_notification(self, notification: NotificationSerializedData):
         """Deserialize a notification."""
-        return Notification.deserialize(notification)
+        return Notification.deserialize(self._store.resolve(notification))
 
-    def _persist_and_emit(self):
-        """Persist notifications and emit relevant signals."""
-        write_json_file(self.all_notifications, NOTIFICATION_CACHE_FILE)
-        self.emit("notification_count", len(self.all_notifications))
+    def _emit_count(self):
+        """Emit the current notification count."""
+        self.emit("notification_count", len(self._notifications))
 
     def clear_all_notifications(self):
         """Empty the notifications."""
@@ -196,11 +157,10 @@ class CustomNotifications(Notifications):
         # Clear notifications but preserve the highest ID we've seen
         highest_id = self._count
 
-        self.all_notifications.clear()
-
-        self._persist_and_emit()
+        self._store.clear()
+        self._by_app.clear()
 
-        logger.info(f"{Colors.INFO}[Notification] Notifications written successfully.")
+        self._emit_count()
 
         self.emit("clear_all", True)
 
@@ -221,7 +181,8 @@ class CustomNotifications(Notifications):
 
         # Process all notifications at once
         results = [
-            deserialize_with_id(notification) for notification in self.all_notifications
+            deserialize_with_id(notification)
+            for notification in self._notifications.values()
         ]
 
         # Split into successful and failed
@@ -0,0 +1,124 @@
+import glob
+import json
+import os
+
+from fabric.utils import exec_shell_command
+from gi.repository import GLib
+from loguru import logger
+
+# PCI vendor ids of the GPUs exposed through /sys/class/drm
+GPU_VENDORS = {
+    "0x1002": "AMD",
+    "0x8086": "Intel",
+    "0x10de": "NVIDIA",
+}
+
+
+def read_sysfs(path: str | None) -> str | None:
+    if path is None:
+        return None
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+class GpuStats:
+    """A service to read GPU stats from sysfs, falling back to nvtop."""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if hasattr(self, "_initialized"):
+            return
+        self._initialized = True
+
+        self.card_path = None
+        self.busy_path = None
+        self.temperature_path = None
+        self.frequency_path = None
+        self.name = "N/A"
+        self.nvtop = False
+
+        self.discover()
+
+    def discover(self):
+        """Find the first card exposing its load in sysfs."""
+        for card_path in sorted(glob.glob("/sys/class/drm/card[0-9]*/device")):
+            busy_path = os.path.join(card_path, "gpu_busy_percent")
+            if not os.path.exists(busy_path):
+                continue
+
+            self.card_path = card_path
+            self.busy_path = busy_path
+
+            hwmon = sorted(glob.glob(os.path.join(card_path, "hwmon", "hwmon*")))
+            if hwmon:
+                temperature_path = os.path.join(hwmon[0], "temp1_input")
+                frequency_path = os.path.join(hwmon[0], "freq1_input")
+                if os.path.exists(temperature_path):
+                    self.temperature_path = temperature_path
+                if os.path.exists(frequency_path):
+                    self.frequency_path = frequency_path
+
+            vendor = GPU_VENDORS.get(read_sysfs(f"{card_path}/vendor"), "")
+            product = read_sysfs(f"{card_path}/product_name")
+            self.name = product or f"{vendor} GPU".strip()
+
+            logger.info(f"[GpuStats] Reading GPU stats from {card_path}")
+            return
+
+        if GLib.find_program_in_path("nvtop"):
+            self.nvtop = True
+            logger.info("[GpuStats] No sysfs GPU stats available, using nvtop")
+        else:
+            logger.warning("[GpuStats] No GPU stats available, from sysfs or nvtop")
+
+    @property
+    def available(self) -> bool:
+        return self.busy_path is not None or self.nvtop
+
+    def read(self) -> dict:
+        """Return the GPU name, utilization (%), temperature (°C) and clock (MHz).
+
+        Blocks for the nvtop fallback, so call it off the main loop.
+        """
+        if self.busy_path is None:
+            return self.read_nvtop()
+
+        temperature = read_sysfs(self.temperature_path)
+        frequency = read_sysfs(self.frequency_path)
+
+        return {
+            "name": self.name,
+            "usage": int(read_sysfs(self.busy_path) or 0),
+            "temperature": int(temperature) // 1000 if temperature else None,
+            "frequency": int(frequency) // 1_000_000 if frequency else None,
+        }
+
+    def read_nvtop(self) -> dict:
+        output = exec_shell_command("nvtop -s")
+        if not output:
+            raise RuntimeError("nvtop failed")
+
+        stats = json.loads(output.strip("\n"))
+
+        if type(stats) is list:
+            stats = stats[0]
+
+        usage = stats.get("gpu_util") or stats.get("mem_util") or "0"
+        temperature = (stats.get("temp") or "").rstrip("C")
+        frequency = (stats.get("gpu_clock") or "").rstrip("MHz")
+
+        return {
+            "name": stats.get("device_name", "N/A"),
+            "usage": int(usage.strip("%")),
+            "temperature": int(temperature) if temperature.isdigit() else None,
+            "frequency": int(frequency) if frequency.isdigit() else None,
+        }
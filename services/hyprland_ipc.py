@@ -0,0 +1,137 @@
+import json
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from fabric.hyprland.widgets import get_hyprland_connection
+from gi.repository import GLib
+from loguru import logger
+
+# Seconds a read-only query is answered from memory
+QUERY_TTL = 1.0
+
+
+class HyprlandIPC:
+    """A client for Hyprland's command socket, shared by all widgets.
+
+    Asynchronous requests and dispatches go through a single worker thread, in
+    order, so the main loop does not wait on the socket for them. Dispatches made
+    during the same main loop iteration are sent together as one `[[BATCH]]`
+    request. `request` and `query` block, for the few callers that need a reply
+    right away; read-only queries are kept for a short time so those stay rare.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if hasattr(self, "_initialized"):
+            return
+        self._initialized = True
+
+        self.connection = get_hyprland_connection()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="hyprland-ipc"
+        )
+
+        self._pending_dispatches: list[str] = []
+        self._flush_id = 0
+
+        # Parsed replies by command, with the time they were received
+        self._queries: dict[str, tuple[float, dict | list | None]] = {}
+
+    def request(self, command: str) -> str:
+        """Send a command and wait for its reply."""
+        return self.connection.send_command(command).reply.decode()
+
+    def request_async(
+        self, command: str, callback: Callable[[str | None], None] | None = None
+    ) -> Future:
+        """Send a command from the worker thread.
+
+        The reply is given to `callback` on the main loop, or None if the request
+        failed, and can also be read from the returned future.
+        """
+        future = self._executor.submit(self.request, command)
+        self._reply_on_main_loop(future, command, callback)
+        return future
+
+    def query_async(
+        self,
+        command: str,
+        callback: Callable[[dict | list | None], None],
+        ttl: float = QUERY_TTL,
+    ) -> Future:
+        """Like `query`, from the worker thread, giving the reply to `callback`.
+
+        The callback gets None if the request failed or the reply is invalid.
+        """
+        future = self._executor.submit(self.query, command, ttl)
+        self._reply_on_main_loop(future, command, callback)
+        return future
+
+    def _reply_on_main_loop(
+        self, future: Future, command: str, callback: Callable | None
+    ):
+        def deliver(reply):
+            # Whatever the callback returns, it is only called once
+            callback(reply)
+            return False
+
+        def on_done(done: Future):
+            reply = None
+            if (error := done.exception()) is not None:
+                logger.warning(f"[Hyprland] Request {command} failed: {error}")
+            else:
+                reply = done.result()
+
+            # Failures are delivered too, so callers waiting on a reply move on
+            if callback is not None:
+                GLib.idle_add(deliver, reply)
+
+        future.add_done_callback(on_done)
+
+    def query(self, command: str, ttl: float = QUERY_TTL) -> dict | list | None:
+        """Return the parsed reply of a json request, from memory if recent enough.
+
+        Returns None if the reply is invalid. Use a `ttl` of 0 for a fresh reply.
+        """
+        now = time.monotonic()
+        cached = self._queries.get(command)
+        if cached is not None and now - cached[0] < ttl:
+            return cached[1]
+
+        try:
+            data = json.loads(self.request(command))
+        except json.JSONDecodeError:
+            logger.warning(f"[Hyprland] Invalid reply to {command}")
+            data = None
+
+        self._queries[command] = (now, data)
+        return data
+
+    def dispatch(self, command: str):
+        """Run a dispatcher, e.g. `focuswindow address:0x1234`, without waiting."""
+        self._pending_dispatches.append(command)
+
+        if not self._flush_id:
+            self._flush_id = GLib.idle_add(self._flush_dispatches)
+
+    def _flush_dispatches(self):
+        self._flush_id = 0
+        commands, self._pending_dispatches = self._pending_dispatches, []
+
+        # The "/" ends the (empty) flags, so arguments may contain slashes
+        requests = [f"/dispatch {command}" for command in commands]
+        if len(requests) == 1:
+            self.request_async(requests[0])
+        else:
+            self.request_async("[[BATCH]]" + ";".join(requests))
+
+        # Dispatches usually change what queries return
+        self._queries.clear()
+        return False
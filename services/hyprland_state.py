@@ -0,0 +1,283 @@
+import threading
+
+from fabric.core.service import Service, Signal
+from fabric.hyprland.service import HyprlandEvent
+from fabric.hyprland.widgets import get_hyprland_connection
+from gi.repository import GLib
+
+from services.hyprland_ipc import HyprlandIPC
+
+# Client fields that place a window, compared to tell a move from other changes
+GEOMETRY_FIELDS = ("at", "size", "workspace", "monitor")
+
+# Events that change the layout of windows in ways they do not describe
+LAYOUT_EVENTS = (
+    "openwindow",
+    "closewindow",
+    "movewindowv2",
+    "changefloatingmode",
+    "fullscreen",
+)
+
+# Events after which monitors have to be read again, along with the clients.
+# A workspace moved to another monitor moves its windows, and what it shows
+MONITOR_EVENTS = (
+    "monitoradded",
+    "monitorremoved",
+    "monitoraddedv2",
+    "moveworkspace",
+    "moveworkspacev2",
+)
+
+
+def window_address(address: str) -> str:
+    """Events give window addresses without the 0x prefix used by `j/clients`."""
+    return address if address.startswith("0x") else f"0x{address}"
+
+
+class HyprlandStateService(Service):
+    """Service keeping the Hyprland clients, monitors and focus in memory.
+
+    The state is read once, then updated from socket2 events. Events that do not
+    describe the resulting layout, like a window opening and others re-tiling,
+    trigger a single read of the clients for the whole burst, which is diffed
+    into fine grained signals. Reads are made off the main loop, and applied
+    once replied. Focus, title and workspace changes are applied without any
+    request.
+    """
+
+    @Signal
+    def client_added(self, address: str) -> None:
+        """Signal emitted when a window is opened."""
+
+    @Signal
+    def client_removed(self, address: str) -> None:
+        """Signal emitted when a window is closed."""
+
+    @Signal
+    def client_moved(self, address: str) -> None:
+        """Signal emitted when a window changes position, size or workspace."""
+
+    @Signal
+    def client_changed(self, address: str) -> None:
+        """Signal emitted when another property of a window changes."""
+
+    @Signal
+    def focus_changed(self, address: str) -> None:
+        """Signal emitted when another window is focused."""
+
+    @Signal
+    def workspace_changed(self, workspace_id: int) -> None:
+        """Signal emitted when the focused monitor shows another workspace."""
+
+    @Signal
+    def monitors_changed(self) -> None:
+        """Signal emitted when monitors are added, removed or focused."""
+
+    @Signal
+    def changed(self) -> None:
+        """Signal emitted once after any batch of changes to the state."""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, **kwargs):
+        if hasattr(self, "_initialized"):
+            return
+        super().__init__(**kwargs)
+        self._initialized = True
+
+        self.connection = get_hyprland_connection()
+        self.ipc = HyprlandIPC()
+
+        # Clients by address, and monitors by id, as returned by hyprctl
+        self.clients: dict[str, dict] = {}
+        self.monitors: dict[int, dict] = {}
+        self.active_address = ""
+        self.ready = False
+
+        self._sync_id = 0
+        self._sync_monitors = False
+        self._syncing = False
+        self._sync_pending = False
+
+        handlers = {
+            "activewindowv2": self._on_active_window,
+            "closewindow": self._on_close_window,
+            "movewindowv2": self._on_move_window,
+            "windowtitlev2": self._on_window_title,
+            "workspacev2": self._on_workspace,
+            "focusedmon": self._on_focused_monitor,
+        }
+        for event, handler in handlers.items():
+            self.connection.connect(f"event::{event}", handler)
+
+        for event in LAYOUT_EVENTS:
+            self.connection.connect(f"event::{event}", self._schedule_sync)
+        for event in MONITOR_EVENTS:
+            self.connection.connect(
+                f"event::{event}", lambda *_: self._schedule_sync(monitors=True)
+            )
+
+        if self.connection.ready:
+            self._on_ready()
+        else:
+            self.connection.connect("event::ready", self._on_ready)
+
+    @property
+    def focused_monitor(self) -> dict | None:
+        return next(
+            (monitor for monitor in self.monitors.values() if monitor["focused"]),
+            next(iter(self.monitors.values()), None),
+        )
+
+    @property
+    def active_workspace(self) -> int:
+        """Id of the workspace shown on the focused monitor."""
+        monitor = self.focused_monitor
+        return monitor["activeWorkspace"]["id"] if monitor else -1
+
+    def workspace_clients(self, workspace_id: int) -> list[dict]:
+        return [
+            client
+            for client in self.clients.values()
+            if client["workspace"]["id"] == workspace_id
+        ]
+
+    def _on_ready(self, *_):
+        # Replies come in the order requests are made, monitors first
+        self._syncing = True
+        self.ipc.query_async("j/monitors", self._on_monitors_read, ttl=0)
+        self.ipc.query_async("j/activewindow", self._on_active_window_read, ttl=0)
+        self.ipc.query_async("j/clients", self._on_clients_read, ttl=0)
+
+    def _schedule_sync(self, *_, monitors: bool = False):
+        # Bursts of events are answered by a single read, once they are handled
+        self._sync_monitors |= monitors
+        if not self._sync_id:
+            self._sync_id = GLib.idle_add(self._sync)
+
+    def _sync(self, *_):
+        self._sync_id = 0
+
+        # A read is already on its way, another follows once it is applied
+        if self._syncing:
+            self._sync_pending = True
+            return False
+        self._syncing = True
+
+        # The state has to follow events, so replies are never taken from memory
+        if self._sync_monitors:
+            self._sync_monitors = False
+            self.ipc.query_async("j/monitors", self._on_monitors_read, ttl=0)
+        self.ipc.query_async("j/clients", self._on_clients_read, ttl=0)
+        return False
+
+    def _on_monitors_read(self, monitors: list | None):
+        if monitors is None:
+            return
+
+        self.monitors = {monitor["id"]: monitor for monitor in monitors}
+        self.emit("monitors-changed")
+
+    def _on_active_window_read(self, active: dict | None):
+        if active is not None:
+            self.active_address = active.get("address", "")
+
+    def _on_clients_read(self, clients: list | None):
+        self._syncing = False
+        # A failed read is None, the known clients are kept rather than removed
+        if clients is not None:
+            self._apply_clients(clients)
+
+        if self._sync_pending:
+            self._sync_pending = False
+            self._sync()
+
+    def _apply_clients(self, clients: list[dict]):
+        clients = {client["address"]: client for client in clients}
+
+        for address in self.clients.keys() - clients.keys():
+            del self.clients[address]
+            self.emit("client-removed", address)
+
+        for address, client in clients.items():
+            previous = self.clients.get(address)
+            self.clients[address] = client
+
+            if previous is None:
+                self.emit("client-added", address)
+            elif any(client.get(f) != previous.get(f) for f in GEOMETRY_FIELDS):
+                self.emit("client-moved", address)
+            elif client != previous:
+                self.emit("client-changed", address)
+
+        self.ready = True
+        self.emit("changed")
+
+    def _on_active_window(self, _, event: HyprlandEvent):
+        address = window_address(event.data[0]) if event.data[0] else ""
+        if address == self.active_address:
+            return
+
+        self.active_address = address
+        self.emit("focus-changed", address)
+        self.emit("changed")
+
+    def _on_close_window(self, _, event: HyprlandEvent):
+        address = window_address(event.data[0])
+        if self.clients.pop(address, None) is not None:
+            self.emit("client-removed", address)
+            self.emit("changed")
+
+    def _on_move_window(self, _, event: HyprlandEvent):
+        address, workspace_id, workspace_name = event.data[:3]
+        client = self.clients.get(window_address(address))
+        if client is None:
+            return
+
+        # The new position is only known once the workspace is re-tiled
+        client["workspace"] = {"id": int(workspace_id), "name": workspace_name}
+        self.emit("client-moved", client["address"])
+        self.emit("changed")
+
+    def _on_window_title(self, _, event: HyprlandEvent):
+        client = self.clients.get(window_address(event.data[0]))
+        if client is None:
+            return
+
+        # Titles may contain commas
+        client["title"] = ",".join(event.data[1:])
+        self.emit("client-changed", client["address"])
+        self.emit("changed")
+
+    def _on_workspace(self, _, event: HyprlandEvent):
+        monitor = self.focused_monitor
+        if monitor is None:
+            return
+
+        workspace_id = int(event.data[0])
+        monitor["activeWorkspace"] = {"id": workspace_id, "name": event.data[1]}
+        self.emit("workspace-changed", workspace_id)
+        self.emit("changed")
+
+    def _on_focused_monitor(self, _, event: HyprlandEvent):
+        name = event.data[0]
+        for monitor in self.monitors.values():
+            monitor["focused"] = monitor["name"] == name
+
+        monitor = self.focused_monitor
+        if monitor is None:
+            return
+
+        # The workspace in front is now the one shown on that monitor
+        self.emit("monitors-changed")
+        self.emit("workspace-changed", monitor["activeWorkspace"]["id"])
+        self.emit("changed")
@@ -1,6 +1,26 @@
 import re
+import threading
+import time
+from collections import deque
 
-from fabric.utils import exec_shell_command
+# Virtual interfaces whose traffic is already counted on a physical one
+IGNORED_INTERFACES = re.compile(r"^(?:lo$|(?:ifb|lxdbr|virbr|br|vnet|tun|tap)[0-9]+)")
+
+# Number of samples kept per interface
+HISTORY_SIZE = 60
+
+BYTES_PER_MB = 1024**2
+
+
+class InterfaceCounters:
+    """Last byte counters and recent speeds (MB/s) of a network interface."""
+
+    __slots__ = ("down_bytes", "history", "up_bytes")
+
+    def __init__(self, down_bytes: int, up_bytes: int):
+        self.down_bytes = down_bytes
+        self.up_bytes = up_bytes
+        self.history: deque[tuple[float, float]] = deque(maxlen=HISTORY_SIZE)
 
 
 class NetworkSpeed:
@@ -14,55 +34,89 @@ class NetworkSpeed:
         return cls._instance
 
     def __init__(self):
-        self.interval = 1000
-        self.last_total_down_bytes = 0
-        self.last_total_up_bytes = 0
-
-    def get_network_speed(self):
-        lines = exec_shell_command("cat /proc/net/dev").split("\n")
-        total_down_bytes = 0
-        total_up_bytes = 0
-
-        for line in lines:
-            fields = re.split(r"\W+", line.strip())
-            if len(fields) <= 2:
-                continue
+        if hasattr(self, "_initialized"):
+            return
+        self._initialized = True
+
+        self._file = None
+        self._last_read: float | None = None
+        self._lock = threading.Lock()
+
+        self.interfaces: dict[str, InterfaceCounters] = {}
+        self.history: deque[tuple[float, float]] = deque(maxlen=HISTORY_SIZE)
+
+    def read_counters(self) -> dict[str, tuple[int, int]]:
+        """Return the received and sent bytes of every physical interface."""
+        if self._file is None:
+            # Unbuffered, so every seek really re-reads the kernel counters
+            self._file = open("/proc/net/dev", "rb", buffering=0)  # noqa: SIM115
+
+        self._file.seek(0)
+        lines = self._file.readall().decode().splitlines()
 
-            interface = fields[0]
-            try:
-                current_interface_down_bytes = int(fields[1])
-                current_interface_up_bytes = int(fields[9])
-            except ValueError:
+        counters = {}
+
+        # The first two lines are headers
+        for line in lines[2:]:
+            interface, _, data = line.partition(":")
+            interface = interface.strip()
+
+            if IGNORED_INTERFACES.match(interface):
                 continue
 
-            # Skip virtual interfaces or interfaces with invalid byte counts
-            if (
-                interface == "lo"
-                or re.match(r"^ifb[0-9]+", interface)
-                or re.match(r"^lxdbr[0-9]+", interface)
-                or re.match(r"^virbr[0-9]+", interface)
-                or re.match(r"^br[0-9]+", interface)
-                or re.match(r"^vnet[0-9]+", interface)
-                or re.match(r"^tun[0-9]+", interface)
-                or re.match(r"^tap[0-9]+", interface)
-                or current_interface_down_bytes < 0
-                or current_interface_up_bytes < 0
-            ):
+            fields = data.split()
+            if len(fields) < 9:
                 continue
 
-            total_down_bytes += current_interface_down_bytes
-            total_up_bytes += current_interface_up_bytes
+            counters[interface] = (int(fields[0]), int(fields[8]))
+
+        return counters
+
+    def get_network_speed(self) -> dict[str, float]:
+        """Return the total download and upload speed in MB/s since the last call."""
+        with self._lock:
+            counters = self.read_counters()
+            now = time.monotonic()
+            elapsed = now - self._last_read if self._last_read else 0
+            self._last_read = now
+
+            total_download = total_upload = 0.0
+
+            for interface, (down_bytes, up_bytes) in counters.items():
+                previous = self.interfaces.get(interface)
+
+                if previous is None:
+                    self.interfaces[interface] = InterfaceCounters(down_bytes, up_bytes)
+                    continue
+
+                download = upload = 0.0
+                if elapsed > 0:
+                    # Counters go backwards when an interface is reset
+                    download = max(down_bytes - previous.down_bytes, 0) / elapsed
+                    upload = max(up_bytes - previous.up_bytes, 0) / elapsed
+                    download /= BYTES_PER_MB
+                    upload /= BYTES_PER_MB
+
+                previous.down_bytes = down_bytes
+                previous.up_bytes = up_bytes
+                previous.history.append((download, upload))
+
+                total_download += download
+                total_upload += upload
+
+            # Forget interfaces that went away
+            for interface in self.interfaces.keys() - counters.keys():
+                del self.interfaces[interface]
 
-        # Compute the speeds
-        if self.last_total_down_bytes == 0:
-            self.last_total_down_bytes = total_down_bytes
-        if self.last_total_up_bytes == 0:
-            self.last_total_up_bytes = total_up_bytes
+            self.history.append((total_download, total_upload))
 
-        download_speed = (total_down_bytes - self.last_total_down_bytes) / self.interval
-        upload_speed = (total_up_bytes - self.last_total_up_bytes) / self.interval
+        return {"download": total_download, "upload": total_upload}
 
-        self.last_total_down_bytes = total_down_bytes
-        self.last_total_up_bytes = total_up_bytes
+    def get_history(self, interface: str | None = None) -> list[tuple[float, float]]:
+        """Return recent (download, upload) speeds of an interface, or the total."""
+        with self._lock:
+            if interface is None:
+                return list(self.history)
 
-        return {"download": download_speed, "upload": upload_speed}
+            counters = self.interfaces.get(interface)
+            return list(counters.history) if counters else []
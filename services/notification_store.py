@@ -0,0 +1,280 @@
+import glob
+import json
+import os
+import queue
+import threading
+
+from gi.repository import GLib
+from loguru import logger
+
+from utils.colors import Colors
+from utils.constants import (
+    NOTIFICATION_CACHE_FILE,
+    NOTIFICATION_IMAGE_DIRECTORY,
+    NOTIFICATION_JOURNAL_FILE,
+)
+
+# Delay used to batch the journal writes of a burst of notifications
+FLUSH_DELAY_MS = 500
+
+# The journal is rewritten once it holds this many more records than live entries
+COMPACTION_SLACK = 100
+
+# Serialized fields too heavy to keep inline in the journal
+OUT_OF_LINE_KEYS = ("image-pixmap",)
+
+# Marker listing which fields of a stored notification live in their own file
+OUT_OF_LINE_MARKER = "_out_of_line"
+
+
+class NotificationStore:
+    """An append-only journal of serialized notifications.
+
+    Every add, remove and clear is appended as one JSON line by a single writer
+    thread. Bursts are batched, and the journal is compacted with an atomic
+    rename once it holds mostly dead records. Images are kept in their own files,
+    and in memory once read back, which the writer does right after loading.
+    """
+
+    def __init__(
+        self,
+        journal_file: str = NOTIFICATION_JOURNAL_FILE,
+        image_directory: str = NOTIFICATION_IMAGE_DIRECTORY,
+    ):
+        self.journal_file = journal_file
+        self.image_directory = image_directory
+
+        # Live notifications by id, oldest first
+        self.entries: dict[int, dict] = {}
+
+        # Out-of-line fields of live notifications by id, once read or written
+        self._payloads: dict[int, dict] = {}
+
+        self._records = 0
+        self._pending: list[tuple[dict, dict]] = []
+        self._flush_id = None
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="notification-store", daemon=True
+        )
+        self._writer.start()
+
+    def load(self) -> dict[int, dict]:
+        """Replay the journal into `entries`, without deserializing anything."""
+        if not os.path.exists(self.journal_file):
+            self._import_legacy_cache()
+            return self.entries
+
+        try:
+            with open(self.journal_file, "r") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn line left by an interrupted write
+                        logger.warning(
+                            f"{Colors.WARNING}[Notification] Skipping corrupt record"
+                        )
+                        continue
+
+                    self._records += 1
+                    self._apply(record)
+        except OSError as e:
+            logger.exception(f"{Colors.ERROR}[Notification] {e}")
+
+        # Images are read back by the writer, rather than when first shown
+        self._queue.put(("preload", [], None, None))
+        return self.entries
+
+    def add(self, data: dict):
+        self.entries[data["id"]] = data
+        self._append({"op": "add", "data": data})
+
+    def remove(self, id: int):
+        self._payloads.pop(id, None)
+        if self.entries.pop(id, None) is not None:
+            self._append({"op": "remove", "id": id})
+
+    def clear(self):
+        self.entries.clear()
+        self._payloads.clear()
+        self._append({"op": "clear"})
+
+    def resolve(self, data: dict) -> dict:
+        """Return a stored notification with its out-of-line fields read back."""
+        keys = data.get(OUT_OF_LINE_MARKER)
+        if not keys:
+            return data
+
+        resolved = {k: v for k, v in data.items() if k != OUT_OF_LINE_MARKER}
+        payloads = self._payloads.get(data["id"])
+        if payloads is None:
+            # Not preloaded yet
+            payloads = self._read_payloads(data["id"], keys)
+            if data["id"] in self.entries:
+                self._payloads[data["id"]] = payloads
+
+        for key in keys:
+            resolved[key] = payloads.get(key)
+
+        return resolved
+
+    def _read_payloads(self, id: int, keys: list[str]) -> dict:
+        payloads = {}
+        for key in keys:
+            try:
+                with open(self._payload_path(id, key), "r") as file:
+                    payloads[key] = json.load(file)
+            except (OSError, json.JSONDecodeError):
+                payloads[key] = None
+        return payloads
+
+    def _apply(self, record: dict):
+        match record.get("op"):
+            case "add":
+                self.entries[record["data"]["id"]] = record["data"]
+            case "remove":
+                self.entries.pop(record["id"], None)
+            case "clear":
+                self.entries.clear()
+
+    def _import_legacy_cache(self):
+        """Move notifications from the old single JSON file into the journal."""
+        if not os.path.exists(NOTIFICATION_CACHE_FILE):
+            return
+
+        try:
+            with open(NOTIFICATION_CACHE_FILE, "r") as file:
+                notifications = json.load(file)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.exception(f"{Colors.ERROR}[Notification] {e}")
+            return
+
+        # The oldest notification of an app is expected first
+        pending = []
+        for notification in sorted(notifications, key=lambda n: n["id"]):
+            self.entries[notification["id"]] = notification
+            inline, payloads = self._split(notification)
+            pending.append(({"op": "add", "data": inline}, payloads))
+
+        self._records = len(pending)
+        self._queue.put(
+            (
+                "compact",
+                pending,
+                [record for record, _ in pending],
+                NOTIFICATION_CACHE_FILE,
+            )
+        )
+
+    def _split(self, data: dict) -> tuple[dict, dict]:
+        """Split heavy fields out of a notification before it is journaled."""
+        payloads = {key: data[key] for key in OUT_OF_LINE_KEYS if data.get(key)}
+        if not payloads:
+            return data, payloads
+
+        inline = {k: (None if k in payloads else v) for k, v in data.items()}
+        inline[OUT_OF_LINE_MARKER] = [
+            *data.get(OUT_OF_LINE_MARKER, ()),
+            *payloads,
+        ]
+        return inline, payloads
+
+    def _append(self, record: dict):
+        payloads = {}
+        if record["op"] == "add":
+            inline, payloads = self._split(record["data"])
+            record = {"op": "add", "data": inline}
+            if payloads:
+                self._payloads[inline["id"]] = payloads
+
+        self._pending.append((record, payloads))
+
+        if self._flush_id is None:
+            self._flush_id = GLib.timeout_add(FLUSH_DELAY_MS, self._flush)
+
+    def _snapshot(self) -> list[dict]:
+        return [
+            {"op": "add", "data": self._split(data)[0]}
+            for data in self.entries.values()
+        ]
+
+    def _flush(self):
+        self._flush_id = None
+        pending, self._pending = self._pending, []
+        self._records += len(pending)
+
+        if self._records > len(self.entries) + COMPACTION_SLACK:
+            self._queue.put(("compact", pending, self._snapshot(), None))
+            self._records = len(self.entries)
+        else:
+            self._queue.put(("append", pending, None, None))
+
+        return False
+
+    def _payload_path(self, id: int, key: str) -> str:
+        return os.path.join(self.image_directory, f"{id}-{key}.json")
+
+    def _write_loop(self):
+        while True:
+            action, pending, snapshot, legacy_file = self._queue.get()
+            try:
+                if action == "preload":
+                    self._preload_payloads()
+                    continue
+
+                os.makedirs(self.image_directory, exist_ok=True)
+
+                for record, payloads in pending:
+                    self._write_payloads(record, payloads)
+
+                if action == "compact":
+                    self._write_journal(snapshot)
+                    if legacy_file:
+                        os.remove(legacy_file)
+                else:
+                    with open(self.journal_file, "a") as file:
+                        file.write(
+                            "".join(
+                                json.dumps(record, ensure_ascii=False) + "\n"
+                                for record, _ in pending
+                            )
+                        )
+            except OSError as e:
+                logger.warning(f"[Notification] Failed to write journal: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _preload_payloads(self):
+        for id, data in tuple(self.entries.items()):
+            keys = data.get(OUT_OF_LINE_MARKER)
+            if not keys or id in self._payloads:
+                continue
+
+            payloads = self._read_payloads(id, keys)
+            # Skip notifications removed while reading
+            if id in self.entries:
+                self._payloads.setdefault(id, payloads)
+
+    def _write_payloads(self, record: dict, payloads: dict):
+        match record["op"]:
+            case "add":
+                for key, value in payloads.items():
+                    with open(self._payload_path(record["data"]["id"], key), "w") as f:
+                        json.dump(value, f)
+            case "remove":
+                for path in glob.glob(self._payload_path(record["id"], "*")):
+                    os.remove(path)
+            case "clear":
+                for path in glob.glob(os.path.join(self.image_directory, "*.json")):
+                    os.remove(path)
+
+    def _write_journal(self, snapshot: list[dict]):
+        temp_file = f"{self.journal_file}.tmp"
+        with open(temp_file, "w") as file:
+            for record in snapshot:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_file, self.journal_file)
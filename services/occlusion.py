@@ -0,0 +1,171 @@
+import threading
+from typing import Callable, Literal
+
+from fabric.core.service import Service, Signal
+from gi.repository import GLib
+
+from services.hyprland_state import HyprlandStateService
+
+Side = Literal["top", "bottom", "left", "right"]
+
+
+class OcclusionWatch:
+    """A strip along a screen edge, and whether windows currently cover it."""
+
+    __slots__ = ("callback", "occluded", "side", "size")
+
+    def __init__(self, side: Side, size: int, callback: Callable[[bool], None]):
+        self.side = side
+        self.size = size
+        self.callback = callback
+        self.occluded = False
+
+
+class OcclusionService(Service):
+    """Service to tell whether windows cover a strip along an edge of the screen.
+
+    The geometry of windows and of the focused monitor comes from the shared
+    Hyprland state, and is only looked at again after it changed. Watchers are
+    called when their strip becomes covered or uncovered.
+    """
+
+    @Signal
+    def changed(self) -> None:
+        """Signal emitted when the window or monitor geometry changes."""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, **kwargs):
+        if hasattr(self, "_initialized"):
+            return
+        super().__init__(**kwargs)
+        self._initialized = True
+
+        self._state = HyprlandStateService()
+
+        # Mapped windows by address, as (workspace, x1, y1, x2, y2)
+        self._windows: dict[str, tuple[int, int, int, int, int]] = {}
+
+        # The focused monitor, as (x, y, width, height), and its workspace
+        self._screen: tuple[int, int, int, int] | None = None
+        self._workspace = -1
+
+        self._watches: list[OcclusionWatch] = []
+        self._refresh_id = 0
+
+        for signal in (
+            "client-added",
+            "client-removed",
+            "client-moved",
+            "workspace-changed",
+            "monitors-changed",
+        ):
+            self._state.connect(signal, self._schedule_refresh)
+
+        self._refresh()
+
+    def watch(
+        self, side: Side, size: int, callback: Callable[[bool], None]
+    ) -> OcclusionWatch:
+        """Call `callback` now and whenever windows start or stop covering a strip."""
+        watch = OcclusionWatch(side, size, callback)
+        watch.occluded = self.is_occluded(side, size)
+        self._watches.append(watch)
+        callback(watch.occluded)
+        return watch
+
+    def unwatch(self, watch: OcclusionWatch):
+        if watch in self._watches:
+            self._watches.remove(watch)
+
+    def is_occluded(self, side: Side, size: int) -> bool:
+        """Return whether a window of the current workspace overlaps the strip."""
+        if self._screen is None:
+            return False
+
+        x, y, width, height = self._screen
+        match side:
+            case "bottom":
+                region = (x, y + height - size, x + width, y + height)
+            case "top":
+                region = (x, y, x + width, y + size)
+            case "left":
+                region = (x, y, x + size, y + height)
+            case _:
+                region = (x + width - size, y, x + width, y + height)
+
+        occ_x1, occ_y1, occ_x2, occ_y2 = region
+        return any(
+            workspace == self._workspace
+            and not (x2 <= occ_x1 or x1 >= occ_x2 or y2 <= occ_y1 or y1 >= occ_y2)
+            for workspace, x1, y1, x2, y2 in self._windows.values()
+        )
+
+    def _schedule_refresh(self, *_):
+        # Changes come in bursts, look at the geometry once they are all applied
+        if not self._refresh_id:
+            self._refresh_id = GLib.idle_add(self._refresh)
+
+    def _refresh(self, *_):
+        self._refresh_id = 0
+
+        state = (
+            self._read_windows(),
+            self._read_screen(),
+            self._state.active_workspace,
+        )
+        if state != (self._windows, self._screen, self._workspace):
+            self._windows, self._screen, self._workspace = state
+            self._notify()
+
+        return False
+
+    def _read_screen(self) -> tuple[int, int, int, int] | None:
+        monitor = self._state.focused_monitor
+        if monitor is None:
+            return None
+
+        # Windows are positioned in logical pixels, monitors sized in real ones
+        scale = monitor.get("scale") or 1
+        width = round(monitor["width"] / scale)
+        height = round(monitor["height"] / scale)
+        if monitor.get("transform", 0) % 2:
+            width, height = height, width
+
+        return monitor["x"], monitor["y"], width, height
+
+    def _read_windows(self) -> dict[str, tuple[int, int, int, int, int]]:
+        windows = {}
+        for address, client in self._state.clients.items():
+            position, size = client.get("at"), client.get("size")
+            if not client.get("mapped", False) or not position or not size:
+                continue
+
+            x, y = position
+            width, height = size
+            windows[address] = (
+                client.get("workspace", {}).get("id"),
+                x,
+                y,
+                x + width,
+                y + height,
+            )
+
+        return windows
+
+    def _notify(self):
+        self.emit("changed")
+
+        for watch in self._watches:
+            occluded = self.is_occluded(watch.side, watch.size)
+            if occluded != watch.occluded:
+                watch.occluded = occluded
+                watch.callback(occluded)
@@ -0,0 +1,201 @@
+import threading
+import time
+from typing import Any, Callable, Literal
+
+import psutil
+from fabric.core.service import Service
+from gi.repository import GLib
+from loguru import logger
+
+from services.gpu import GpuStats
+from services.networkspeed import NetworkSpeed
+from utils.config import widget_config
+
+Metric = Literal[
+    "cpu_usage", "cpu_freq", "temperature", "memory", "disk", "gpu", "network"
+]
+
+# Default sampling interval of each metric in milliseconds
+DEFAULT_INTERVALS: dict[str, int] = {
+    "cpu_usage": 1000,
+    "cpu_freq": 2000,
+    "temperature": 2000,
+    "memory": 1000,
+    "disk": 10000,
+    "gpu": 1000,
+    "network": 1000,
+}
+
+# How much slower a metric is sampled when none of its widgets are on screen
+IDLE_INTERVAL_FACTOR = 10
+
+
+class StatsSubscription:
+    """A callback interested in a single metric at a given rate."""
+
+    __slots__ = ("callback", "interval", "metric", "visible")
+
+    def __init__(self, metric: str, callback: Callable, interval: int, visible: bool):
+        self.metric = metric
+        self.callback = callback
+        self.interval = interval
+        self.visible = visible
+
+
+class SystemStatsService(Service):
+    """Service to sample system stats, only for the metrics that are subscribed to."""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, **kwargs):
+        if hasattr(self, "_initialized"):
+            return
+        super().__init__(**kwargs)
+        self._initialized = True
+
+        storage_path = widget_config["widgets"]["storage"]["path"]
+
+        # Metrics without a way to read them are None, and never sampled
+        self._samplers: dict[str, Callable[[], Any] | None] = {
+            "cpu_usage": lambda: round(psutil.cpu_percent(), 1),
+            "cpu_freq": psutil.cpu_freq,
+            "temperature": psutil.sensors_temperatures,
+            "memory": psutil.virtual_memory,
+            "disk": lambda: psutil.disk_usage(storage_path),
+            "gpu": (lambda: GpuStats().read()) if GpuStats().available else None,
+            "network": lambda: NetworkSpeed().get_network_speed(),
+        }
+
+        self._subscriptions: dict[str, list[StatsSubscription]] = {
+            metric: [] for metric in self._samplers
+        }
+        self._last_sampled: dict[str, float] = {}
+        self._latest: dict[str, Any] = {}
+
+        self._state_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker: threading.Thread | None = None
+
+    def subscribe(
+        self,
+        metric: Metric,
+        callback: Callable[[Any], None],
+        interval: int | None = None,
+        widget=None,
+    ) -> StatsSubscription:
+        """Call `callback` with fresh values of `metric` every `interval` ms.
+
+        When a widget is given, the rate drops while it is not mapped and the
+        subscription is dropped when it is destroyed.
+        """
+        if metric not in self._samplers:
+            raise KeyError(f"Unknown system stat '{metric}'")
+
+        subscription = StatsSubscription(
+            metric,
+            callback,
+            interval or DEFAULT_INTERVALS[metric],
+            widget.get_mapped() if widget is not None else True,
+        )
+
+        if self._samplers[metric] is None:
+            return subscription
+
+        if widget is not None:
+            widget.connect("map", self._set_visible, subscription, True)
+            widget.connect("unmap", self._set_visible, subscription, False)
+            widget.connect("destroy", lambda *_: self.unsubscribe(subscription))
+
+        with self._state_lock:
+            self._subscriptions[metric].append(subscription)
+
+        # Hand out the last known value so new widgets do not start empty
+        if metric in self._latest:
+            callback(self._latest[metric])
+
+        self._ensure_worker()
+        self._wakeup.set()
+        return subscription
+
+    def unsubscribe(self, subscription: StatsSubscription):
+        with self._state_lock:
+            subscribers = self._subscriptions[subscription.metric]
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+        self._wakeup.set()
+
+    def _set_visible(self, _, subscription: StatsSubscription, visible: bool):
+        subscription.visible = visible
+        self._wakeup.set()
+
+    def _effective_interval(self, metric: str) -> float | None:
+        """Return the interval in seconds a metric should be sampled at."""
+        subscribers = self._subscriptions[metric]
+        if not subscribers:
+            return None
+
+        interval = min(sub.interval for sub in subscribers)
+
+        if not any(sub.visible for sub in subscribers):
+            interval *= IDLE_INTERVAL_FACTOR
+
+        return interval / 1000
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._run, name="system-stats", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            with self._state_lock:
+                intervals = {
+                    metric: self._effective_interval(metric)
+                    for metric in self._subscriptions
+                }
+
+            now = time.monotonic()
+            timeout = None
+
+            for metric, interval in intervals.items():
+                if interval is None:
+                    continue
+
+                due = self._last_sampled.get(metric, 0) + interval
+                if due <= now:
+                    self._sample(metric)
+                    self._last_sampled[metric] = now
+                    due = now + interval
+
+                timeout = due - now if timeout is None else min(timeout, due - now)
+
+            # Sleeps indefinitely when nothing is subscribed
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+
+    def _sample(self, metric: str):
+        try:
+            value = self._samplers[metric]()
+        except Exception as e:
+            logger.warning(f"[SystemStats] Failed to sample '{metric}': {e}")
+            return
+
+        GLib.idle_add(self._dispatch, metric, value)
+
+    def _dispatch(self, metric: str, value: Any):
+        self._latest[metric] = value
+
+        for subscription in tuple(self._subscriptions[metric]):
+            subscription.callback(value)
+
+        return False
@@ -0,0 +1,266 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from gi.repository import GdkPixbuf, GLib
+from loguru import logger
+
+from utils.constants import CLIPHIST_THUMBNAIL_DIRECTORY
+
+# Size of the longest side of a thumbnail, in pixels
+THUMBNAIL_SIZE = 72
+
+# Number of thumbnails kept decoded in memory
+MEMORY_CACHE_SIZE = 64
+
+# Thumbnails on disk are evicted, least recently used first, past this size
+DISK_CACHE_BYTES = 32 * 1024**2
+
+# Delay before saving the index after a burst of new thumbnails, in ms
+SAVE_DELAY_MS = 1000
+
+INDEX_FILE = "index.json"
+
+
+class ThumbnailCache:
+    """A cache of small previews of clipboard images, kept across restarts.
+
+    Thumbnails are stored on disk by hash of the image content, so the same image
+    copied twice is rendered once. An index maps entry ids to those hashes, and
+    the most recently shown thumbnails are kept in memory. Images are decoded at
+    thumbnail size by a small pool of worker threads.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(
+        self,
+        directory: str = CLIPHIST_THUMBNAIL_DIRECTORY,
+        size: int = THUMBNAIL_SIZE,
+        memory_size: int = MEMORY_CACHE_SIZE,
+        disk_bytes: int = DISK_CACHE_BYTES,
+    ):
+        if hasattr(self, "_initialized"):
+            return
+        self._initialized = True
+
+        self.directory = directory
+        self.size = size
+        self.memory_size = memory_size
+        self.disk_bytes = disk_bytes
+
+        # Only touched from the main loop
+        self._memory: OrderedDict[str, GdkPixbuf.Pixbuf] = OrderedDict()
+        self._waiting: dict[str, list[Callable]] = {}
+        self._save_id = 0
+
+        # Entry id to content hash, shared with the workers
+        self._index: dict[str, str] = {}
+        self._index_lock = threading.Lock()
+        self._disk_usage = 0
+
+        # Snapshots of the index are numbered, so an older one never replaces it
+        self._version = 0
+        self._saved_version = 0
+        self._save_lock = threading.Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="thumbnail")
+        self._pool.submit(self._load_index)
+
+    def get(
+        self,
+        key: str,
+        load: Callable[[], bytes],
+        callback: Callable[[GdkPixbuf.Pixbuf | None], None],
+    ) -> GdkPixbuf.Pixbuf | None:
+        """Return the thumbnail of `key` if it is in memory.
+
+        Otherwise it is read from disk, or rendered from the bytes returned by
+        `load`, in a worker, and `callback` is called with it on the main loop.
+        """
+        with self._index_lock:
+            digest = self._index.get(key)
+
+        if digest is not None and digest in self._memory:
+            self._memory.move_to_end(digest)
+            return self._memory[digest]
+
+        if key in self._waiting:
+            self._waiting[key].append(callback)
+        else:
+            self._waiting[key] = [callback]
+            self._pool.submit(self._fetch, key, load)
+
+        return None
+
+    def _fetch(self, key: str, load: Callable[[], bytes]):
+        digest = None
+        pixbuf = None
+        try:
+            with self._index_lock:
+                digest = self._index.get(key)
+
+            if digest is not None:
+                pixbuf = self._read(digest)
+
+            if pixbuf is None:
+                data = load()
+                digest = hashlib.sha1(data).hexdigest()
+                # The same image may already be cached under another entry
+                pixbuf = self._read(digest)
+                if pixbuf is None:
+                    pixbuf = self._render(data)
+                    self._write(digest, pixbuf)
+
+                with self._index_lock:
+                    self._index[key] = digest
+                GLib.idle_add(self._schedule_save)
+        except Exception as e:
+            logger.warning(f"[Cliphist] Failed to make thumbnail for {key}: {e}")
+            pixbuf = None
+
+        GLib.idle_add(self._on_fetched, key, digest, pixbuf)
+
+    def _on_fetched(self, key, digest, pixbuf):
+        if pixbuf is not None:
+            self._memory[digest] = pixbuf
+            self._memory.move_to_end(digest)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+        for callback in self._waiting.pop(key, ()):
+            callback(pixbuf)
+
+        return False
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.png")
+
+    def _render(self, data: bytes) -> GdkPixbuf.Pixbuf:
+        """Decode an image straight to thumbnail size, never at full resolution."""
+
+        def on_size_prepared(loader, width, height):
+            scale = min(self.size / width, self.size / height, 1)
+            loader.set_size(max(int(width * scale), 1), max(int(height * scale), 1))
+
+        loader = GdkPixbuf.PixbufLoader()
+        loader.connect("size-prepared", on_size_prepared)
+        loader.write(data)
+        loader.close()
+        return loader.get_pixbuf()
+
+    def _read(self, digest: str) -> GdkPixbuf.Pixbuf | None:
+        path = self._path(digest)
+        try:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file(path)
+        except GLib.Error:
+            return None
+
+        # The modification time records use, for eviction
+        os.utime(path)
+        return pixbuf
+
+    def _write(self, digest: str, pixbuf: GdkPixbuf.Pixbuf):
+        path = self._path(digest)
+        temp_file = f"{path}.{threading.get_ident()}.tmp"
+        pixbuf.savev(temp_file, "png", [], [])
+        os.replace(temp_file, path)
+
+        with self._index_lock:
+            self._disk_usage += os.path.getsize(path)
+            over_budget = self._disk_usage > self.disk_bytes
+
+        if over_budget:
+            self._evict()
+
+    def _evict(self):
+        """Remove the least recently used thumbnails, down to 3/4 of the budget."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".png"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+
+        usage = sum(size for _, size, _ in entries)
+        removed = set()
+        for _, size, path in entries:
+            if usage <= self.disk_bytes * 3 // 4:
+                break
+            os.remove(path)
+            usage -= size
+            removed.add(os.path.basename(path)[: -len(".png")])
+
+        with self._index_lock:
+            self._disk_usage = usage
+            self._index = {
+                key: digest
+                for key, digest in self._index.items()
+                if digest not in removed
+            }
+        GLib.idle_add(self._schedule_save)
+
+    def _load_index(self):
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE), "r") as file:
+                index = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            index = {}
+
+        usage = sum(
+            entry.stat().st_size
+            for entry in os.scandir(self.directory)
+            if entry.name.endswith(".png")
+        )
+
+        with self._index_lock:
+            # Entries looked up before the index was read take precedence
+            self._index = {**index, **self._index}
+            self._disk_usage = usage
+
+    def _schedule_save(self):
+        # New thumbnails come in bursts while scrolling, saved in one go
+        if not self._save_id:
+            self._save_id = GLib.timeout_add(SAVE_DELAY_MS, self._on_save)
+        return False
+
+    def _on_save(self):
+        self._save_id = 0
+        self._pool.submit(self._save_index)
+        return False
+
+    def _save_index(self):
+        with self._index_lock:
+            self._version += 1
+            version = self._version
+            data = json.dumps(self._index)
+
+        # Written without holding the index, which the main loop reads
+        with self._save_lock:
+            if version < self._saved_version:
+                return
+
+            path = os.path.join(self.directory, INDEX_FILE)
+            temp_file = f"{path}.tmp"
+            try:
+                with open(temp_file, "w") as file:
+                    file.write(data)
+                os.replace(temp_file, path)
+            except OSError as e:
+                logger.warning(f"[Cliphist] Failed to save the thumbnail index: {e}")
+                return
+            self._saved_version = version
@@ -1,8 +1,6 @@
-from functools import partial
-
 from fabric.widgets.circularprogressbar import CircularProgressBar
 
-from utils.bezier import cubic_bezier
+from utils.bezier import bezier_curve
 
 from ..animator import Animator
 
@@ -16,7 +14,7 @@ class AnimatedCircularProgressBar(CircularProgressBar):
         self.animator = (
             Animator(
                 # edit the following parameters to customize the animation
-                timing_function=partial(cubic_bezier, *curve),
+                timing_function=bezier_curve(*curve),
                 duration=duration,
                 min_value=self.min_value,
                 max_value=self.value,
@@ -1,8 +1,6 @@
-from functools import partial
-
 from fabric.widgets.scale import Scale
 
-from utils.bezier import cubic_bezier
+from utils.bezier import bezier_curve
 
 from ..animator import Animator
 from ..widget_container import BaseWidget
@@ -25,7 +23,7 @@ class AnimatedScale(Scale, BaseWidget):
     def animate_value(self, value: float):
         if self.animator is None:
             self.animator = Animator(
-                timing_function=partial(cubic_bezier, *self.curve),
+                timing_function=bezier_curve(*self.curve),
                 duration=self.duration,
                 min_value=self.min_value,
                 max_value=self.value,
@@ -1,14 +1,184 @@
-from typing import Protocol, cast
+import statistics
+import time
+from collections import deque
+from typing import Callable, Protocol, cast
 
 import gi
 from fabric import Property, Service, Signal
 from fabric.utils import clamp
 from gi.repository import GLib, Gtk
+from loguru import logger
 
 from utils.bezier import ease_linear, lerp
 
 gi.require_versions({"Gtk": "3.0"})
 
+# Interval of the shared timer driving animations without a widget, in ms
+TIMER_INTERVAL_MS = 16
+
+# How early in seconds an animation with an interval may run, so that frames
+# arriving slightly before it is due are not skipped
+EARLY_TOLERANCE = 0.004
+
+# Frames whose cost is kept for the statistics
+COST_HISTORY = 120
+
+AnimationCallback = Callable[[float], bool]
+
+
+class AnimationScheduler:
+    """Runs every animation of the bar from as few clocks as possible.
+
+    Animations attached to a widget are driven by the frame clock of its window,
+    with one tick callback per window, and skipped while the widget is not
+    mapped. The others share a single timer. A clock is removed as soon as
+    nothing runs on it, so an idle bar does not wake up at all.
+
+    Callbacks get the current time in seconds and return False once done.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if hasattr(self, "_initialized"):
+            return
+        self._initialized = True
+
+        self._next_id = 0
+        # Animations by id: callback, widget, interval and next due time
+        self._animations: dict[
+            int, tuple[AnimationCallback, Gtk.Widget | None, float, list[float]]
+        ] = {}
+        # Animation ids by clock, a toplevel widget or None for the timer
+        self._clocks: dict[Gtk.Widget | None, set[int]] = {}
+        self._handlers: dict[Gtk.Widget | None, int] = {}
+        self._watched: set[Gtk.Widget] = set()
+
+        self.frames = 0
+        self.costs: deque[float] = deque(maxlen=COST_HISTORY)
+
+    @property
+    def active(self) -> int:
+        return len(self._animations)
+
+    def stats(self) -> dict:
+        """Return the number of running animations and the cost of recent frames."""
+        costs = list(self.costs)
+        return {
+            "active": self.active,
+            "clocks": len(self._clocks),
+            "frames": self.frames,
+            "median_frame_ms": statistics.median(costs) if costs else 0.0,
+            "max_frame_ms": max(costs, default=0.0),
+        }
+
+    def add(
+        self,
+        callback: AnimationCallback,
+        widget: Gtk.Widget | None = None,
+        interval: float = 0,
+    ) -> int:
+        """Run `callback` every frame, or at most every `interval` seconds.
+
+        Returns an id to give to `remove`.
+        """
+        self._next_id += 1
+        animation_id = self._next_id
+        now = GLib.get_monotonic_time() / 1_000_000
+        self._animations[animation_id] = (callback, widget, interval, [now])
+
+        clock = self._clock_of(widget)
+        animations = self._clocks.setdefault(clock, set())
+        animations.add(animation_id)
+
+        if clock not in self._handlers:
+            if clock is None:
+                self._handlers[clock] = GLib.timeout_add(
+                    TIMER_INTERVAL_MS, self._on_tick, None
+                )
+            else:
+                self._handlers[clock] = clock.add_tick_callback(self._on_tick)
+                if clock not in self._watched:
+                    self._watched.add(clock)
+                    clock.connect("destroy", self._on_clock_destroyed)
+
+        return animation_id
+
+    def remove(self, animation_id: int):
+        if self._animations.pop(animation_id, None) is None:
+            return
+
+        for clock, animations in list(self._clocks.items()):
+            if animation_id in animations:
+                animations.discard(animation_id)
+                if not animations:
+                    self._stop_clock(clock)
+                break
+
+    def _clock_of(self, widget: Gtk.Widget | None) -> Gtk.Widget | None:
+        if widget is None:
+            return None
+        toplevel = widget.get_toplevel()
+        # Widgets not in a window yet get their own clock, as the toplevel
+        # they have now is not the one that will be drawn
+        return toplevel if toplevel.is_toplevel() else widget
+
+    def _stop_clock(self, clock: Gtk.Widget | None):
+        del self._clocks[clock]
+        handler = self._handlers.pop(clock)
+        if clock is None:
+            GLib.source_remove(handler)
+        else:
+            clock.remove_tick_callback(handler)
+
+        if not self._clocks:
+            stats = self.stats()
+            logger.debug(
+                f"[Animation] Idle after {stats['frames']} frames, "
+                f"median cost {stats['median_frame_ms']:.2f} ms, "
+                f"max {stats['max_frame_ms']:.2f} ms"
+            )
+
+    def _on_clock_destroyed(self, clock: Gtk.Widget):
+        self._watched.discard(clock)
+        for animation_id in list(self._clocks.get(clock, ())):
+            self.remove(animation_id)
+
+    def _on_tick(self, clock: Gtk.Widget | None, *_):
+        start = time.perf_counter()
+        handler = self._handlers.get(clock)
+        now = GLib.get_monotonic_time() / 1_000_000
+
+        for animation_id in list(self._clocks.get(clock, ())):
+            animation = self._animations.get(animation_id)
+            if animation is None:
+                continue
+            callback, widget, interval, due = animation
+
+            if widget is not None and not widget.get_mapped():
+                continue
+            if now < due[0] - EARLY_TOLERANCE:
+                continue
+            # Keep the pace of the interval, unless far behind it
+            due[0] += interval
+            if due[0] <= now:
+                due[0] = now + interval
+
+            if not callback(now):
+                self.remove(animation_id)
+
+        self.frames += 1
+        self.costs.append((time.perf_counter() - start) * 1000)
+
+        # The handler is already removed if its last animation finished, and may
+        # have been replaced if another one started since
+        return self._handlers.get(clock) == handler
+
 
 class TimingFunctionCallback(Protocol):
     """A callback that takes a progress value and returns a float."""
@@ -161,19 +331,15 @@ class Animator(Service):
         self._timeline_pos = 0.0
         return
 
-    def do_handle_tick(self, *_):
-        current_time = self.do_get_time_now()
+    def do_handle_tick(self, current_time: float) -> bool:
         self.do_update_value(current_time)
-        return True
+        return self._playing
 
     def do_remove_tick_handlers(self):
         if not self._tick_handler:
             return
 
-        if self._tick_widget:
-            self._tick_widget.remove_tick_callback(self._tick_handler)
-        else:
-            GLib.source_remove(self._tick_handler)
+        AnimationScheduler().remove(self._tick_handler)
         self._tick_handler = None
         return
 
@@ -187,13 +353,12 @@ class Animator(Service):
         if self._tick_handler:
             return
 
-        if self._tick_widget:
-            self._tick_handler = self._tick_widget.add_tick_callback(
-                self.do_handle_tick
-            )
-            return
-
-        self._tick_handler = GLib.timeout_add(self._tick_interval, self.do_handle_tick)
+        # Widget animations follow its frame clock, others the shared timer
+        self._tick_handler = AnimationScheduler().add(
+            self.do_handle_tick,
+            self._tick_widget,
+            0 if self._tick_widget else self._tick_interval / 1000,
+        )
         return
 
     def pause(self):
@@ -1,5 +1,3 @@
-from functools import partial
-
 from fabric.core.service import Signal
 from fabric.utils import get_relative_path
 from fabric.widgets.box import Box
@@ -7,7 +5,7 @@ from fabric.widgets.button import Button
 from fabric.widgets.image import Image
 from fabric.widgets.label import Label
 
-from utils.bezier import cubic_bezier
+from utils.bezier import bezier_curve
 from utils.icons import symbolic_icons, text_icons
 from utils.widget_utils import nerd_font_icon, setup_cursor_hover
 
@@ -46,7 +44,7 @@ class ScanButton(HoverButton):
         )
 
         self.scan_animator = Animator(
-            timing_function=partial(cubic_bezier, 0, 0, 1, 1),
+            timing_function=bezier_curve(0, 0, 1, 1),
             duration=4,
             min_value=0,
             max_value=360,
@@ -1,7 +1,11 @@
-from collections.abc import Iterable
-from typing import Literal
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Iterable, Sequence
+from itertools import accumulate
+from typing import Any, Literal
 
 import gi
+from fabric.widgets.box import Box
+from fabric.widgets.scrolledwindow import ScrolledWindow
 from fabric.widgets.widget import Widget
 from gi.repository import Gtk
 
@@ -54,3 +58,250 @@ class ListBox(Gtk.ListBox, Widget):
         for child in self.get_children():
             self.remove(child)
             child.destroy()
+
+
+class VirtualList(ScrolledWindow):
+    """A scrolled list that only creates widgets for the rows in view.
+
+    Rows are made by `row_factory` and recycled as the list scrolls, `bind_row`
+    fills a row with an item. Rows out of view are replaced by two spacers, sized
+    with the measured height of each item, or `row_height` until it is measured.
+    """
+
+    def __init__(
+        self,
+        row_factory: Callable[[], Gtk.Widget],
+        bind_row: Callable[[Gtk.Widget, Any, int], None],
+        row_height: int,
+        spacing: int = 0,
+        overscan: int = 2,
+        placeholder: Gtk.Widget | None = None,
+        list_name: str | None = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+
+        self._row_factory = row_factory
+        self._bind_row = bind_row
+        self._row_height = row_height
+        self._spacing = spacing
+        self._overscan = overscan
+        self._placeholder = placeholder
+
+        self.items: list = []
+        self.selected_index = -1
+
+        # Measured heights by item, and the y offset of every row
+        self._heights: dict = {}
+        self._offsets: Sequence[int] = [0]
+
+        # Rows showing an item by index, and unused rows ready to be bound
+        self._visible: dict[int, Gtk.Widget] = {}
+        self._pool: list[Gtk.Widget] = []
+        self._row_items: dict[Gtk.Widget, Any] = {}
+
+        self._top_spacer = Box()
+        self._bottom_spacer = Box()
+        self._rows = Box(name=list_name, orientation="v", spacing=spacing)
+
+        content = Box(orientation="v", children=[self._top_spacer, self._rows])
+        if placeholder is not None:
+            content.add(placeholder)
+        content.add(self._bottom_spacer)
+        self.add(content)
+
+        adjustment = self.get_vadjustment()
+        adjustment.connect("value-changed", self._update_window)
+        adjustment.connect("changed", self._update_window)
+
+        self._update_window()
+
+    @property
+    def selected_item(self) -> Any | None:
+        if self.selected_index == -1:
+            return None
+        return self.items[self.selected_index]
+
+    def get_item(self, row: Gtk.Widget) -> Any | None:
+        """Return the item a row is currently bound to."""
+        return self._row_items.get(row)
+
+    def row_changed(self, row: Gtk.Widget) -> None:
+        """Measure a row again, when its content changed size after binding."""
+        item = self._row_items.get(row)
+        if item is not None and self._measure(row, item):
+            self._offsets = self._compute_offsets()
+            self._update_window()
+
+    def set_items(self, items: Iterable) -> None:
+        """Show new items from the top, only the rows in view are bound again."""
+        self.items = list(items)
+        self.selected_index = -1
+        self._items_changed()
+        self.get_vadjustment().set_value(0)
+        self._update_window()
+
+    def insert_item(self, index: int, item) -> None:
+        self.items.insert(index, item)
+        if self.selected_index >= index:
+            self.selected_index += 1
+        self._items_changed()
+        self._update_window()
+
+    def remove_item(self, index: int) -> None:
+        del self.items[index]
+        if self.selected_index == index:
+            self.selected_index = -1
+        elif self.selected_index > index:
+            self.selected_index -= 1
+        self._items_changed()
+        self._update_window()
+
+    def select(self, index: int) -> None:
+        """Highlight the row of an item and scroll it into view, -1 to unselect."""
+        if (row := self._visible.get(self.selected_index)) is not None:
+            row.get_style_context().remove_class("selected")
+
+        self.selected_index = index if 0 <= index < len(self.items) else -1
+        if self.selected_index == -1:
+            return
+
+        self.scroll_to(index)
+        if (row := self._visible.get(index)) is not None:
+            row.get_style_context().add_class("selected")
+
+    def move_selection(self, delta: int) -> None:
+        if not self.items:
+            return
+
+        # Allow starting selection from nothing
+        if self.selected_index == -1 and delta == 1:
+            index = 0
+        else:
+            index = self.selected_index + delta
+
+        self.select(max(0, min(index, len(self.items) - 1)))
+
+    def scroll_to(self, index: int) -> None:
+        """Scroll the least needed to show an item entirely."""
+        adjustment = self.get_vadjustment()
+        top = self._offsets[index]
+        bottom = self._offsets[index + 1] - self._spacing
+        page = adjustment.get_page_size()
+        value = adjustment.get_value()
+
+        if top < value:
+            adjustment.set_value(top)
+        elif bottom > value + page:
+            adjustment.set_value(bottom - page)
+
+    def _items_changed(self):
+        # Drop heights of items that are gone, and unbind every row
+        self._heights = {
+            item: self._heights[item] for item in self.items if item in self._heights
+        }
+        self._offsets = self._compute_offsets()
+        self._pool.extend(self._visible.values())
+        self._visible = {}
+
+        if self._placeholder is not None:
+            self._placeholder.set_visible(not self.items)
+
+    def _compute_offsets(self) -> Sequence[int]:
+        if not self._heights:
+            # A range bisects like a list, without building one for every item
+            step = self._row_height + self._spacing
+            return range(0, (len(self.items) + 1) * step, step)
+
+        return list(
+            accumulate(
+                (
+                    self._heights.get(item, self._row_height) + self._spacing
+                    for item in self.items
+                ),
+                initial=0,
+            )
+        )
+
+    def _update_window(self, *_):
+        adjustment = self.get_vadjustment()
+        value = adjustment.get_value()
+        page = adjustment.get_page_size() or max(self.get_min_content_height(), 0)
+
+        count = len(self.items)
+        first = max(bisect_right(self._offsets, value) - 1 - self._overscan, 0)
+        last = min(bisect_left(self._offsets, value + page) + self._overscan, count)
+        window = range(first, last)
+
+        # Rows still in the window keep their item, the others are recycled
+        visible = {}
+        for index, row in self._visible.items():
+            if index in window:
+                visible[index] = row
+            else:
+                self._pool.append(row)
+
+        measured = False
+        for index in window:
+            if index in visible:
+                continue
+
+            row = self._pool.pop() if self._pool else self._new_row()
+            visible[index] = row
+            self._bind(row, index)
+            measured |= self._measure(row, self.items[index])
+
+        for row in self._pool:
+            row.set_visible(False)
+            self._row_items.pop(row, None)
+
+        self._visible = visible
+        self._reorder_rows(window)
+
+        if measured:
+            self._offsets = self._compute_offsets()
+
+        self._top_spacer.set_size_request(-1, self._offsets[first])
+        self._bottom_spacer.set_size_request(
+            -1, self._offsets[count] - self._offsets[last]
+        )
+
+    def _new_row(self) -> Gtk.Widget:
+        row = self._row_factory()
+        self._rows.add(row)
+        return row
+
+    def _bind(self, row: Gtk.Widget, index: int):
+        item = self.items[index]
+        self._row_items[row] = item
+        self._bind_row(row, item, index)
+
+        style_context = row.get_style_context()
+        if index == self.selected_index:
+            style_context.add_class("selected")
+        else:
+            style_context.remove_class("selected")
+
+        row.set_visible(True)
+
+    def _measure(self, row: Gtk.Widget, item) -> bool:
+        """Record the height of a bound row, return whether it changed."""
+        width = self._rows.get_allocated_width()
+        if width > 1:
+            _, height = row.get_preferred_height_for_width(width)
+        else:
+            _, height = row.get_preferred_height()
+
+        if self._heights.get(item, self._row_height) == height:
+            return False
+
+        self._heights[item] = height
+        return True
+
+    def _reorder_rows(self, window: range):
+        children = self._rows.get_children()
+        for position, index in enumerate(window):
+            row = self._visible[index]
+            if position >= len(children) or children[position] is not row:
+                self._rows.reorder_child(row, position)
+                children = self._rows.get_children()
@@ -1,15 +1,142 @@
-from typing import Literal
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Literal
 
 import cairo
 import gi
 from fabric.widgets.widget import Widget
 from gi.repository import GLib, Gtk
+from loguru import logger
 from rlottie_python.rlottie_wrapper import LottieAnimation
 
+from .animator import AnimationScheduler
 from .widget_container import BaseWidget
 
 gi.require_versions({"Gtk": "3.0"})
 
+# Memory the pre-rendered frames of all animations may take, in bytes
+FRAME_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class LottieFrameCache:
+    """Pre-rendered frames of Lottie animations, by animation and size.
+
+    Frames are rendered in order by a worker thread and kept as cairo surfaces,
+    so widgets only paint them. The least recently used animations are dropped
+    once the cache exceeds `FRAME_CACHE_MAX_BYTES`.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if hasattr(self, "_initialized"):
+            return
+        self._initialized = True
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="lottie-frames"
+        )
+        # Frames by (animation id, width, height), each None until rendered.
+        # The animation is kept along, so its id is not reused meanwhile
+        self._frames: OrderedDict[
+            tuple[int, int, int],
+            tuple[LottieAnimation, list[cairo.ImageSurface | None]],
+        ] = OrderedDict()
+        self.size = 0
+
+        # Callbacks waiting for a frame, by animation id, width, height and frame
+        self._waiters: dict[tuple[int, int, int, int], list[Callable]] = {}
+        self._waiters_lock = threading.Lock()
+
+    def frames(
+        self, animation: LottieAnimation, width: int, height: int
+    ) -> list[cairo.ImageSurface | None] | None:
+        """Return the frames of an animation at a size, rendering them if needed.
+
+        Frames not rendered yet are None. Returns None if the animation alone
+        would not fit in the cache.
+        """
+        key = (id(animation), width, height)
+        if key in self._frames:
+            self._frames.move_to_end(key)
+            return self._frames[key][1]
+
+        frame_size = width * height * 4
+        total_frames = animation.lottie_animation_get_totalframe()
+        if frame_size * total_frames > FRAME_CACHE_MAX_BYTES:
+            logger.debug(f"[Lottie] Animation too large to cache at {width}x{height}")
+            return None
+
+        frames: list[cairo.ImageSurface | None] = [None] * total_frames
+        self._frames[key] = (animation, frames)
+        self.size += frame_size * total_frames
+
+        while self.size > FRAME_CACHE_MAX_BYTES:
+            (_, old_width, old_height), (_, old_frames) = self._frames.popitem(
+                last=False
+            )
+            self.size -= old_width * old_height * 4 * len(old_frames)
+
+        self._executor.submit(self._render, key, animation, frames)
+        return frames
+
+    def when_rendered(
+        self,
+        animation: LottieAnimation,
+        width: int,
+        height: int,
+        frame: int,
+        callback: Callable[[], bool],
+    ):
+        """Call `callback` from the main loop once the worker rendered a frame."""
+        key = (id(animation), width, height)
+        with self._waiters_lock:
+            cached = self._frames.get(key)
+            if cached is not None and cached[1][frame] is None:
+                self._waiters.setdefault((*key, frame), []).append(callback)
+                return
+
+        GLib.idle_add(callback)
+
+    def _notify(self, key: tuple[int, int, int], frames: range):
+        with self._waiters_lock:
+            callbacks = [
+                callback
+                for frame in frames
+                for callback in self._waiters.pop((*key, frame), ())
+            ]
+
+        for callback in callbacks:
+            GLib.idle_add(callback)
+
+    def _render(
+        self,
+        key: tuple[int, int, int],
+        animation: LottieAnimation,
+        frames: list[cairo.ImageSurface | None],
+    ):
+        _, width, height = key
+        for frame in range(len(frames)):
+            # Stop working on animations dropped from the cache, the frames
+            # waited for are then asked for again
+            if key not in self._frames:
+                self._notify(key, range(frame, len(frames)))
+                return
+
+            buffer = animation.lottie_animation_render(
+                frame, width=width, height=height
+            )
+            frames[frame] = cairo.ImageSurface.create_for_data(
+                bytearray(buffer), cairo.FORMAT_ARGB32, width, height, width * 4
+            )
+            self._notify(key, range(frame, frame + 1))
+
 
 class LottieAnimationWidget(Gtk.DrawingArea, BaseWidget):
     """A widget to display a Lottie animation."""
@@ -20,6 +147,7 @@ class LottieAnimationWidget(Gtk.DrawingArea, BaseWidget):
         scale: float = 1.0,
         do_loop: bool = False,
         draw_frame: int | None = None,
+        cache_frames: bool = False,
         visible: bool = True,
         all_visible: bool = False,
         style: str | None = None,
@@ -63,6 +191,8 @@ class LottieAnimationWidget(Gtk.DrawingArea, BaseWidget):
 
         self.do_loop: bool = do_loop
         self.lottie_animation: LottieAnimation = lottie_animation
+        self.cache_frames = cache_frames
+        self._surface: cairo.ImageSurface | None = None
 
         # LOTTIE STUFF
         self.anim_total_duration: int = (
@@ -90,10 +220,20 @@ class LottieAnimationWidget(Gtk.DrawingArea, BaseWidget):
 
     def play_loop(self):
         self.do_loop = True
-        self.timeout = GLib.timeout_add(self.timeout_delay, self.on_update)
+        self.start_timer()
+
+    def start_timer(self):
+        # Frames are rendered on the frame clock, at the animation's framerate
+        self.stop_play()
+        self.timeout = AnimationScheduler().add(
+            self.on_update, self, self.timeout_delay / 1000
+        )
 
     def draw(self, _: Gtk.DrawingArea, ctx: cairo.Context):
-        if self.lottie_animation.async_buffer_c is not None:
+        if self._surface is not None:
+            ctx.set_source_surface(self._surface, 0, 0)
+            ctx.paint()
+        elif self.lottie_animation.async_buffer_c is not None:
             image_surface = cairo.ImageSurface.create_for_data(
                 # Using this because the actual buffer is read only
                 self.lottie_animation.async_buffer_c,
@@ -111,13 +251,49 @@ class LottieAnimationWidget(Gtk.DrawingArea, BaseWidget):
             window.set_pass_through(True)
         return
 
-    def on_update(self):
-        self.is_playing = True
-        self.lottie_animation.lottie_animation_render_async(
-            self.curr_frame, width=self.width, height=self.height
+    def render_frame(self) -> bool:
+        """Prepare the current frame for drawing, returns False if not ready yet."""
+        frames = (
+            LottieFrameCache().frames(self.lottie_animation, self.width, self.height)
+            if self.cache_frames
+            else None
         )
 
-        self.lottie_animation.lottie_animation_render_flush()
+        if frames is None:
+            self.lottie_animation.lottie_animation_render_async(
+                self.curr_frame, width=self.width, height=self.height
+            )
+            self.lottie_animation.lottie_animation_render_flush()
+            return True
+
+        frame = min(self.curr_frame, len(frames) - 1)
+        surface = frames[frame]
+        if surface is None:
+            # Nothing calls again for a frame drawn once, the worker does when
+            # it rendered it. The animation is not rendered from two threads
+            if self.timeout is None:
+                LottieFrameCache().when_rendered(
+                    self.lottie_animation,
+                    self.width,
+                    self.height,
+                    frame,
+                    self._on_frame_rendered,
+                )
+            return False
+        self._surface = surface
+        return True
+
+    def _on_frame_rendered(self):
+        # A timer started since draws the frames itself
+        if self.timeout is None:
+            self.on_update()
+        return False
+
+    def on_update(self, *_):
+        self.is_playing = True
+        # Wait for the worker to render the frame, without moving on
+        if not self.render_frame():
+            return True
         self.queue_draw()
 
         if self.do_reverse and self.curr_frame <= self.end_frame:
@@ -132,7 +308,9 @@ class LottieAnimationWidget(Gtk.DrawingArea, BaseWidget):
         return True
 
     def stop_play(self):
-        GLib.source_remove(self.timeout)
+        if self.timeout is not None:
+            AnimationScheduler().remove(self.timeout)
+            self.timeout = None
 
     def play_animation(
         self,
@@ -154,4 +332,4 @@ class LottieAnimationWidget(Gtk.DrawingArea, BaseWidget):
             end_frame if end_frame else 0 if self.do_reverse else self.anim_total_frames
         )
         # self.curr_frame = self.anim_total_frames if self.is_reverse else 0
-        self.timeout = GLib.timeout_add(self.timeout_delay, self.on_update)
+        self.start_timer()
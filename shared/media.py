@@ -1,9 +1,6 @@
 import os
 import re
-import tempfile
 import urllib.parse
-import urllib.request
-from functools import partial
 from typing import List
 
 from fabric.utils import (
@@ -20,18 +17,18 @@ from fabric.widgets.label import Label
 from fabric.widgets.overlay import Overlay
 from fabric.widgets.scale import Scale
 from fabric.widgets.stack import Stack
-from gi.repository import GLib, GObject
+from gi.repository import GObject
 from loguru import logger
 
+from services.artwork_cache import ArtworkCache
 from services.mpris import MprisPlayer, MprisPlayerManager
 from shared.animator import Animator
 from shared.buttons import HoverButton
 from shared.circle_image import CircleImage
-from utils.bezier import cubic_bezier
+from utils.bezier import bezier_curve
 from utils.constants import APP_CACHE_DIRECTORY
 from utils.functions import (
     ensure_directory,
-    get_simple_palette_threaded,
     mix_colors,
     rgb_to_css,
     tint_color,
@@ -199,6 +196,7 @@ class PlayerBox(Box):
         # State
         self.exit = False
         self.angle_direction = 1
+        self._art_source = None
         self.skipped = False
 
         self.image_box = CircleImage(
@@ -211,7 +209,7 @@ class PlayerBox(Box):
         self.image_stack.children = [*self.image_stack.children, self.image_box]
 
         self.art_animator = Animator(
-            timing_function=partial(cubic_bezier, 0, 0, 1, 1),
+            timing_function=bezier_curve(0, 0, 1, 1),
             duration=8,
             min_value=0,
             max_value=360,
@@ -485,73 +483,67 @@ class PlayerBox(Box):
                 text_icons["mpris"]["paused"],
             )
 
-    def _update_image(self, image_path):
+    def _update_image(self, image_path, palette=None):
         if image_path and os.path.isfile(image_path):
             self.image_box.set_image_from_file(image_path)
-            self.update_colors(image_path)
+            self.update_colors(palette)
         else:
+            # The fallback cover's palette is cached like any artwork
             self.image_box.set_image_from_file(self.fallback_cover_path)
-            self.update_colors(self.fallback_cover_path)
-
-    def update_colors(self, image_path):
-        def on_accent_color(palette):
-            default_color = (255, 0, 0)  # fallback color
+            ArtworkCache().get(
+                self.fallback_cover_path, lambda _, palette: self.update_colors(palette)
+            )
 
-            base_color = palette[0] if palette else default_color
-            mix_target = (247, 239, 209)  # #F7EFD1
+    def update_colors(self, palette):
+        default_color = (255, 0, 0)  # fallback color
 
-            # Mix base color with the target color
-            mixed_color = mix_colors(base_color, mix_target, 0.5)
-            # Then apply a tint to lighten it a bit more (e.g., 20%)
-            tinted_color = tint_color(mixed_color, 0.2)
+        base_color = palette[0] if palette else default_color
+        mix_target = (247, 239, 209)  # #F7EFD1
 
-            mixed_css_color = rgb_to_css(tinted_color)
+        # Mix base color with the target color
+        mixed_color = mix_colors(base_color, mix_target, 0.5)
+        # Then apply a tint to lighten it a bit more (e.g., 20%)
+        tinted_color = tint_color(mixed_color, 0.2)
 
-            bg = f"background-color: {mixed_css_color};"
-            border = f"border-color: {mixed_css_color};"
+        mixed_css_color = rgb_to_css(tinted_color)
 
-            self.seek_bar.set_style(
-                f"trough highlight {{ {bg} {border} }} slider {{ {bg} }}"
-            )
+        bg = f"background-color: {mixed_css_color};"
+        border = f"border-color: {mixed_css_color};"
 
-            css_colors = [rgb_to_css(color) for color in palette]
-            gradient = f"linear-gradient(135deg, {', '.join(css_colors)})"
+        self.seek_bar.set_style(
+            f"trough highlight {{ {bg} {border} }} slider {{ {bg} }}"
+        )
 
-            self.inner_box.set_style(f"background: {gradient};")
+        css_colors = [rgb_to_css(color) for color in palette or [default_color]]
+        gradient = f"linear-gradient(135deg, {', '.join(css_colors)})"
 
-        get_simple_palette_threaded(
-            image_path=image_path, color_count=5, callback=on_accent_color
-        )
+        self.inner_box.set_style(f"background: {gradient};")
 
     def _set_image(self, *_):
         art_url = self.player.arturl
 
         parsed = urllib.parse.urlparse(art_url)
         if parsed.scheme == "file":
-            local_arturl = urllib.parse.unquote(parsed.path)
-            self._update_image(local_arturl)
-        elif parsed.scheme in ("http", "https"):
-            GLib.Thread.new("download-artwork", self._download_and_set_artwork, art_url)
+            source = urllib.parse.unquote(parsed.path)
         else:
-            self._update_image(art_url)
-
-    def _download_and_set_artwork(self, arturl):
-        """
-        Download the artwork from the given URL asynchronously and update the cover
-        using GLib.idle_add to ensure UI updates occur on the main thread.
-        """
-        try:
-            parsed = urllib.parse.urlparse(arturl)
-            suffix = os.path.splitext(parsed.path)[1] or ".png"
-            with urllib.request.urlopen(arturl) as response:
-                data = response.read()
-            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-                temp_file.write(data)
-                local_arturl = temp_file.name
-        except Exception:
-            local_arturl = self.fallback_cover_path
-        GLib.idle_add(self._update_image, local_arturl)
-        return None
+            source = art_url
+
+        if not source:
+            self._art_source = None
+            self._update_image(None)
+            return
+
+        # Downloads and palettes are cached, metadata changes only look them up
+        self._art_source = source
+        ArtworkCache().get(
+            source, lambda path, palette: self._on_artwork(source, path, palette)
+        )
+
+    def _on_artwork(self, source, path, palette):
+        # The track changed again while the artwork was fetched
+        if source != self._art_source:
+            return
+        self._update_image(path, palette)
 
     def _move_seekbar(self, *_):
         if self.player is None or self.exit:
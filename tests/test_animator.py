@@ -0,0 +1,94 @@
+import unittest
+from unittest import mock
+
+from shared import animator
+from shared.animator import EARLY_TOLERANCE, AnimationScheduler
+
+# Interval between ticks of the shared timer, in microseconds
+TICK_US = animator.TIMER_INTERVAL_MS * 1000
+
+
+class AnimationSchedulerTest(unittest.TestCase):
+    """Test suite for the pacing of animations on the shared clocks."""
+
+    def setUp(self):
+        # A scheduler of its own for every test, rather than the shared one
+        AnimationScheduler._instance = None
+        self.addCleanup(setattr, AnimationScheduler, "_instance", None)
+
+        self.now_us = 0
+        glib = mock.patch.object(animator, "GLib")
+        self.glib = glib.start()
+        self.addCleanup(glib.stop)
+        self.glib.get_monotonic_time.side_effect = lambda: self.now_us
+        self.glib.timeout_add.return_value = 1
+
+        self.scheduler = AnimationScheduler()
+        self.calls: list[float] = []
+
+    def callback(self, now: float) -> bool:
+        self.calls.append(now)
+        return True
+
+    def tick(self, count: int = 1, clock=None, step_us: int = TICK_US):
+        for _ in range(count):
+            self.now_us += step_us
+            self.scheduler._on_tick(clock)
+
+    def test_animations_without_interval_run_every_tick(self):
+        self.scheduler.add(self.callback)
+        self.tick(10)
+        self.assertEqual(len(self.calls), 10)
+
+    def test_interval_is_paced(self):
+        self.scheduler.add(self.callback, interval=0.1)
+        self.tick(31)
+
+        # Half a second of ticks, run about every 100 ms from when it was added
+        self.assertEqual(len(self.calls), 6)
+        for previous, current in zip(self.calls[1:], self.calls[2:]):
+            self.assertGreaterEqual(current - previous, 0.1 - 2 * EARLY_TOLERANCE)
+            self.assertLess(current - previous, 0.1 + animator.TIMER_INTERVAL_MS / 1000)
+
+    def test_late_animations_do_not_catch_up(self):
+        self.scheduler.add(self.callback, interval=0.1)
+        self.tick()
+        # A second without ticks runs the animation once, not ten times
+        self.tick(step_us=1_000_000)
+        self.tick()
+
+        self.assertEqual(len(self.calls), 2)
+
+    def test_finished_animations_stop_the_timer(self):
+        self.scheduler.add(lambda now: False)
+        self.assertEqual(self.scheduler.active, 1)
+
+        self.assertFalse(self.scheduler._on_tick(None))
+        self.assertEqual(self.scheduler.active, 0)
+        self.glib.source_remove.assert_called_once_with(1)
+
+    def test_removed_animations_do_not_run(self):
+        animation_id = self.scheduler.add(self.callback)
+        self.scheduler.remove(animation_id)
+        self.tick()
+
+        self.assertEqual(self.calls, [])
+        self.assertEqual(self.scheduler.stats()["clocks"], 0)
+
+    def test_unmapped_widgets_are_skipped(self):
+        widget = mock.Mock()
+        widget.get_mapped.return_value = False
+        toplevel = widget.get_toplevel.return_value
+        toplevel.add_tick_callback.return_value = 1
+
+        self.scheduler.add(self.callback, widget)
+        self.tick(clock=toplevel)
+        self.assertEqual(self.calls, [])
+
+        widget.get_mapped.return_value = True
+        self.tick(clock=toplevel)
+        self.assertEqual(len(self.calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from services import artwork_cache
+from services.artwork_cache import ArtworkCache
+
+PALETTE = [(10, 20, 30), (40, 50, 60)]
+
+
+class ArtworkCacheTest(unittest.TestCase):
+    """Test suite for the artwork cache eviction and freshness."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        # A cache of its own for every test, rather than the shared one
+        ArtworkCache._instance = None
+        self.addCleanup(setattr, ArtworkCache, "_instance", None)
+
+        palette = mock.patch.object(
+            artwork_cache, "get_simple_palette", return_value=PALETTE
+        )
+        self.get_simple_palette = palette.start()
+        self.addCleanup(palette.stop)
+
+        self.cache = ArtworkCache(os.path.join(self.directory.name, "cache"))
+        self.addCleanup(self.cache._pool.shutdown)
+
+    def make_artwork(self, name: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "wb") as file:
+            file.write(b"artwork")
+        return path
+
+    def get(self, source: str) -> tuple:
+        """Return what the cache calls back with, fetching in this thread."""
+        results = []
+        with (
+            mock.patch.object(self.cache._pool, "submit", self.submit),
+            mock.patch.object(artwork_cache.GLib, "idle_add", self.idle_add),
+        ):
+            self.cache.get(source, lambda *result: results.append(result))
+        return results[0]
+
+    def idle_add(self, function, *args):
+        function(*args)
+
+    def submit(self, function, *args):
+        function(*args)
+
+    def test_local_artwork_is_fetched_once(self):
+        artwork = self.make_artwork("cover.png")
+
+        self.assertEqual(self.get(artwork), (artwork, PALETTE))
+        self.assertEqual(self.get(artwork), (artwork, PALETTE))
+        self.assertEqual(self.get_simple_palette.call_count, 1)
+
+    def test_local_artwork_is_stale_once_modified(self):
+        artwork = self.make_artwork("cover.png")
+        self.get(artwork)
+
+        (entry,) = self.cache._index.values()
+        os.utime(artwork, (0, entry["mtime"] + 10))
+        self.assertFalse(self.cache._is_fresh(entry))
+
+        self.get(artwork)
+        self.assertEqual(self.get_simple_palette.call_count, 2)
+
+    def test_downloaded_artwork_is_revalidated(self):
+        with open(os.path.join(self.cache.directory, "remote.png"), "wb") as file:
+            file.write(b"artwork")
+        entry = {
+            "source": "https://example.com/remote.png",
+            "file": "remote.png",
+            "palette": PALETTE,
+            "checked": time.time(),
+        }
+        self.assertTrue(self.cache._is_fresh(entry))
+
+        entry["checked"] -= artwork_cache.REVALIDATE_SECONDS + 1
+        self.assertFalse(self.cache._is_fresh(entry))
+
+    def test_missing_download_is_stale(self):
+        entry = {
+            "source": "https://example.com/remote.png",
+            "file": "remote.png",
+            "palette": PALETTE,
+            "checked": time.time(),
+        }
+        self.assertFalse(self.cache._is_fresh(entry))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        artworks = [self.make_artwork(f"cover-{index}.png") for index in range(3)]
+
+        with mock.patch.object(artwork_cache, "MAX_ENTRIES", 2):
+            self.get(artworks[0])
+            self.get(artworks[1])
+            # Used again, so the second one is now the least recently used
+            self.get(artworks[0])
+            self.get(artworks[2])
+
+        sources = {entry["source"] for entry in self.cache._index.values()}
+        self.assertEqual(sources, {artworks[0], artworks[2]})
+
+    def test_evicted_downloads_are_deleted(self):
+        for index, used in enumerate((3, 1, 2)):
+            path = os.path.join(self.cache.directory, f"{index}.png")
+            with open(path, "wb") as file:
+                file.write(b"artwork")
+            self.cache._index[str(index)] = {
+                "source": f"https://example.com/{index}.png",
+                "file": f"{index}.png",
+                "size": 100,
+                "used": used,
+            }
+
+        with mock.patch.object(artwork_cache, "DISK_CACHE_BYTES", 200):
+            self.cache._evict()
+
+        self.assertEqual(set(self.cache._index), {"0", "2"})
+        self.assertFalse(os.path.exists(os.path.join(self.cache.directory, "1.png")))
+
+    def test_index_is_kept_across_restarts(self):
+        artwork = self.make_artwork("cover.png")
+        self.get(artwork)
+
+        ArtworkCache._instance = None
+        self.cache = ArtworkCache(self.cache.directory)
+        self.addCleanup(self.cache._pool.shutdown)
+
+        self.assertEqual(self.get(artwork), (artwork, PALETTE))
+        self.assertEqual(self.get_simple_palette.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from utils import bezier
+from utils.bezier import BezierCurve, bezier_curve, cubic_bezier, solve_cubic_bezier
+
+CURVES = (
+    (0.4, 0, 0.2, 1),
+    (0, 0, 0.2, 1),
+    (0.4, 0, 1, 1),
+    (0.68, -0.6, 0.32, 1.6),
+)
+
+
+class BezierCurveTest(unittest.TestCase):
+    """Test suite for the bezier easing lookup tables."""
+
+    def setUp(self):
+        # Curves made by other tests do not count towards the registry bound
+        bezier._curves.clear()
+
+    def test_table_matches_the_solved_curve(self):
+        for points in CURVES:
+            curve = BezierCurve(*points)
+            for step in range(1001):
+                progress = step / 1000
+                self.assertAlmostEqual(
+                    curve(progress),
+                    solve_cubic_bezier(*points, progress),
+                    delta=1e-3,
+                    msg=f"{points} at {progress}",
+                )
+
+    def test_ends_are_exact(self):
+        curve = BezierCurve(0.4, 0, 0.2, 1)
+        self.assertEqual(curve(0.0), 0.0)
+        self.assertEqual(curve(1.0), 1.0)
+
+    def test_progress_is_clamped(self):
+        curve = BezierCurve(0.4, 0, 0.2, 1)
+        self.assertEqual(curve(-0.5), 0.0)
+        self.assertEqual(curve(1.5), 1.0)
+
+    def test_linear_curve(self):
+        for step in range(11):
+            self.assertAlmostEqual(bezier.ease_linear(step / 10), step / 10, places=3)
+
+    def test_cubic_bezier_matches_the_curve(self):
+        self.assertEqual(
+            cubic_bezier(0.4, 0, 0.2, 1, 0.3), BezierCurve(0.4, 0, 0.2, 1)(0.3)
+        )
+
+    def test_curves_are_shared(self):
+        self.assertIs(bezier_curve(0.4, 0, 0.2, 1), bezier_curve(0.4, 0, 0.2, 1))
+
+    def test_registry_is_bounded(self):
+        first = bezier_curve(0, 0, 0, 0.01)
+        for index in range(1, bezier.MAX_CURVES + 10):
+            bezier_curve(0, 0, 0, index / 100)
+
+        self.assertEqual(len(bezier._curves), bezier.MAX_CURVES)
+        self.assertIsNot(bezier_curve(0, 0, 0, 0.01), first)
+
+    def test_recently_used_curves_are_kept(self):
+        first = bezier_curve(0, 0, 0, 0.01)
+        for index in range(2, bezier.MAX_CURVES + 10):
+            bezier_curve(0, 0, 0, index / 100)
+            # Used every frame, so never the least recently used
+            self.assertIs(bezier_curve(0, 0, 0, 0.01), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
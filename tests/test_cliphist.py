@@ -0,0 +1,98 @@
+import unittest
+
+from services.cliphist import ClipHistory, ClipItem
+
+
+def make_items(*contents: str, first_id: int = 1) -> list[ClipItem]:
+    """Return entries as cliphist lists them, newest first."""
+    count = len(contents)
+    return [
+        ClipItem(f"{first_id + count - 1 - position}\t{content}")
+        for position, content in enumerate(contents)
+    ]
+
+
+class ClipHistoryTest(unittest.TestCase):
+    """Test suite for the clipboard history search."""
+
+    def setUp(self):
+        self.history = ClipHistory()
+        self.history.set(
+            make_items(
+                "git push origin main",
+                "Hello World",
+                "kitty terminal",
+                "hello again",
+                "https://example.com",
+            )
+        )
+
+    def contents(self, items):
+        return [item.content for item in items]
+
+    def test_search_is_case_insensitive_and_newest_first(self):
+        self.assertEqual(
+            self.contents(self.history.search("HELLO")),
+            ["Hello World", "hello again"],
+        )
+
+    def test_short_queries_scan_every_entry(self):
+        self.assertEqual(
+            self.contents(self.history.search("it")),
+            [
+                "git push origin main",
+                "kitty terminal",
+            ],
+        )
+
+    def test_empty_query_returns_everything(self):
+        self.assertEqual(self.history.search(""), self.history.items)
+
+    def test_typing_narrows_previous_results(self):
+        self.history.search("hel")
+        self.assertEqual(
+            self.contents(self.history.search("hell")),
+            [
+                "Hello World",
+                "hello again",
+            ],
+        )
+        self.assertEqual(self.contents(self.history.search("hello w")), ["Hello World"])
+
+    def test_editing_the_query_searches_from_scratch(self):
+        self.history.search("hello w")
+        self.assertEqual(
+            self.contents(self.history.search("kitty")), ["kitty terminal"]
+        )
+
+    def test_missing_trigram_finds_nothing(self):
+        self.assertEqual(self.history.search("zzz"), [])
+
+    def test_prepend_indexes_new_entries(self):
+        self.history.prepend(make_items("new hello", first_id=6))
+        self.assertEqual(
+            self.contents(self.history.search("hello")),
+            ["new hello", "Hello World", "hello again"],
+        )
+
+    def test_prepend_replaces_entries_copied_again(self):
+        # Pasting from the history copies an entry again, under a new id
+        self.history.prepend(make_items("kitty terminal", first_id=6))
+
+        self.assertEqual(self.contents(self.history.items).count("kitty terminal"), 1)
+        self.assertEqual(self.history.items[0].id, "6")
+        self.assertEqual(
+            [item.id for item in self.history.search("kitty")],
+            ["6"],
+        )
+
+    def test_remove_unindexes_entries(self):
+        removed = [item for item in self.history.items if item.content == "hello again"]
+        self.history.remove(removed)
+
+        self.assertEqual(self.contents(self.history.search("hello")), ["Hello World"])
+        self.assertNotIn("hello again", self.contents(self.history.items))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+
+from services.app_catalogue import load_icon_index, save_icon_index
+from utils.icon_resolver import DesktopIndex
+
+
+class DesktopIndexTest(unittest.TestCase):
+    """Test suite for matching windows to the icons of desktop files."""
+
+    def setUp(self):
+        self.index = DesktopIndex()
+        self.index.add(
+            "org.gnome.Nautilus",
+            "org.gnome.Nautilus",
+            command="nautilus --new-window %U",
+            name="Files",
+        )
+        self.index.add(
+            "google-chrome",
+            "google-chrome",
+            wm_class="Google-chrome",
+            command="/usr/bin/google-chrome-stable %U",
+            name="Google Chrome",
+        )
+        self.index.add(
+            "steam",
+            "steam",
+            command="env GDK_SCALE=2 /usr/bin/steam %U",
+            name="Steam",
+        )
+        self.index.add(
+            "com.visualstudio.code",
+            "vscode",
+            wm_class="Code",
+            command="code %F",
+            name="Visual Studio Code",
+        )
+
+    def test_lookup_by_wm_class(self):
+        self.assertEqual(self.index.lookup("code"), "vscode")
+        self.assertEqual(self.index.lookup("Google-chrome"), "google-chrome")
+
+    def test_lookup_by_desktop_id(self):
+        self.assertEqual(self.index.lookup("org.gnome.Nautilus"), "org.gnome.Nautilus")
+
+    def test_lookup_by_reverse_dns_tail(self):
+        self.assertEqual(self.index.lookup("nautilus"), "org.gnome.Nautilus")
+
+    def test_lookup_by_exec_basename(self):
+        self.assertEqual(self.index.lookup("google-chrome-stable"), "google-chrome")
+
+    def test_lookup_skips_env_prefixes(self):
+        self.assertEqual(self.index.lookup("steam"), "steam")
+        self.assertIsNone(self.index.lookup("GDK_SCALE=2"))
+
+    def test_lookup_by_normalized_name(self):
+        self.assertEqual(self.index.lookup("Visual Studio Code"), "vscode")
+        self.assertEqual(self.index.lookup("files"), "org.gnome.Nautilus")
+
+    def test_fuzzy_lookup_by_word(self):
+        self.assertEqual(self.index.lookup("steam_app_12345"), "steam")
+
+    def test_unknown_app(self):
+        self.assertIsNone(self.index.lookup("xyz"))
+
+    def test_first_entry_takes_precedence(self):
+        self.index.add("other-code", "other", wm_class="code")
+        self.assertEqual(self.index.lookup("code"), "vscode")
+
+    def test_entries_without_icon_are_skipped(self):
+        self.index.add("iconless", None, name="Iconless")
+        self.assertIsNone(self.index.lookup("Iconless"))
+
+
+class SavedDesktopIndexTest(unittest.TestCase):
+    """Test suite for the desktop index saved across restarts."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_file = os.path.join(directory.name, "desktop_index.json")
+
+        self.index = DesktopIndex()
+        self.index.add("org.gnome.Nautilus", "nautilus-icon", name="Files")
+        self.mtimes = {"/usr/share/applications": 1700000000.5}
+
+    def test_saved_index_is_loaded(self):
+        save_icon_index(self.index, self.mtimes, self.cache_file)
+
+        index = load_icon_index(self.mtimes, self.cache_file)
+        self.assertEqual(index.lookup("nautilus"), "nautilus-icon")
+        self.assertEqual(index.lookup("Files"), "nautilus-icon")
+
+    def test_saved_index_is_stale_once_directories_change(self):
+        save_icon_index(self.index, self.mtimes, self.cache_file)
+
+        self.assertIsNone(
+            load_icon_index({"/usr/share/applications": 1700000001.0}, self.cache_file)
+        )
+        self.assertIsNone(
+            load_icon_index(
+                {**self.mtimes, "/home/user/.local/share/applications": 1.0},
+                self.cache_file,
+            )
+        )
+
+    def test_missing_or_corrupt_index(self):
+        self.assertIsNone(load_icon_index(self.mtimes, self.cache_file))
+
+        with open(self.cache_file, "w") as file:
+            file.write("{")
+        self.assertIsNone(load_icon_index(self.mtimes, self.cache_file))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from services import notification_store
+from services.notification_store import NotificationStore
+
+
+def make_notification(id: int, app_name: str = "app", pixmap=None) -> dict:
+    return {
+        "id": id,
+        "app_name": app_name,
+        "summary": f"Notification {id}",
+        "image-pixmap": pixmap,
+    }
+
+
+class NotificationStoreTest(unittest.TestCase):
+    """Test suite for the notification journal."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.journal_file = os.path.join(self.directory.name, "journal.jsonl")
+        self.image_directory = os.path.join(self.directory.name, "images")
+
+    def make_store(self) -> NotificationStore:
+        return NotificationStore(self.journal_file, self.image_directory)
+
+    def flush(self, store: NotificationStore):
+        """Hand the pending records to the writer and wait for it."""
+        store._flush()
+        store._queue.join()
+
+    def journal_records(self) -> list[dict]:
+        with open(self.journal_file, "r") as file:
+            return [json.loads(line) for line in file]
+
+    def test_replay_keeps_live_notifications_in_order(self):
+        store = self.make_store()
+        for id in (1, 2, 3):
+            store.add(make_notification(id))
+        store.remove(2)
+        self.flush(store)
+
+        replayed = self.make_store().load()
+        self.assertEqual(list(replayed), [1, 3])
+        self.assertEqual(replayed[3]["summary"], "Notification 3")
+
+    def test_replay_after_clear(self):
+        store = self.make_store()
+        store.add(make_notification(1))
+        store.clear()
+        store.add(make_notification(2))
+        self.flush(store)
+
+        self.assertEqual(list(self.make_store().load()), [2])
+
+    def test_replay_skips_torn_lines(self):
+        store = self.make_store()
+        store.add(make_notification(1))
+        self.flush(store)
+        with open(self.journal_file, "a") as file:
+            file.write('{"op": "add", "da')
+
+        self.assertEqual(list(self.make_store().load()), [1])
+
+    def test_images_are_kept_out_of_line(self):
+        store = self.make_store()
+        store.add(make_notification(1, pixmap=[1, 2, 3]))
+        self.flush(store)
+
+        (record,) = self.journal_records()
+        self.assertIsNone(record["data"]["image-pixmap"])
+
+        replayed_store = self.make_store()
+        replayed = replayed_store.load()
+        replayed_store._queue.join()
+        self.assertEqual(replayed_store.resolve(replayed[1])["image-pixmap"], [1, 2, 3])
+
+    def test_images_resolve_from_memory_before_written(self):
+        store = self.make_store()
+        store.add(make_notification(1, pixmap=[4, 5]))
+        inline, _ = store._split(store.entries[1])
+        self.assertEqual(store.resolve(inline)["image-pixmap"], [4, 5])
+
+    def test_removed_images_are_deleted(self):
+        store = self.make_store()
+        store.add(make_notification(1, pixmap=[1]))
+        self.flush(store)
+        store.remove(1)
+        self.flush(store)
+
+        self.assertEqual(os.listdir(self.image_directory), [])
+
+    def test_compaction_drops_dead_records(self):
+        store = self.make_store()
+        with mock.patch.object(notification_store, "COMPACTION_SLACK", 5):
+            for id in range(1, 11):
+                store.add(make_notification(id))
+                if id < 9:
+                    store.remove(id)
+            self.flush(store)
+
+        records = self.journal_records()
+        self.assertEqual([record["op"] for record in records], ["add", "add"])
+        self.assertEqual([record["data"]["id"] for record in records], [9, 10])
+        self.assertEqual(list(self.make_store().load()), [9, 10])
+
+    def test_legacy_cache_is_imported_oldest_first(self):
+        legacy_file = os.path.join(self.directory.name, "notifications.json")
+        with open(legacy_file, "w") as file:
+            json.dump([make_notification(id) for id in (3, 1, 2)], file)
+
+        with mock.patch.object(
+            notification_store, "NOTIFICATION_CACHE_FILE", legacy_file
+        ):
+            store = self.make_store()
+            self.assertEqual(list(store.load()), [1, 2, 3])
+            store._queue.join()
+
+        self.assertFalse(os.path.exists(legacy_file))
+        self.assertEqual(list(self.make_store().load()), [1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
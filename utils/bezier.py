@@ -1,22 +1,25 @@
-from functools import cache
+from collections import OrderedDict
 
 from fabric.utils import clamp
 
+# Samples of each curve's lookup table, interpolated between
+TABLE_SIZE = 256
+
+# Number of curves whose tables are kept for `cubic_bezier`
+MAX_CURVES = 32
+
 
-@cache
 def lerp(start: float, end: float, progress: float) -> float:
     return start + (end - start) * progress
 
 
-@cache
 def steps(n: int, progress: float, start_jump: bool = False) -> float:
     if start_jump:
         return min(int(progress * n), n - 1) / (n - 1) if n > 1 else 0.0
     return min(int(progress * n + 1e-10), n) / n
 
 
-@cache
-def cubic_bezier(
+def solve_cubic_bezier(
     x1: float, y1: float, x2: float, y2: float, progress: float, epsilon=1e-6
 ) -> float:
     # implementation yanked off of the internet, don't blame me about anything.
@@ -50,17 +53,61 @@ def cubic_bezier(
     return 3 * y1 * omt * omt * t + 3 * y2 * omt * t_sq + t * t_sq
 
 
-def ease_linear(progress: float) -> float:
-    return cubic_bezier(1, 1, 0, 0, progress)
+class BezierCurve:
+    """A cubic bezier easing, precomputed into a fixed size lookup table.
+
+    Calling it interpolates the table, so a frame costs a lookup whatever the
+    progress, and nothing is cached per progress value.
+    """
+
+    __slots__ = ("points", "table")
+
+    def __init__(self, x1: float, y1: float, x2: float, y2: float):
+        self.points = (x1, y1, x2, y2)
+        last = TABLE_SIZE - 1
+        self.table = tuple(
+            solve_cubic_bezier(x1, y1, x2, y2, index / last)
+            for index in range(TABLE_SIZE)
+        )
+
+    def __call__(self, progress: float, *args, **kwargs) -> float:
+        if progress <= 0.0 or progress >= 1.0:
+            return clamp(progress, 0.0, 1.0)
+
+        position = progress * (TABLE_SIZE - 1)
+        index = int(position)
+        start = self.table[index]
+        return start + (self.table[index + 1] - start) * (position - index)
+
 
+_curves: OrderedDict[tuple[float, float, float, float], BezierCurve] = OrderedDict()
+
+
+def bezier_curve(x1: float, y1: float, x2: float, y2: float) -> BezierCurve:
+    """Return the curve of these control points, sharing recently used tables."""
+    key = (x1, y1, x2, y2)
+    if (curve := _curves.get(key)) is not None:
+        _curves.move_to_end(key)
+        return curve
+
+    curve = _curves[key] = BezierCurve(x1, y1, x2, y2)
+    if len(_curves) > MAX_CURVES:
+        _curves.popitem(last=False)
+
+    return curve
+
+
+def cubic_bezier(
+    x1: float, y1: float, x2: float, y2: float, progress: float, *_
+) -> float:
+    """Ease `progress`, prefer keeping a `bezier_curve` when called every frame."""
+    return bezier_curve(x1, y1, x2, y2)(progress)
 
-def ease_in(progress: float) -> float:
-    return cubic_bezier(0.4, 0, 1, 1, progress)
 
+ease_linear = bezier_curve(1, 1, 0, 0)
 
-def ease_out(progress: float) -> float:
-    return cubic_bezier(0, 0, 0.2, 1, progress)
+ease_in = bezier_curve(0.4, 0, 1, 1)
 
+ease_out = bezier_curve(0, 0, 0.2, 1)
 
-def ease_in_out(progress: float) -> float:
-    return cubic_bezier(0.4, 0, 0.2, 1, progress)
+ease_in_out = bezier_curve(0.4, 0, 0.2, 1)
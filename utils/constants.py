@@ -12,9 +12,14 @@ APP_CACHE_DIRECTORY = f"{SYSTEM_CACHE_DIR}/{APPLICATION_NAME}"
 
 
 NOTIFICATION_CACHE_FILE = f"{APP_CACHE_DIRECTORY}/notifications.json"
+NOTIFICATION_JOURNAL_FILE = f"{APP_CACHE_DIRECTORY}/notifications.jsonl"
+NOTIFICATION_IMAGE_DIRECTORY = f"{APP_CACHE_DIRECTORY}/notification_images"
+CLIPHIST_THUMBNAIL_DIRECTORY = f"{APP_CACHE_DIRECTORY}/cliphist_thumbnails"
+ARTWORK_CACHE_DIRECTORY = f"{APP_CACHE_DIRECTORY}/media"
 WEATHER_CACHE_FILE = f"{APP_CACHE_DIRECTORY}/weather.json"
 QUOTES_CACHE_FILE = f"{APP_CACHE_DIRECTORY}/quotes.json"
 ICON_CACHE_FILE = f"{APP_CACHE_DIRECTORY}/icons.json"
+DESKTOP_INDEX_CACHE_FILE = f"{APP_CACHE_DIRECTORY}/desktop_index.json"
 
 
 LOG_DIR = f"{GLib.get_user_state_dir()}/{APPLICATION_NAME}"
@@ -3,13 +3,12 @@ import os
 import re
 import shutil
 import subprocess
-import threading
 import time
 from collections import Counter
 from datetime import datetime
 from functools import lru_cache
 from io import BytesIO
-from typing import Any, Callable, Dict, List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 import gi
 import psutil
@@ -74,29 +73,17 @@ def tint_color(color, tint_factor=1):
     return mix_colors(color, white, tint_factor)
 
 
-# Function to get a simple color palette from an image using threading
-def get_simple_palette_threaded(
-    image_path: str,
-    callback: Callable[[Optional[list[tuple[int, int, int]]]], None],
-    color_count: int = 4,
-    resize: int = 64,
-):
-    def worker():
-        try:
-            with Image.open(image_path) as img:
-                img = img.convert("RGB")
-                img.thumbnail((resize, resize), Image.LANCZOS)  # Fast, in-place resize
-                pixels = img.getdata()
-
-                most_common = Counter(pixels).most_common(color_count)
-                palette = [color for color, _ in most_common]
-
-                GLib.idle_add(callback, palette)
-        except Exception as e:
-            print(f"[ColorExtractor] Failed: {e}")
-            GLib.idle_add(callback, None)
+# Function to get the most common colors of an image, as a simple palette
+def get_simple_palette(
+    image_path: str, color_count: int = 4, resize: int = 64
+) -> list[tuple[int, int, int]]:
+    with Image.open(image_path) as img:
+        img = img.convert("RGB")
+        img.thumbnail((resize, resize), Image.LANCZOS)  # Fast, in-place resize
+        pixels = img.getdata()
 
-    threading.Thread(target=worker, daemon=True).start()
+        most_common = Counter(pixels).most_common(color_count)
+        return [color for color, _ in most_common]
 
 
 # Function to escape the markup
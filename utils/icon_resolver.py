@@ -1,12 +1,14 @@
 import json
 import os
 import re
+import threading
+from collections import OrderedDict
 
 import gi
 from gi.repository import GdkPixbuf, GLib, Gtk
 from loguru import logger
 
-from utils.thread import run_in_thread
+from utils.thread import thread
 
 from .colors import Colors
 from .constants import ICON_CACHE_FILE
@@ -15,6 +17,94 @@ from .icons import symbolic_icons
 gi.require_versions({"Gtk": "3.0"})
 
 
+# Lookup keys of the desktop index, by priority
+INDEX_KEYS = ("wm_class", "id", "exec", "name")
+
+
+def normalize(name: str) -> str:
+    return "".join(name.lower().split())
+
+
+class DesktopIndex:
+    """An index of the icons of installed `.desktop` files.
+
+    Icons are looked up by StartupWMClass, desktop file id, Exec basename and
+    normalized Name. Entries come from the application catalogue, which parses,
+    watches and saves the desktop files, and the keys of a saved index.
+    """
+
+    def __init__(self, keys: dict[str, dict[str, str]] | None = None):
+        self.keys: dict[str, dict[str, str]] = keys or {kind: {} for kind in INDEX_KEYS}
+
+    def add(
+        self,
+        desktop_id: str,
+        icon: str | None,
+        wm_class: str | None = None,
+        command: str | None = None,
+        name: str | None = None,
+    ):
+        """Index the icon of a desktop file, entries added first take precedence."""
+        if not icon:
+            return
+
+        # Skip `env VAR=value` prefixes to get to the actual command
+        executable = next(
+            (
+                token
+                for token in (command or "").split()
+                if token != "env" and "=" not in token
+            ),
+            None,
+        )
+
+        values = {
+            "wm_class": wm_class,
+            "id": desktop_id,
+            "exec": os.path.basename(executable) if executable else None,
+            "name": name,
+        }
+        for kind, value in values.items():
+            if value:
+                self.keys[kind].setdefault(normalize(value), icon)
+
+        # Reverse DNS ids, like org.gnome.Nautilus, are often matched by their end
+        self.keys["id"].setdefault(normalize(desktop_id.rsplit(".", 1)[-1]), icon)
+
+    def lookup(self, app_id: str) -> str | None:
+        """Return the icon of the desktop file matching a window class or app id."""
+        name = normalize(app_id)
+        for kind in INDEX_KEYS:
+            if (icon := self.keys[kind].get(name)) is not None:
+                return icon
+
+        return self._fuzzy_lookup(app_id)
+
+    def _fuzzy_lookup(self, app_id: str) -> str | None:
+        """Match desktop ids containing the app id, or one of its words."""
+        ids = self.keys["id"]
+        for word in (normalize(app_id), *re.split(r"-|\.|_|\s", app_id)):
+            if not word:
+                continue
+
+            word = word.lower()
+            for desktop_id, icon in ids.items():
+                if word in desktop_id:
+                    return icon
+
+        return None
+
+
+# Bumped when the layout of the saved icon cache changes
+ICON_CACHE_VERSION = 2
+
+# Delay used to save the icon cache once after a burst of new apps
+SAVE_DELAY_MS = 1000
+
+# Number of icon pixbufs kept in memory, by icon name and size
+PIXBUF_CACHE_SIZE = 256
+
+
 class IconResolver:
     """A class to resolve icons for applications."""
 
@@ -26,21 +116,53 @@ class IconResolver:
         return cls._instance
 
     def __init__(self):
-        if os.path.exists(ICON_CACHE_FILE):
+        if hasattr(self, "_initialized"):
+            return
+        self._initialized = True
+
+        # Imported here, as the catalogue builds its index with this module
+        from services.app_catalogue import AppCatalogueService
+
+        self._catalogue = AppCatalogueService()
+        self._catalogue.connect("changed", self._on_desktop_files_changed)
+        self._icon_dict = self._load_cache()
+
+        self._save_id = 0
+        self._pending_save: dict[str, str] | None = None
+        self._write_lock = threading.Lock()
+
+        self._pixbufs: OrderedDict[tuple[str, int], GdkPixbuf.Pixbuf] = OrderedDict()
+        Gtk.IconTheme.get_default().connect("changed", lambda *_: self._pixbufs.clear())
+
+    def _load_cache(self) -> dict[str, str]:
+        try:
             with open(ICON_CACHE_FILE, "r") as file:
-                try:
-                    self._icon_dict = json.load(file)
-                except json.JSONDecodeError:
-                    logger.info(
-                        f"{Colors.INFO}[ICONS] Cache file does not exist or corrupted."
-                    )
-        else:
-            self._icon_dict = {}
+                data = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError):
+            logger.info(f"{Colors.INFO}[ICONS] Cache file is corrupted, starting over.")
+            return {}
+
+        if not isinstance(data, dict):
+            return {}
+
+        if "version" not in data:
+            # The first format was the bare mapping of app ids to icons
+            return data
+
+        if data["version"] != ICON_CACHE_VERSION:
+            return {}
+
+        return data["icons"]
 
     def get_icon_name(self, app_id: str):
         if app_id in self._icon_dict:
             return self._icon_dict[app_id]
         new_icon = self._compositor_find_icon(app_id)
+        if not self._catalogue.loaded:
+            # The desktop files are still being read, the app may be in them
+            return new_icon
         logger.info(
             f"[ICONS] found new icon: '{new_icon}' for app id: '{app_id}', storing."
         )
@@ -52,13 +174,7 @@ class IconResolver:
             return (
                 pixmap.as_pixbuf(icon_size, GdkPixbuf.InterpType.HYPER)
                 if pixmap is not None
-                else Gtk.IconTheme()
-                .get_default()
-                .load_icon(
-                    icon_name,
-                    icon_size,
-                    Gtk.IconLookupFlags.FORCE_SIZE,
-                )
+                else self._load_icon(icon_name, icon_size)
             )
         except GLib.GError:
             return self.get_icon_pixbuf(app_id, icon_size)
@@ -66,64 +182,74 @@ class IconResolver:
     def get_icon_pixbuf(self, app_id: str, size: int = 16):
         icon_name = self.get_icon_name(app_id)
         try:
-            return Gtk.IconTheme.get_default().load_icon(
-                icon_name,
-                size,
-                Gtk.IconLookupFlags.FORCE_SIZE,
-            )
+            return self._load_icon(icon_name, size)
         except GLib.GError:
-            return (
-                Gtk.IconTheme()
-                .get_default()
-                .load_icon(
-                    "image-missing",
-                    size,
-                    Gtk.IconLookupFlags.FORCE_SIZE,
-                )
-            )
+            return self._load_icon("image-missing", size)
+
+    def _load_icon(self, icon_name: str, size: int) -> GdkPixbuf.Pixbuf:
+        """Load an icon from the theme, or from memory when already loaded."""
+        key = (icon_name, size)
+        if (pixbuf := self._pixbufs.get(key)) is not None:
+            self._pixbufs.move_to_end(key)
+            return pixbuf
+
+        pixbuf = Gtk.IconTheme.get_default().load_icon(
+            icon_name,
+            size,
+            Gtk.IconLookupFlags.FORCE_SIZE,
+        )
+
+        self._pixbufs[key] = pixbuf
+        if len(self._pixbufs) > PIXBUF_CACHE_SIZE:
+            self._pixbufs.popitem(last=False)
+
+        return pixbuf
 
-    @run_in_thread
     def _store_new_icon(self, app_id: str, icon: str):
         self._icon_dict[app_id] = icon
-        with open(ICON_CACHE_FILE, "w") as f:
-            json.dump(self._icon_dict, f, indent=4, ensure_ascii=False)
-            f.close()
-
-    def _get_icon_from_desktop_file(self, desktop_file_path: str):
-        with open(desktop_file_path, "r") as f:
-            for line in f.readlines():
-                if "Icon=" in line:
-                    return "".join(line[5:].split())
-            return symbolic_icons["fallback"]["executable"]
-
-    def _get_desktop_file(self, app_id: str) -> str | None:
-        data_dirs = GLib.get_system_data_dirs()
-        for data_dir in data_dirs:
-            data_dir = data_dir + "/applications/"
-            if os.path.exists(data_dir):
-                # Do name resolving here
-                files = os.listdir(data_dir)
-                matching = [
-                    s for s in files if "".join(app_id.lower().split()) in s.lower()
-                ]
-                if matching:
-                    return data_dir + matching[0]
-
-                for word in list(filter(None, re.split(r"-|\.|_|\s", app_id))):
-                    matching = [s for s in files if word.lower() in s.lower()]
-                    if matching:
-                        return data_dir + matching[0]
 
-        return None
+        # Many windows may open at once, save all their icons in one go
+        if not self._save_id:
+            self._save_id = GLib.timeout_add(SAVE_DELAY_MS, self._save_cache)
+
+    def _save_cache(self):
+        self._save_id = 0
+        self._pending_save = dict(self._icon_dict)
+        thread(self._write_cache)
+        return False
+
+    def _write_cache(self):
+        # Only one writer at a time, and it always writes the latest snapshot
+        with self._write_lock:
+            data, self._pending_save = self._pending_save, None
+            if data is None:
+                return
+
+            temp_file = f"{ICON_CACHE_FILE}.tmp"
+            try:
+                with open(temp_file, "w") as file:
+                    json.dump(
+                        {"version": ICON_CACHE_VERSION, "icons": data},
+                        file,
+                        ensure_ascii=False,
+                    )
+                os.replace(temp_file, ICON_CACHE_FILE)
+            except OSError as e:
+                logger.warning(f"[ICONS] Failed to save the icon cache: {e}")
+
+    def _on_desktop_files_changed(self, *_):
+        # Apps that were missing a desktop file may have one now
+        fallback = symbolic_icons["fallback"]["executable"]
+        self._icon_dict = {
+            app_id: icon for app_id, icon in self._icon_dict.items() if icon != fallback
+        }
 
     def _compositor_find_icon(self, app_id: str):
         if Gtk.IconTheme.get_default().has_icon(app_id):
             return app_id
         if Gtk.IconTheme.get_default().has_icon(app_id + "-desktop"):
             return app_id + "-desktop"
-        desktop_file = self._get_desktop_file(app_id)
         return (
-            self._get_icon_from_desktop_file(desktop_file)
-            if desktop_file
-            else symbolic_icons["fallback"]["executable"]
+            self._catalogue.icon_index.lookup(app_id)
+            or symbolic_icons["fallback"]["executable"]
         )
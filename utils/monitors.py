@@ -1,17 +1,17 @@
-import json
 import warnings
 from typing import Dict
 
-from fabric.hyprland import Hyprland
 from gi.repository import Gdk
 
+from services.hyprland_ipc import HyprlandIPC
+
 from .functions import ttl_lru_cache
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
 
-class HyprlandWithMonitors(Hyprland):
-    """A Hyprland class with additional monitor common."""
+class HyprlandWithMonitors:
+    """Hyprland monitors, mapped to their GDK counterparts."""
 
     instance = None
 
@@ -22,13 +22,14 @@ class HyprlandWithMonitors(Hyprland):
 
         return HyprlandWithMonitors.instance
 
-    def __init__(self, commands_only: bool = False, **kwargs):
+    def __init__(self):
         self.display: Gdk.Display = Gdk.Display.get_default()
-        super().__init__(commands_only, **kwargs)
+        # Requests share the bar's connection, rather than opening another
+        self.ipc = HyprlandIPC()
 
     @ttl_lru_cache(100, 5)
     def get_all_monitors(self) -> Dict:
-        monitors = json.loads(self.send_command("j/monitors").reply)
+        monitors = self.ipc.query("j/monitors") or []
         return {monitor["id"]: monitor["name"] for monitor in monitors}
 
     def get_gdk_monitor_id_from_name(self, plug_name: str) -> int | None:
@@ -44,5 +45,5 @@ class HyprlandWithMonitors(Hyprland):
         return None
 
     def get_current_gdk_monitor_id(self) -> int | None:
-        active_workspace = json.loads(self.send_command("j/activeworkspace").reply)
-        return self.get_gdk_monitor_id_from_name(active_workspace["monitor"])
+        active_workspace = self.ipc.query("j/activeworkspace") or {}
+        return self.get_gdk_monitor_id_from_name(active_workspace.get("monitor"))
@@ -0,0 +1,280 @@
+import os
+import signal
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+import fabric.utils
+import fabric.utils.helpers
+from gi.repository import GLib, GObject
+from loguru import logger
+
+from .colors import Colors
+
+# Durations kept per callback for the histograms
+HISTORY_SIZE = 256
+
+# Upper bounds of the histogram buckets, in ms
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 250, 500, 1000)
+
+# Number of callbacks listed by a dump, the longest in total first
+DUMP_SIZE = 20
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def qualified_name(function) -> str:
+    """Return the module and qualified name of a callable, with the line of lambdas."""
+    # Unwrap functools.partial
+    function = getattr(function, "func", function)
+
+    module = getattr(function, "__module__", None) or "?"
+    name = getattr(function, "__qualname__", None) or repr(function)
+
+    code = getattr(function, "__code__", None)
+    if name.endswith("<lambda>") and code is not None:
+        name += f":{code.co_firstlineno}"
+
+    return f"{module}.{name}"
+
+
+class MainLoopWatchdog:
+    """Opt-in timing of main loop callbacks, to find what makes the bar stall.
+
+    Once installed, idle and timeout sources, signal emissions and shell commands
+    are timed by name, and those running longer than the threshold on the main
+    thread are logged. A thread also watches a main loop heartbeat: when it is
+    late, the project function the main thread is running is reported, even if
+    it was not called through a timed path. Send SIGUSR1 to log the histograms.
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, threshold_ms: float = 50):
+        if hasattr(self, "_initialized"):
+            return
+        self._initialized = True
+
+        self.threshold = threshold_ms / 1000
+        self.timings: dict[str, deque[float]] = {}
+
+        self._lock = threading.Lock()
+        self._main_thread = threading.get_ident()
+        # Timed callbacks the main thread is running, innermost last
+        self._running: list[str] = []
+
+        self._heartbeat = max(self.threshold / 4, 0.01)
+        self._last_beat = time.monotonic()
+        self._culprit: str | None = None
+        self._installed = False
+
+    def install(self):
+        if self._installed:
+            return
+        self._installed = True
+
+        # The user asked for it, so log even when debug logs are off
+        logger.enable(__name__)
+
+        self._patch_sources()
+        self._patch_signals()
+        self._patch_shell_commands()
+
+        self._original_timeout_add(int(self._heartbeat * 1000), self._beat)
+        threading.Thread(
+            target=self._watch, name="main-loop-watchdog", daemon=True
+        ).start()
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGUSR1, self._on_dump)
+
+        logger.info(
+            f"{Colors.INFO}[Watchdog] Reporting main loop stalls over "
+            f"{self.threshold * 1000:.0f} ms, send SIGUSR1 to {os.getpid()} for timings"
+        )
+
+    def call(self, name: str, function, *args, **kwargs):
+        """Run a function, timing it under `name`."""
+        on_main = threading.get_ident() == self._main_thread
+        if on_main:
+            self._running.append(name)
+
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            if on_main:
+                self._running.pop()
+            self._record(name, elapsed, on_main)
+
+    def timed(self, function, kind: str):
+        """Return a function timing each call of `function`."""
+        name = f"{kind} {qualified_name(function)}"
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            return self.call(name, function, *args, **kwargs)
+
+        return wrapper
+
+    def dump(self) -> str:
+        """Return the duration histograms of the longest running callbacks."""
+        with self._lock:
+            timings = {
+                name: list(durations) for name, durations in self.timings.items()
+            }
+
+        lines = []
+        for name, durations in sorted(
+            timings.items(), key=lambda item: sum(item[1]), reverse=True
+        )[:DUMP_SIZE]:
+            buckets = [0] * (len(BUCKETS_MS) + 1)
+            for duration in durations:
+                buckets[
+                    next(
+                        (i for i, bound in enumerate(BUCKETS_MS) if duration <= bound),
+                        len(BUCKETS_MS),
+                    )
+                ] += 1
+
+            histogram = " ".join(
+                f"<={bound}:{count}"
+                for bound, count in zip((*BUCKETS_MS, "inf"), buckets, strict=True)
+                if count
+            )
+            lines.append(
+                f"{name}: n={len(durations)} "
+                f"median={statistics.median(durations):.1f}ms "
+                f"max={max(durations):.1f}ms [{histogram}]"
+            )
+
+        return "\n".join(lines)
+
+    def _record(self, name: str, elapsed: float, on_main: bool):
+        with self._lock:
+            durations = self.timings.get(name)
+            if durations is None:
+                durations = self.timings[name] = deque(maxlen=HISTORY_SIZE)
+            durations.append(elapsed * 1000)
+
+        # Only work on the main thread makes the bar stall
+        if on_main and elapsed > self.threshold:
+            logger.warning(
+                f"{Colors.WARNING}[Watchdog] {name} took {elapsed * 1000:.0f} ms"
+            )
+
+    def _patch_sources(self):
+        self._original_timeout_add = GLib.timeout_add
+        original_idle_add = GLib.idle_add
+        original_timeout_add_seconds = GLib.timeout_add_seconds
+
+        def idle_add(function, *args, **kwargs):
+            return original_idle_add(self.timed(function, "idle"), *args, **kwargs)
+
+        def timeout_add(interval, function, *args, **kwargs):
+            return self._original_timeout_add(
+                interval, self.timed(function, "timeout"), *args, **kwargs
+            )
+
+        def timeout_add_seconds(interval, function, *args, **kwargs):
+            return original_timeout_add_seconds(
+                interval, self.timed(function, "timeout"), *args, **kwargs
+            )
+
+        GLib.idle_add = idle_add
+        GLib.timeout_add = timeout_add
+        GLib.timeout_add_seconds = timeout_add_seconds
+
+    def _patch_signals(self):
+        # Emissions are timed rather than handlers, so that handlers can still
+        # be found by function, as `disconnect_by_func` does
+        original_emit = GObject.Object.emit
+
+        def emit(obj, signal_name, *args):
+            return self.call(
+                f"signal {type(obj).__qualname__}::{signal_name}",
+                original_emit,
+                obj,
+                signal_name,
+                *args,
+            )
+
+        GObject.Object.emit = emit
+
+    def _patch_shell_commands(self):
+        original = fabric.utils.helpers.exec_shell_command
+        original_async = fabric.utils.helpers.exec_shell_command_async
+
+        def exec_shell_command(cmd, *args, **kwargs):
+            program = str(cmd).split(" ", 1)[0]
+            return self.call(f"shell {program}", original, cmd, *args, **kwargs)
+
+        def exec_shell_command_async(cmd, callback=None, *args, **kwargs):
+            if callback is not None:
+                callback = self.timed(callback, "shell callback")
+            return original_async(cmd, callback, *args, **kwargs)
+
+        # Modules imported from now on get the timed versions, and those which
+        # already imported the helpers, like main and utils.functions, get them
+        # in place of the originals
+        replacements = {
+            "exec_shell_command": (original, exec_shell_command),
+            "exec_shell_command_async": (original_async, exec_shell_command_async),
+        }
+        for module in list(sys.modules.values()):
+            namespace = getattr(module, "__dict__", None)
+            if namespace is None:
+                continue
+
+            for name, (original_function, timed_function) in replacements.items():
+                if namespace.get(name) is original_function:
+                    setattr(module, name, timed_function)
+
+    def _beat(self):
+        now = time.monotonic()
+        late = now - self._last_beat - self._heartbeat
+        self._last_beat = now
+
+        if late > self.threshold:
+            logger.warning(
+                f"{Colors.WARNING}[Watchdog] Main loop stalled for {late * 1000:.0f} ms"
+                f" in {self._culprit or 'an unknown callback'}"
+            )
+        self._culprit = None
+        return True
+
+    def _watch(self):
+        while True:
+            time.sleep(self._heartbeat)
+            stalled = time.monotonic() - self._last_beat > self.threshold
+            if stalled and self._culprit is None:
+                self._culprit = self._describe_main_thread()
+
+    def _describe_main_thread(self) -> str:
+        frame = sys._current_frames().get(self._main_thread)
+        running = self._running[-1] if self._running else None
+
+        # The innermost frame of the project's code, outside of this module
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.startswith(PROJECT_ROOT) and filename != __file__:
+                location = (
+                    f"{frame.f_globals.get('__name__', '?')}."
+                    f"{frame.f_code.co_qualname} "
+                    f"({os.path.relpath(filename, PROJECT_ROOT)}:{frame.f_lineno})"
+                )
+                return f"{location}, from {running}" if running else location
+            frame = frame.f_back
+
+        return running or "an unknown callback"
+
+    def _on_dump(self):
+        logger.info(f"{Colors.INFO}[Watchdog] Callback timings:\n{self.dump()}")
+        return True
@@ -1,11 +1,16 @@
-from fabric import Fabricator
-from fabric.utils import exec_shell_command_async, get_relative_path
-from fabric.widgets.box import Box
-from fabric.widgets.label import Label
+import cairo
+from fabric.utils import exec_shell_command_async
+from gi.repository import Gdk, Gtk
 
 import utils.functions as helpers
+from services.cava import CavaService
 from shared.widget_container import ButtonWidget
 
+# Size of the bars, in pixels
+BAR_WIDTH = 3
+BAR_SPACING = 1
+HEIGHT = 16
+
 
 class CavaWidget(ButtonWidget):
     """A widget to display the Cava audio visualizer."""
@@ -25,22 +30,60 @@ class CavaWidget(ButtonWidget):
         if not helpers.is_valid_gjs_color(color):
             raise ValueError(f"Invalid color '{color}' supplied for cava widget")
 
-        cava_label = Label(
-            v_align="center",
-            h_align="center",
-            style=f"color: {color};",
-        )
+        self.color = Gdk.RGBA()
+        if not self.color.parse(color):
+            self.color.parse("#ffffff")
 
-        script_path = get_relative_path("../assets/scripts/cava.sh")
+        # All visualizers share one cava process, its bars count is the first's
+        self.cava_service = CavaService(bars=bars)
+        self.values = self.cava_service.values
+        self._frame_handler = 0
 
-        self.box.children = Box(spacing=1, children=[cava_label]).build(
-            lambda box, _: Fabricator(
-                poll_from=f"bash -c '{script_path} {bars}'",
-                stream=True,
-                on_changed=lambda f, line: cava_label.set_label(line),
-            )
+        # Bars are drawn directly rather than laid out as text on every frame
+        self.drawing_area = Gtk.DrawingArea(
+            visible=True, valign=Gtk.Align.CENTER, halign=Gtk.Align.CENTER
         )
+        self.drawing_area.set_size_request(
+            self.cava_service.bars * (BAR_WIDTH + BAR_SPACING) - BAR_SPACING, HEIGHT
+        )
+        self.drawing_area.connect("draw", self.draw)
+        self.drawing_area.connect("map", self.on_map)
+        self.drawing_area.connect("unmap", self.on_unmap)
+
+        self.box.children = self.drawing_area
 
         self.connect(
             "clicked", lambda _: exec_shell_command_async(command, lambda *_: None)
         )
+
+    def on_map(self, *_):
+        self.values = self.cava_service.values
+        self._frame_handler = self.cava_service.connect("frame", self.on_frame)
+        self.cava_service.acquire()
+
+    def on_unmap(self, *_):
+        if self._frame_handler:
+            self.cava_service.disconnect(self._frame_handler)
+            self._frame_handler = 0
+        self.cava_service.release()
+
+    def on_frame(self, _, values: list[float]):
+        self.values = values
+        self.drawing_area.queue_draw()
+
+    def draw(self, area: Gtk.DrawingArea, ctx: cairo.Context):
+        height = area.get_allocated_height()
+        Gdk.cairo_set_source_rgba(ctx, self.color)
+
+        for index, value in enumerate(self.values):
+            # Silent bars keep a pixel, like the lowest block did
+            bar_height = max(1, round(value * height))
+            ctx.rectangle(
+                index * (BAR_WIDTH + BAR_SPACING),
+                height - bar_height,
+                BAR_WIDTH,
+                bar_height,
+            )
+
+        ctx.fill()
+        return False
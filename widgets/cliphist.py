@@ -1,26 +1,22 @@
 import os
 import re
-import subprocess
-import tempfile
 from urllib.parse import unquote, urlparse
 
-from fabric.utils import remove_handler
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.entry import Entry
 from fabric.widgets.image import Image
 from fabric.widgets.label import Label
-from fabric.widgets.scrolledwindow import ScrolledWindow
-from gi.repository import Gdk, GdkPixbuf, GLib
-from loguru import logger
+from gi.repository import Gdk, GLib
 
-from shared.list import ListBox
+from services.cliphist import ClipHistoryService, ClipItem
+from services.thumbnail_cache import ThumbnailCache
+from shared.list import VirtualList
 from shared.popover import Popover
 from shared.widget_container import ButtonWidget
 from utils.widget_utils import nerd_font_icon
 
 
-# TODO: add scrolled pagination
 class ClipHistoryMenu(Box):
     """A widget to display and manage clipboard history."""
 
@@ -33,26 +29,11 @@ class ClipHistoryMenu(Box):
             **kwargs,
         )
 
-        # Create a temporary directory for image icons
-        self.tmp_dir = tempfile.mkdtemp(prefix="cliphist-")
-        self.image_cache = {}  # Cache for image previews
-
-        self.selected_index = -1  # Track the selected item index
-        self._arranger_handler = 0
-        self.clipboard_items = []
-        self._loading = False
-        self._pending_updates = False
-
-        # Pagination state, reset for new scan
-        self.items_loaded = 0
-        self.batch_size = 7
-        self.loading = False
-        self.max_items = 0  # ← LIMIT HERE
+        self.service = ClipHistoryService()
+        self.thumbnails = ThumbnailCache()
 
         self._search_timer_id = 0  # Timer ID for search text change
 
-        self.viewport = ListBox(name="viewport", spacing=4, orientation="v")
-
         self.search_entry = Entry(
             name="search-entry",
             placeholder="Search Clipboard History",
@@ -65,12 +46,17 @@ class ClipHistoryMenu(Box):
 
         self.search_entry.props.xalign = 0.1
 
-        self.scrolled_window = ScrolledWindow(
+        # Only the rows in view are created, and recycled while scrolling
+        self.viewport = VirtualList(
             name="scrolled-window",
-            spacing=10,
+            list_name="viewport",
+            spacing=4,
+            row_height=36,
+            row_factory=self.create_clipboard_row,
+            bind_row=self.bind_clipboard_row,
+            placeholder=self.create_placeholder(),
             min_content_size=(300, 105),
             max_content_size=(300, 105),
-            child=self.viewport,
         )
 
         self.header_box = Box(
@@ -81,7 +67,7 @@ class ClipHistoryMenu(Box):
                 self.search_entry,
                 Button(
                     name="clear-button",
-                    child=Label(name="clear-label", label=""),
+                    child=Label(name="clear-label", label=""),
                     tooltip_text="Clear History",
                     on_clicked=self.clear_history,
                 ),
@@ -95,26 +81,15 @@ class ClipHistoryMenu(Box):
             orientation="v",
             children=[
                 self.header_box,
-                self.scrolled_window,
+                self.viewport,
             ],
         )
 
         self.add(self.history_box)
-        self.open()  # Load items when the widget is created
-
-    def load_more_items(self, aps):
-        if self.loading or self.items_loaded >= self.max_items:
-            return
-        self.loading = True
 
-        items_to_add = min(self.batch_size, self.max_items - self.items_loaded)
-
-        for i in range(self.items_loaded, self.items_loaded + items_to_add):
-            notification_item = self.make_button_from_ap(aps[i])
-            self.viewport.add(notification_item)
-
-        self.items_loaded += items_to_add
-        self.loading = False
+        # The service keeps the history up to date, the menu only re-filters it
+        self.service.connect("changed", lambda *_: self.filter_items(self.search_entry))
+        self.open()
 
     def _on_search_text_changed(self, entry, pspec):
         # Remove any existing pending filter operation
@@ -135,259 +110,148 @@ class ClipHistoryMenu(Box):
 
     def close(self, *_):
         """Close the clipboard history panel"""
-        self.viewport.children = []
-        self.selected_index = -1  # Reset selection
+        self.viewport.set_items([])
 
     def open(self):
-        """Open the clipboard history panel and load items"""
-        if self._loading:
-            return
-        self._loading = True
+        """Open the clipboard history panel and show the cached items"""
         self.search_entry.set_text("")  # Clear search
         self.search_entry.grab_focus()
-        # Start loading in background using GLib.idle_add
-        GLib.idle_add(self._load_clipboard_items_thread)
-
-    def _load_clipboard_items_thread(self):
-        """Worker for loading clipboard items, now runs in main loop via idle_add"""
-        try:
-            result = subprocess.run(
-                ["cliphist", "list"], capture_output=True, text=True, check=True
-            )
-            lines = result.stdout.strip().split("\n")
-            new_items = []
-            for line in lines:
-                if not line or "<meta http-equiv" in line:
-                    continue
-                new_items.append(line)
-            self._update_items(new_items)
-        except subprocess.CalledProcessError as e:
-            logger.exception(f"Error loading clipboard history: {e}")
-        except Exception as e:
-            logger.exception(f"Unexpected error: {e}")
-        finally:
-            self._loading = False
-            if self._pending_updates:
-                self._pending_updates = False
-                GLib.idle_add(self._load_clipboard_items_thread)
-        return False  # Ensure idle_add does not repeat
-
-    def _update_items(self, new_items):
-        """Update the items list from main thread"""
-        self.clipboard_items = new_items
         self.display_clipboard_items()
 
     def display_clipboard_items(self, filter_text=""):
         """Display clipboard items in the viewport"""
-        remove_handler(self._arranger_handler) if self._arranger_handler else None
-        self.viewport.remove_all()
-        self.selected_index = -1  # Reset selection
-
-        # Filter items if search text is provided
-        filtered_items = []
-        for item in self.clipboard_items:
-            # Extract just the content part (after the first tab)
-            content = item.split("\t", 1)[1] if "\t" in item else item
-            if filter_text.lower() in content.lower():
-                filtered_items.append(item)
-
-        # Show message if no items are found
-        if not filtered_items:
-            # Create a container box to better center the message
-            container = Box(
-                name="no-clip-container",
-                orientation="v",
-                h_align="center",
-                v_align="center",
-                h_expand=True,
-                spacing=10,
-                v_expand=True,
-            )
+        # Filter items with the service's prebuilt search index
+        self.viewport.set_items(self.service.search(filter_text))
 
-            # Show a message if no clipboard items
-            label = Label(
-                name="no-clip",
-                label="Clipboard history is empty",
-                h_align="center",
-                v_align="center",
-            )
-            image = Image(
-                name="no-clip-icon",
-                icon_name="clipboard-symbolic",
-                icon_size=32,
-                h_align="center",
-                v_align="center",
-            )
-
-            container.add(image)
-            container.add(label)
-            self.viewport.add(container)
-            return
-
-        # Display items in batches to prevent UI freeze
-        self._display_items_batch(filtered_items, 0, 10)
-
-    def _display_items_batch(self, items, start, batch_size):
-        """Display items in batches to keep UI responsive"""
-        end = min(start + batch_size, len(items))
-
-        for i in range(start, end):
-            item = items[i]
-            self.viewport.add(self.create_clipboard_item(item))
-
-        # Schedule next batch if there are more items
-        if end < len(items):
-            GLib.idle_add(self._display_items_batch, items, end, batch_size)
-        else:
-            # Auto-select first item if we have filter text
-            if self.search_entry.get_text() and self.viewport.get_children():
-                self.update_selection(0)
-
-    def create_clipboard_item(self, item):
-        """Create a button for a clipboard item"""
-        # Extract ID and content
-        parts = item.split("\t", 1)
-        item_id = parts[0] if len(parts) > 1 else "0"
-        content = parts[1] if len(parts) > 1 else item
-
-        # Truncate content for display
-        display_text = content.strip()
-        if len(display_text) > 100:
-            display_text = display_text[:97] + "..."
-
-        # Check if this is an image by examining the content
-        is_image = self.is_image_data(content)
+        # Auto-select first item if we have filter text
+        if filter_text and self.viewport.items:
+            self.viewport.select(0)
 
-        is_file_image = self.is_file_image(content) and os.path.exists(
-            unquote(urlparse(content).path)
-        )
-
-        if is_image:
-            # For images, create item with image preview
-            button = Button(
-                name="slot-button",
-                child=Box(
-                    name="slot-box",
-                    orientation="h",
-                    spacing=10,
-                    children=[
-                        Image(name="clip-icon", h_align="start"),  # Placeholder
-                        Label(
-                            name="clip-label",
-                            label="[Image]",
-                            ellipsization="end",
-                            v_align="center",
-                            h_align="start",
-                            h_expand=True,
-                        ),
-                    ],
+    def create_placeholder(self):
+        """Create the message shown when no items are found"""
+        return Box(
+            name="no-clip-container",
+            orientation="v",
+            h_align="center",
+            v_align="center",
+            h_expand=True,
+            spacing=10,
+            v_expand=True,
+            children=[
+                Image(
+                    name="no-clip-icon",
+                    icon_name="clipboard-symbolic",
+                    icon_size=32,
+                    h_align="center",
+                    v_align="center",
                 ),
-                tooltip_text="Image in clipboard",
-                on_clicked=lambda *_, id=item_id: self.paste_item(id),
-            )
-            # Load image preview in background
-            self._load_image_preview_async(item_id, button)
-
-        elif is_file_image:
-            button = Button(
-                name="slot-button",
-                child=Box(
-                    name="slot-box",
-                    orientation="h",
-                    spacing=10,
-                    children=[
-                        Image(
-                            name="clip-icon",
-                            h_align="start",
-                            image_file=unquote(urlparse(content).path),
-                            size=72,
-                        ),  # Placeholder
-                        Label(
-                            name="clip-label",
-                            label="[File]",
-                            ellipsization="end",
-                            v_align="center",
-                            h_align="start",
-                            h_expand=True,
-                        ),
-                    ],
+                Label(
+                    name="no-clip",
+                    label="Clipboard history is empty",
+                    h_align="center",
+                    v_align="center",
                 ),
-                tooltip_text="File in clipboard",
-                on_clicked=lambda *_, id=item_id: self.paste_item(id),
-            )
-        else:
-            # For text, create regular item
-            button = self.create_text_item_button(item_id, display_text)
+            ],
+        )
 
-        # Add key press event handler for Enter key
-        button.connect(
-            "key-press-event",
-            lambda widget, event, id=item_id: self.on_item_key_press(widget, event, id),
+    def create_clipboard_row(self):
+        """Create an empty row, filled with an item by `bind_clipboard_row`"""
+        button = Button(
+            name="slot-button",
+            child=Box(
+                name="slot-box",
+                orientation="h",
+                spacing=10,
+                children=[
+                    Image(name="clip-icon", h_align="start"),
+                    Label(
+                        name="clip-label",
+                        ellipsization="end",
+                        v_align="center",
+                        h_align="start",
+                        h_expand=True,
+                    ),
+                ],
+            ),
+            on_clicked=lambda button: self.paste_item(
+                self.viewport.get_item(button).id
+            ),
         )
 
+        # Add key press event handler for Enter key
+        button.connect("key-press-event", self.on_item_key_press)
+
         # Make sure button can receive focus and key events
         button.set_can_focus(True)
         button.add_events(Gdk.EventMask.KEY_PRESS_MASK)
 
         return button
 
-    def _load_image_preview_async(self, item_id, button):
-        """Load image preview using GLib.idle_add instead of threads"""
-
-        def load_image():
-            try:
-                if item_id in self.image_cache:
-                    pixbuf = self.image_cache[item_id]
-                else:
-                    result = subprocess.run(
-                        ["cliphist", "decode", item_id], capture_output=True, check=True
-                    )
-                    loader = GdkPixbuf.PixbufLoader()
-                    loader.write(result.stdout)
-                    loader.close()
-                    pixbuf = loader.get_pixbuf()
-                    width, height = pixbuf.get_width(), pixbuf.get_height()
-                    max_size = 72
-                    if width > height:
-                        new_width = max_size
-                        new_height = int(height * (max_size / width))
-                    else:
-                        new_height = max_size
-                        new_width = int(width * (max_size / height))
-                    pixbuf = pixbuf.scale_simple(
-                        new_width, new_height, GdkPixbuf.InterpType.BILINEAR
-                    )
-                    self.image_cache[item_id] = pixbuf
+    def bind_clipboard_row(self, button, item: ClipItem, index):
+        """Show a clipboard item in a recycled row"""
+        image, label = button.get_child().get_children()
+        content = item.content
+
+        # Check if this is an image by examining the content
+        if self.is_image_data(content):
+            label.set_label("[Image]")
+            button.set_tooltip_text("Image in clipboard")
+            # Load image preview in background. Ids start over after a wipe,
+            # the size and dimensions listed with them tell images apart
+            self._load_image_preview_async(
+                item,
+                button,
+                f"{item.id}:{content}",
+                lambda: self.service.decode(item.id),
+            )
+
+        elif self.is_file_image(content) and os.path.exists(
+            path := unquote(urlparse(content).path)
+        ):
+            label.set_label("[File]")
+            button.set_tooltip_text("File in clipboard")
+            self._load_image_preview_async(
+                item,
+                button,
+                f"{path}:{os.stat(path).st_mtime_ns}",
+                lambda: self._read_file(path),
+            )
+
+        else:
+            # Truncate content for display
+            display_text = content.strip()
+            if len(display_text) > 100:
+                display_text = display_text[:97] + "..."
+
+            label.set_label(display_text)
+            button.set_tooltip_text(display_text)
+            image.set_visible(False)
+
+    def _load_image_preview_async(self, item: ClipItem, button, key, load):
+        """Show the cached thumbnail, or have it made by the thumbnail workers"""
+        image = button.get_child().get_children()[0]
+        image.set_visible(True)
+
+        def on_loaded(pixbuf):
+            # The row may have been recycled for another item in the meantime
+            if pixbuf is not None and self.viewport.get_item(button) is item:
                 self._update_image_button(button, pixbuf)
-            except Exception as e:
-                logger.exception(f"Error loading image preview: {e}")
-            return False
 
-        GLib.idle_add(load_image)
+        if (pixbuf := self.thumbnails.get(key, load, on_loaded)) is not None:
+            image.set_from_pixbuf(pixbuf)
+        else:
+            image.clear()
 
     def _update_image_button(self, button, pixbuf):
         """Update the button with the loaded image preview"""
-        box = button.get_child()
-        if box and len(box.get_children()) > 0:
-            image_widget = box.get_children()[0]
-            if isinstance(image_widget, Image):
-                image_widget.set_from_pixbuf(pixbuf)
-
-    def create_text_item_button(self, item_id, display_text):
-        """Create a button for a text clipboard item"""
-        return Button(
-            name="slot-button",
-            child=Label(
-                name="clip-label",
-                label=display_text,
-                ellipsization="end",
-                v_align="center",
-                h_align="start",
-                h_expand=True,
-            ),
-            tooltip_text=display_text,
-            on_clicked=lambda *_: self.paste_item(item_id),
-        )
+        image = button.get_child().get_children()[0]
+        image.set_from_pixbuf(pixbuf)
+        self.viewport.row_changed(button)
+
+    @staticmethod
+    def _read_file(path):
+        with open(path, "rb") as file:
+            return file.read()
 
     def is_file_image(self, content):
         # Check for common image data patterns
@@ -415,50 +279,16 @@ class ClipHistoryMenu(Box):
         )
 
     def paste_item(self, item_id):
-        """Copy the selected item to the clipboard and close (GLib.idle_add)"""
-
-        def paste():
-            try:
-                result = subprocess.run(
-                    ["cliphist", "decode", item_id], capture_output=True, check=True
-                )
-                subprocess.run(["wl-copy"], input=result.stdout, check=True)
-                GLib.idle_add(self.close)
-            except subprocess.CalledProcessError as e:
-                logger.exception(f"Error pasting clipboard item: {e}")
-            return False
-
-        GLib.idle_add(paste)
+        """Copy the selected item to the clipboard and close"""
+        self.service.paste(item_id, self.close)
 
     def delete_item(self, item_id):
-        """Delete the selected clipboard item (GLib.idle_add)"""
-
-        def delete():
-            try:
-                subprocess.run(["cliphist", "delete", item_id], check=True)
-                self._pending_updates = True
-                if not self._loading:
-                    GLib.idle_add(self._load_clipboard_items_thread)
-            except subprocess.CalledProcessError as e:
-                logger.exception(f"Error deleting clipboard item: {e}")
-            return False
-
-        GLib.idle_add(delete)
+        """Delete the selected clipboard item"""
+        self.service.delete(item_id)
 
     def clear_history(self, *_):
-        """Clear all clipboard history (GLib.idle_add)"""
-
-        def clear():
-            try:
-                subprocess.run(["cliphist", "wipe"], check=True)
-                self._pending_updates = True
-                if not self._loading:
-                    GLib.idle_add(self._load_clipboard_items_thread)
-            except subprocess.CalledProcessError as e:
-                logger.exception(f"Error clearing clipboard history: {e}")
-            return False
-
-        GLib.idle_add(clear)
+        """Clear all clipboard history"""
+        self.service.wipe()
 
     def filter_items(self, entry, *_):
         """Filter clipboard items based on search text"""
@@ -467,10 +297,10 @@ class ClipHistoryMenu(Box):
     def on_search_entry_key_press(self, widget, event):
         """Handle key presses in the search entry"""
         if event.keyval == Gdk.KEY_Down:
-            self.move_selection(1)
+            self.viewport.move_selection(1)
             return True
         elif event.keyval == Gdk.KEY_Up:
-            self.move_selection(-1)
+            self.viewport.move_selection(-1)
             return True
         elif event.keyval in (Gdk.KEY_Return, Gdk.KEY_KP_Enter):
             self.use_selected_item()
@@ -483,113 +313,24 @@ class ClipHistoryMenu(Box):
             return True
         return False
 
-    def update_selection(self, new_index):
-        """Update the selected item in the viewport"""
-        children = self.viewport.get_children()
-
-        # Unselect current
-        if self.selected_index != -1 and self.selected_index < len(children):
-            current_button = children[self.selected_index]
-            current_button.get_style_context().remove_class("selected")
-
-        # Select new
-        if new_index != -1 and new_index < len(children):
-            new_button = children[new_index]
-            new_button.get_style_context().add_class("selected")
-            self.selected_index = new_index
-            self.scroll_to_selected(new_button)
-        else:
-            self.selected_index = -1
-
-    def move_selection(self, delta):
-        """Move the selection up or down"""
-        children = self.viewport.get_children()
-        if not children:
-            return
-
-        # Allow starting selection from nothing
-        if self.selected_index == -1 and delta == 1:
-            new_index = 0
-        else:
-            new_index = self.selected_index + delta
-
-        new_index = max(0, min(new_index, len(children) - 1))
-        self.update_selection(new_index)
-
-    def scroll_to_selected(self, button):
-        """Scroll to ensure the selected item is visible"""
-
-        def scroll():
-            adj = self.scrolled_window.get_vadjustment()
-            alloc = button.get_allocation()
-            if alloc.height == 0:
-                return False  # Retry if allocation isn't ready
-
-            y = alloc.y
-            height = alloc.height
-            page_size = adj.get_page_size()
-            current_value = adj.get_value()
-
-            # Calculate visible boundaries
-            visible_top = current_value
-            visible_bottom = current_value + page_size
-
-            if y < visible_top:
-                # Item above viewport - align to top
-                adj.set_value(y)
-            elif y + height > visible_bottom:
-                # Item below viewport - align to bottom
-                new_value = y + height - page_size
-                adj.set_value(new_value)
-            return False
-
-        GLib.idle_add(scroll)
-
     def use_selected_item(self, *_):
         """Use (paste) the selected clipboard item"""
-        children = self.viewport.get_children()
-        if (
-            not children
-            or self.selected_index == -1
-            or self.selected_index >= len(self.clipboard_items)
-        ):
-            return
-
-        # Get the item ID from the first part before the tab
-        item_line = self.clipboard_items[self.selected_index]
-        item_id = item_line.split("\t", 1)[0]
-        self.paste_item(item_id)
+        if (item := self.viewport.selected_item) is not None:
+            self.paste_item(item.id)
 
     def delete_selected_item(self):
         """Delete the selected clipboard item"""
-        children = self.viewport.get_children()
-        if not children or self.selected_index == -1:
-            return
+        if (item := self.viewport.selected_item) is not None:
+            self.delete_item(item.id)
 
-        # Get the item ID from the first part before the tab
-        item_line = self.clipboard_items[self.selected_index]
-        item_id = item_line.split("\t", 1)[0]
-        self.delete_item(item_id)
-
-    def on_item_key_press(self, widget, event, item_id):
+    def on_item_key_press(self, widget, event):
         """Handle key press events on clipboard items"""
         if event.keyval in (Gdk.KEY_Return, Gdk.KEY_KP_Enter):
             # Copy item to clipboard and close
-            self.paste_item(item_id)
+            self.paste_item(self.viewport.get_item(widget).id)
             return True
         return False
 
-    def __del__(self):
-        """Clean up temporary files on destruction"""
-        try:
-            if hasattr(self, "tmp_dir") and os.path.exists(self.tmp_dir):
-                import shutil
-
-                shutil.rmtree(self.tmp_dir)
-            self.image_cache.clear()
-        except Exception as e:
-            logger.exception(f"Error cleaning up temporary files: {e}")
-
 
 class ClipHistoryWidget(ButtonWidget):
     """A widget to display and manage clipboard history."""
@@ -617,6 +358,7 @@ class ClipHistoryWidget(ButtonWidget):
             self.set_tooltip_text("Clipboard History")
 
         self.popup = None
+        self.menu = None
 
         self.connect(
             "clicked",
@@ -626,8 +368,12 @@ class ClipHistoryWidget(ButtonWidget):
     def show_popover(self, *_):
         """Show the popover."""
         if self.popup is None:
+            self.menu = ClipHistoryMenu()
             self.popup = Popover(
-                content=ClipHistoryMenu(),
+                content=self.menu,
                 point_to=self,
             )
+        else:
+            # Redisplay the cached history, it is not listed again
+            self.menu.open()
         self.popup.open()
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Callable, List
 
 import gi
 from fabric.notifications import Notification
@@ -7,7 +7,6 @@ from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.datetime import DateTime
 from fabric.widgets.label import Label
-from fabric.widgets.scrolledwindow import ScrolledWindow
 from fabric.widgets.separator import Separator
 from gi.repository import GdkPixbuf, GLib, Gtk
 from loguru import logger
@@ -17,7 +16,7 @@ import utils.functions as helpers
 from services import notification_service
 from shared.buttons import HoverButton
 from shared.circle_image import CircleImage
-from shared.list import ListBox
+from shared.list import VirtualList
 from shared.popover import Popover
 from shared.widget_container import ButtonWidget
 from utils.colors import Colors
@@ -28,12 +27,17 @@ gi.require_versions({"Gtk": "3.0"})
 
 
 class DateMenuNotification(Box):
-    """A widget to display a notification."""
+    """A widget to display a notification.
+
+    Its widgets are built once, `bind` shows another notification in them, so
+    rows of the notification list are reused as it scrolls.
+    """
 
     def __init__(
         self,
-        id: int,
-        notification: Notification,
+        id: int | None = None,
+        notification: Notification | None = None,
+        on_removed: Callable[[int], None] | None = None,
         **kwargs,
     ):
         super().__init__(
@@ -45,30 +49,25 @@ class DateMenuNotification(Box):
             **kwargs,
         )
 
-        self._notification = notification
+        self._notification = None
         self._id = id
+        self._on_removed = on_removed
+        self._app_icon = None
 
-        header_container = Box(
-            spacing=8, orientation="h", style_classes="notification-header"
+        self._icon = get_icon(None)
+        self._summary = Label(
+            h_align="start",
+            h_expand=True,
+            line_wrap="word-char",
+            style_classes="summary",
+            style="font-size: 13.5px;",
         )
 
-        header_container.children = (
-            get_icon(notification.app_icon),
-            Label(
-                markup=helpers.parse_markup(
-                    str(
-                        self._notification.summary
-                        if self._notification.summary
-                        else notification.app_name,
-                    )
-                ),
-                h_align="start",
-                h_expand=True,
-                line_wrap="word-char",
-                style_classes="summary",
-                style="font-size: 13.5px;",
-            ),
+        self._header_container = Box(
+            spacing=8, orientation="h", style_classes="notification-header"
         )
+        self._header_container.children = (self._icon, self._summary)
+
         close_button = Button(
             style_classes="close-button",
             child=nerd_font_icon(
@@ -80,58 +79,94 @@ class DateMenuNotification(Box):
             on_clicked=self.remove_notification,
         )
 
-        header_container.pack_end(
+        self._header_container.pack_end(
             close_button,
             False,
             False,
             0,
         )
 
+        self._image = CircleImage(
+            h_expand=True,
+            v_expand=True,
+            size=constants.NOTIFICATION_IMAGE_SIZE,
+        )
+        # Only shown by `bind`, for notifications with an image
+        self._image.set_no_show_all(True)
+        self._body = Label(
+            v_align="start",
+            h_expand=True,
+            h_align="start",
+            style="font-size: 13.5px;",
+            line_wrap="word-char",
+            chars_width=20,
+            max_chars_width=45,
+        )
+
         body_container = Box(
-            spacing=15, orientation="h", style_classes="notification-body"
+            spacing=15,
+            orientation="h",
+            style_classes="notification-body",
+            children=(self._image, self._body),
+        )
+
+        # Add the header, body, and actions to the notification box
+        self.children = (
+            self._header_container,
+            body_container,
+        )
+
+        if notification is not None:
+            self.bind(notification, id)
+
+    def bind(self, notification: Notification, id: int):
+        """Show another notification, in the widgets already built."""
+        self._notification = notification
+        self._id = id
+
+        # Notifications of the same app usually share their icon
+        if notification.app_icon != self._app_icon:
+            self._app_icon = notification.app_icon
+            self._icon.destroy()
+            self._icon = get_icon(notification.app_icon)
+            self._header_container.add(self._icon)
+            self._header_container.reorder_child(self._icon, 0)
+
+        self._summary.set_markup(
+            helpers.parse_markup(
+                str(
+                    notification.summary
+                    if notification.summary
+                    else notification.app_name
+                )
+            )
         )
 
+        pixbuf = None
         try:
-            if image_pixbuf := self._notification.image_pixbuf:
-                body_container.add(
-                    CircleImage(
-                        pixbuf=image_pixbuf.scale_simple(
-                            constants.NOTIFICATION_IMAGE_SIZE,
-                            constants.NOTIFICATION_IMAGE_SIZE,
-                            GdkPixbuf.InterpType.BILINEAR,
-                        ),
-                        h_expand=True,
-                        v_expand=True,
-                        size=constants.NOTIFICATION_IMAGE_SIZE,
-                    ),
+            if image_pixbuf := notification.image_pixbuf:
+                pixbuf = image_pixbuf.scale_simple(
+                    constants.NOTIFICATION_IMAGE_SIZE,
+                    constants.NOTIFICATION_IMAGE_SIZE,
+                    GdkPixbuf.InterpType.BILINEAR,
                 )
             del image_pixbuf
         except GLib.GError:
             # If the image is not available, use the symbolic icon
             logger.warning(f"{Colors.WARNING}[Notification] Image not available.")
 
-        body_container.add(
-            Label(
-                markup=helpers.parse_markup(self._notification.body),
-                v_align="start",
-                h_expand=True,
-                h_align="start",
-                style="font-size: 13.5px;",
-                line_wrap="word-char",
-                chars_width=20,
-                max_chars_width=45,
-            ),
-        )
+        if pixbuf is not None:
+            self._image.set_image_from_pixbuf(pixbuf)
+        self._image.set_visible(pixbuf is not None)
 
-        # Add the header, body, and actions to the notification box
-        self.children = (
-            header_container,
-            body_container,
-        )
+        self._body.set_markup(helpers.parse_markup(notification.body))
 
     def remove_notification(self, *_):
         notification_service.remove_notification(self._id)
-        self.destroy()
+        if self._on_removed is not None:
+            self._on_removed(self._id)
+        else:
+            self.destroy()
 
 
 class DateNotificationMenu(Box):
@@ -155,19 +190,6 @@ class DateNotificationMenu(Box):
         if config["notification"]:
             notifications: List[Notification] = notification_service.get_deserialized()
 
-            self.notifications_listbox = ListBox(
-                name="notification-list",
-                orientation="v",
-                h_align="center",
-                spacing=8,
-                h_expand=True,
-                visible=len(notifications) > 0,
-            )
-
-            for value in notifications:
-                notification_item = self.bake_notification(value)
-                self.notifications_listbox.add(notification_item)
-
             # Placeholder for when there are no notifications
             self.placeholder = Box(
                 style_classes="placeholder",
@@ -176,7 +198,6 @@ class DateNotificationMenu(Box):
                 v_align="center",
                 v_expand=True,
                 h_expand=True,
-                visible=len(notifications) == 0,  # visible if no notifications
                 children=(
                     nerd_font_icon(
                         icon=text_icons["notifications"]["checked"],
@@ -190,6 +211,24 @@ class DateNotificationMenu(Box):
                 ),
             )
 
+            # Only the notifications in view are baked, their rows are recycled
+            self.notifications_listbox = VirtualList(
+                list_name="notification-list",
+                style_classes="notification-scrollable",
+                v_expand=True,
+                v_scrollbar_policy="automatic",
+                h_scrollbar_policy="never",
+                spacing=8,
+                row_height=100,
+                row_factory=lambda: Box(
+                    name="notification-list-item",
+                    children=DateMenuNotification(on_removed=self._remove_notification),
+                ),
+                bind_row=self.bind_notification,
+                placeholder=self.placeholder,
+            )
+            self.notifications_listbox.set_items(notifications)
+
             # Header for the notification column
             self.dnd_switch = Gtk.Switch(
                 name="notification-switch",
@@ -226,7 +265,7 @@ class DateNotificationMenu(Box):
             def handle_clear_click(*_):
                 """Handle clear button click."""
 
-                self.notifications_listbox.remove_all()
+                self.notifications_listbox.set_items([])
 
                 notification_service.clear_all_notifications()
                 self.clear_icon.set_label(text_icons["trash"]["empty"])
@@ -249,13 +288,7 @@ class DateNotificationMenu(Box):
             orientation="v",
             children=(
                 notification_column_header,
-                ScrolledWindow(
-                    v_expand=True,
-                    style_classes="notification-scrollable",
-                    v_scrollbar_policy="automatic",
-                    h_scrollbar_policy="never",
-                    child=Box(children=(self.placeholder, self.notifications_listbox)),
-                ),
+                self.notifications_listbox,
             ),
         )
         self.add(notification_column)
@@ -314,43 +347,26 @@ class DateNotificationMenu(Box):
     def on_clear_all_notifications(self, *_):
         """Handle clearing all notifications."""
         self.clear_icon.set_label(text_icons["trash"]["empty"])
-        self.placeholder.set_visible(True)
-        self.notifications_listbox.set_visible(False)
-
-    def bake_notification(self, notification):
-        """Create a notification widget from a Notification object."""
-
-        def on_child_destroyed(widget, row):
-            row.destroy()
-
-        item = DateMenuNotification(
-            notification=notification,
-            id=notification["id"],
-        )
-
-        row = Gtk.ListBoxRow(visible=True, name="notification-list-item", child=item)
-        item.connect("destroy", on_child_destroyed, row)
+        self.notifications_listbox.set_items([])
 
-        return row
+    def bind_notification(self, row, notification, index):
+        """Show a notification in a recycled row."""
+        row.get_children()[0].bind(notification, notification["id"])
 
     def on_notification_closed(self, _, id, reason):
         """Handle notification being closed."""
-
-        for child in self.notifications_listbox.get_children():
-            is_target = (
-                isinstance(child, DateMenuNotification)
-                and child._notification["id"] == id
-            )
-            if is_target:
-                if reason in ["dismissed-by-user", "dismissed-by-limit"]:
-                    self._remove_notification(child)
+        if reason in ["dismissed-by-user", "dismissed-by-limit"]:
+            self._remove_notification(id)
+
+    def _remove_notification(self, id):
+        items = self.notifications_listbox.items
+        for index, notification in enumerate(items):
+            if notification["id"] == id:
+                self.notifications_listbox.remove_item(index)
                 break
 
-    def _remove_notification(self, widget):
-        self.notifications_listbox.remove(widget)
-        widget.destroy()  # Ensure the object is freed
-
-        return False
+        if not items:
+            self.clear_icon.set_label(text_icons["trash"]["empty"])
 
     def on_new_notification(self, fabric_notification, id):
         if notification_service.dont_disturb:
@@ -364,14 +380,7 @@ class DateNotificationMenu(Box):
             text_icons["trash"]["full"],
         )
 
-        notification_item = self.bake_notification(
-            fabric_notification,
-        )
-
-        self.notifications_listbox.insert(notification_item, 0)
-
-        self.placeholder.set_visible(False)
-        self.notifications_listbox.set_visible(True)
+        self.notifications_listbox.insert_item(0, fabric_notification)
 
 
 class DateTimeWidget(ButtonWidget):
@@ -1,10 +1,10 @@
-import json
 import re
 
 from fabric.hyprland.widgets import HyprlandEvent, get_hyprland_connection
 from fabric.widgets.label import Label
 from loguru import logger
 
+from services.hyprland_ipc import HyprlandIPC
 from shared.widget_container import ButtonWidget
 from utils.constants import KBLAYOUT_MAP
 from utils.widget_utils import nerd_font_icon
@@ -55,9 +55,10 @@ class KeyboardLayoutWidget(ButtonWidget):
         )
 
     def get_keyboard(self):
-        data = json.loads(str(self.connection.send_command("j/devices").reply.decode()))
+        HyprlandIPC().query_async("j/devices", self.update_keyboard)
 
-        keyboards = data.get("keyboards", [])
+    def update_keyboard(self, data: dict | None):
+        keyboards = (data or {}).get("keyboards", [])
         if not keyboards:
             return "Unknown"
 
@@ -1,8 +1,5 @@
-import json
-
 import gi
-from fabric.hyprland.widgets import get_hyprland_connection
-from fabric.utils.helpers import bulk_connect, get_desktop_applications
+from fabric.utils.helpers import bulk_connect
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.eventbox import EventBox
@@ -10,8 +7,10 @@ from fabric.widgets.image import Image
 from fabric.widgets.label import Label
 from fabric.widgets.overlay import Overlay
 from gi.repository import Gdk, Gtk
-from loguru import logger
 
+from services.app_catalogue import AppCatalogueService
+from services.hyprland_ipc import HyprlandIPC
+from services.hyprland_state import HyprlandStateService
 from shared.popup import PopupWindow
 from shared.widget_container import ButtonWidget
 from utils.icon_resolver import IconResolver
@@ -42,45 +41,18 @@ class HyprlandWindowButton(Button):
         self.app_id = app_id
         self.title = title
         self.window: Box = window
+        # The workspace showing the button, set by the overview
+        self.workspace = None
         self.icon_resolver = IconResolver()
-        self.connection = get_hyprland_connection()
-
-        # Compute dynamic icon sizes based on the button size.
-        # Using the minimum dimension of the button for scaling.
-        icon_size_main = int(min(self.size) * 0.5)  # adjust factor as needed
+        self.ipc = HyprlandIPC()
 
         # Enhanced icon resolution using desktop apps
-        desktop_app = window.find_app(app_id)
-
-        # Get icon using improved method with fallbacks
-        icon_pixbuf = None
-        if desktop_app:
-            icon_pixbuf = desktop_app.get_icon_pixbuf(size=icon_size_main)
+        self.desktop_app = window.find_app(app_id)
 
-        if not icon_pixbuf:
-            # Fallback to IconResolver
-            icon_pixbuf = self.icon_resolver.get_icon_pixbuf(app_id, icon_size_main)
-
-        if not icon_pixbuf:
-            # Additional fallbacks for common apps
-            icon_pixbuf = self.icon_resolver.get_icon_pixbuf(
-                "application-x-executable-symbolic", icon_size_main
-            )
-            if not icon_pixbuf:
-                icon_pixbuf = self.icon_resolver.get_icon_pixbuf(
-                    "image-missing", icon_size_main
-                )
-
-        # Ensure icon is scaled to the correct size
-        if icon_pixbuf and (
-            icon_pixbuf.get_width() != icon_size_main
-            or icon_pixbuf.get_height() != icon_size_main
-        ):
-            icon_pixbuf = icon_pixbuf.scale_simple(
-                icon_size_main,
-                icon_size_main,
-                gi.repository.GdkPixbuf.InterpType.BILINEAR,
-            )
+        # Icons are sized after the button, they are only resolved again when
+        # a resize changes that size
+        self.icon_size = int(min(self.size) * 0.5)  # adjust factor as needed
+        icon_pixbuf = self.resolve_icon(self.icon_size)
 
         super().__init__(
             name="overview-client-box",
@@ -88,8 +60,8 @@ class HyprlandWindowButton(Button):
             tooltip_text=title,
             size=size,
             on_clicked=self.on_button_click,
-            on_button_press_event=lambda _, event: self.connection.send_command(
-                f"/dispatch closewindow address:{address}"
+            on_button_press_event=lambda _, event: self.ipc.dispatch(
+                f"closewindow address:{address}"
             )
             if event.button == 3
             else None,
@@ -101,9 +73,6 @@ class HyprlandWindowButton(Button):
             ),
         )
 
-        # Store the desktop_app for later use
-        self.desktop_app = desktop_app
-
         self.drag_source_set(
             start_button_mask=Gdk.ModifierType.BUTTON1_MASK,
             targets=TARGET,
@@ -118,52 +87,70 @@ class HyprlandWindowButton(Button):
             Gdk.KEY_KP_Enter,
             Gdk.KEY_space,
         ):
-            self.connection.send_command(
-                f"/dispatch closewindow address:{self.address}"
-            )
+            self.ipc.dispatch(f"closewindow address:{self.address}")
             return True
         return False
 
-    def update_image(self, image):
-        # Compute overlay icon size dynamically.
-        icon_size_overlay = int(min(self.size) * 0.5)  # adjust factor as needed
-
-        # Enhanced icon resolution for overlay
+    def resolve_icon(self, icon_size: int):
+        # Get icon using improved method with fallbacks
         icon_pixbuf = None
-        if hasattr(self, "desktop_app") and self.desktop_app:
-            icon_pixbuf = self.desktop_app.get_icon_pixbuf(size=icon_size_overlay)
+        if self.desktop_app:
+            icon_pixbuf = self.desktop_app.get_icon_pixbuf(size=icon_size)
 
         if not icon_pixbuf:
-            icon_pixbuf = self.icon_resolver.get_icon_pixbuf(
-                self.app_id, icon_size_overlay
-            )
+            # Fallback to IconResolver
+            icon_pixbuf = self.icon_resolver.get_icon_pixbuf(self.app_id, icon_size)
 
         if not icon_pixbuf:
+            # Additional fallbacks for common apps
             icon_pixbuf = self.icon_resolver.get_icon_pixbuf(
-                "application-x-executable-symbolic", icon_size_overlay
+                "application-x-executable-symbolic", icon_size
             )
             if not icon_pixbuf:
                 icon_pixbuf = self.icon_resolver.get_icon_pixbuf(
-                    "image-missing", icon_size_overlay
+                    "image-missing", icon_size
                 )
 
         # Ensure icon is scaled to the correct size
         if icon_pixbuf and (
-            icon_pixbuf.get_width() != icon_size_overlay
-            or icon_pixbuf.get_height() != icon_size_overlay
+            icon_pixbuf.get_width() != icon_size
+            or icon_pixbuf.get_height() != icon_size
         ):
             icon_pixbuf = icon_pixbuf.scale_simple(
-                icon_size_overlay,
-                icon_size_overlay,
+                icon_size,
+                icon_size,
                 gi.repository.GdkPixbuf.InterpType.BILINEAR,
             )
 
+        return icon_pixbuf
+
+    def resize(self, size, transform: int = 0):
+        """Follow the window's new size, without building the button again."""
+        self.transform = transform % 4
+        self.size = size if transform in [0, 2] else (size[1], size[0])
+        self.set_size_request(int(size[0]), int(size[1]))
+
+        icon_size = int(min(self.size) * 0.5)
+        if icon_size != self.icon_size:
+            self.icon_size = icon_size
+            self.set_image(Image(pixbuf=self.resolve_icon(icon_size)))
+
+    def update_icon(self):
+        """Resolve the icon again, as when desktop files were read or changed."""
+        self.desktop_app = self.window.find_app(self.app_id)
+        self.set_image(Image(pixbuf=self.resolve_icon(self.icon_size)))
+
+    def set_title(self, title: str):
+        self.title = title
+        self.set_tooltip_text(title)
+
+    def update_image(self, image):
         self.set_image(
             Overlay(
                 child=image,
                 overlays=Image(
                     name="overview-icon",
-                    pixbuf=icon_pixbuf,
+                    pixbuf=self.resolve_icon(self.icon_size),
                     h_align="center",
                     v_align="end",
                     tooltip_text=self.title,
@@ -172,41 +159,41 @@ class HyprlandWindowButton(Button):
         )
 
     def on_button_click(self, *_):
-        self.connection.send_command(f"/dispatch focuswindow address:{self.address}")
+        self.ipc.dispatch(f"focuswindow address:{self.address}")
 
 
 class WorkspaceEventBox(EventBox):
     """A widget to show a workspace in the overview."""
 
-    def __init__(self, workspace_id: int, fixed: Gtk.Fixed | None = None):
-        self.fixed = fixed
+    def __init__(self, workspace_id: int):
+        # Window buttons are added and moved in place as windows change
+        self.fixed = Gtk.Fixed.new()
+        self.placeholder = Label(
+            name="overview-add-label",
+            h_expand=True,
+            v_expand=True,
+            markup="+",
+        )
 
         screen = Gdk.Screen.get_default()
         current_width = screen.get_width()
         current_height = screen.get_height()
 
-        self.connection = get_hyprland_connection()
+        self.ipc = HyprlandIPC()
 
         super().__init__(
             name="overview-workspace-bg",
             h_expand=True,
             v_expand=True,
             size=(int(current_width * SCALE), int(current_height * SCALE)),
-            child=fixed
-            if fixed
-            else Label(
-                name="overview-add-label",
-                h_expand=True,
-                v_expand=True,
-                markup="+",
-            ),
+            child=self.placeholder,
             on_drag_data_received=lambda _w,
             _c,
             _x,
             _y,
             data,
-            *_: self.connection.send_command(
-                f"/dispatch movetoworkspacesilent {workspace_id},address:{data.get_data().decode()}"  # noqa: E501
+            *_: self.ipc.dispatch(
+                f"movetoworkspacesilent {workspace_id},address:{data.get_data().decode()}"  # noqa: E501
             ),
         )
         self.drag_dest_set(
@@ -214,8 +201,26 @@ class WorkspaceEventBox(EventBox):
             TARGET,
             Gdk.DragAction.COPY,
         )
-        if fixed:
-            fixed.show_all()
+
+    def add_window(self, button: HyprlandWindowButton, x: float, y: float):
+        self.fixed.put(button, x, y)
+        button.show_all()
+        self._update_child()
+
+    def move_window(self, button: HyprlandWindowButton, x: float, y: float):
+        self.fixed.move(button, x, y)
+
+    def remove_window(self, button: HyprlandWindowButton):
+        self.fixed.remove(button)
+        self._update_child()
+
+    def _update_child(self):
+        # Empty workspaces show a "+" to drop windows on
+        child = self.fixed if self.fixed.get_children() else self.placeholder
+        if self.get_child() is not child:
+            self.remove(self.get_child())
+            self.add(child)
+            child.show_all()
 
 
 class OverviewMenu(Box):
@@ -224,172 +229,23 @@ class OverviewMenu(Box):
     def __init__(self, **kwargs):
         # Initialize as a Box instead of a PopupWindow.
         super().__init__(name="overview-menu", orientation="v", spacing=8, **kwargs)
-        self.workspace_boxes: dict[int, Box] = {}
+        self.workspace_boxes: dict[int, WorkspaceEventBox] = {}
         self.clients: dict[str, HyprlandWindowButton] = {}
 
-        self.connection = get_hyprland_connection()
-
-        # Initialize app registry for better icon resolution
-        self._all_apps = get_desktop_applications()
-        self.app_identifiers = self._build_app_identifiers_map()
-
-        # Remove the window_class_aliases dictionary completely
-
-        bulk_connect(
-            self.connection,
-            {
-                "event::openwindow": self.do_update,
-                "event::closewindow": self.do_update,
-                "event::movewindow": self.do_update,
-            },
-        )
-
-        self.update()
-
-    def _normalize_window_class(self, class_name):
-        """Normalize window class by removing common suffixes and lowercase."""
-        if not class_name:
-            return ""
-
-        normalized = class_name.lower()
-
-        # Remove common suffixes
-        suffixes = [".bin", ".exe", ".so", "-bin", "-gtk"]
-        for suffix in suffixes:
-            if normalized.endswith(suffix):
-                normalized = normalized[: -len(suffix)]
-
-        return normalized
-
-    def _classes_match(self, class1, class2):
-        """Check if two window class names match with stricter comparison."""
-        if not class1 or not class2:
-            return False
-
-        # Normalize both classes
-        norm1 = self._normalize_window_class(class1)
-        norm2 = self._normalize_window_class(class2)
-
-        # Direct match after normalization
-        return norm1 == norm2
-
-        # Don't do substring matching as it's too error-prone
-        # This avoids incorrectly matching flatpak apps and others
-        return False
-
-    def _build_app_identifiers_map(self):
-        """Build a mapping of app identifiers (class names, executables, names) to
-        DesktopApp objects"""
-
-        identifiers = {}
-        for app in self._all_apps:
-            # Map by name (lowercase)
-            if app.name:
-                identifiers[app.name.lower()] = app
-
-            # Map by display name
-            if app.display_name:
-                identifiers[app.display_name.lower()] = app
+        self.state = HyprlandStateService()
 
-            # Map by window class if available
-            if app.window_class:
-                identifiers[app.window_class.lower()] = app
+        # Shared app registry for better icon resolution. The resolver drops
+        # the icons it could not find when the desktop files change, before
+        # the buttons ask again
+        IconResolver()
+        self.catalogue = AppCatalogueService()
+        self.catalogue.connect("changed", self.update_icons)
 
-            # Map by executable name if available
-            if app.executable:
-                exe_basename = app.executable.split("/")[-1].lower()
-                identifiers[exe_basename] = app
-
-            # Map by command line if available (without parameters)
-            if app.command_line:
-                cmd_base = app.command_line.split()[0].split("/")[-1].lower()
-                identifiers[cmd_base] = app
-
-        return identifiers
-
-    def find_app(self, app_identifier):
-        """Return the DesktopApp object by matching any app identifier."""
-        if not app_identifier:
-            return None
-
-        # Try direct lookup in our identifiers map
-        normalized_id = str(app_identifier).lower()
-        if normalized_id in self.app_identifiers:
-            return self.app_identifiers[normalized_id]
-
-        # Try with normalized class name
-        norm_id = self._normalize_window_class(normalized_id)
-        if norm_id in self.app_identifiers:
-            return self.app_identifiers[norm_id]
-
-        # More targeted matching with exact names only
-        for app in self._all_apps:
-            if app.name and app.name.lower() == normalized_id:
-                return app
-            if app.window_class and app.window_class.lower() == normalized_id:
-                return app
-            if app.display_name and app.display_name.lower() == normalized_id:
-                return app
-            # Try with executable basename
-            if app.executable:
-                exe_base = app.executable.split("/")[-1].lower()
-                if exe_base == normalized_id:
-                    return app
-            # Try with command basename
-            if app.command_line:
-                cmd_base = app.command_line.split()[0].split("/")[-1].lower()
-                if cmd_base == normalized_id:
-                    return app
-
-        return None
-
-    def update(self, signal_update=False):
-        # Refresh app registry when updating to ensure latest data
-        self._all_apps = get_desktop_applications()
-        self.app_identifiers = self._build_app_identifiers_map()
-
-        # Remove old clients and workspaces.
-        for client in self.clients.values():
-            client.destroy()
-        self.clients.clear()
-
-        for workspace in self.workspace_boxes.values():
-            workspace.destroy()
-        self.workspace_boxes.clear()
-
-        # Create two rows in this Box.
+        # Create two rows in this Box, workspaces are laid out once
         self.children = [Box(spacing=8), Box(spacing=8)]
 
-        monitors = {
-            monitor["id"]: (monitor["x"], monitor["y"], monitor["transform"])
-            for monitor in json.loads(
-                self.connection.send_command("j/monitors").reply.decode()
-            )
-        }
-
-        for client in json.loads(
-            str(self.connection.send_command("j/clients").reply.decode())
-        ):
-            # Exclude special workspaces.
-            if client["workspace"]["id"] > 0:
-                self.clients[client["address"]] = HyprlandWindowButton(
-                    window=self,
-                    title=client["title"],
-                    address=client["address"],
-                    app_id=client["initialClass"],
-                    size=(client["size"][0] * SCALE, client["size"][1] * SCALE),
-                    transform=monitors[client["monitor"]][2],
-                )
-                if client["workspace"]["id"] not in self.workspace_boxes:
-                    self.workspace_boxes[client["workspace"]["id"]] = Gtk.Fixed.new()
-                self.workspace_boxes[client["workspace"]["id"]].put(
-                    self.clients[client["address"]],
-                    abs(client["at"][0] - monitors[client["monitor"]][0]) * SCALE,
-                    abs(client["at"][1] - monitors[client["monitor"]][1]) * SCALE,
-                )
-
-        # Lay out workspaces into two rows.
         for w_id in range(1, 11):
+            self.workspace_boxes[w_id] = WorkspaceEventBox(w_id)
             overview_row = self.children[0] if w_id <= 5 else self.children[1]
             overview_row.add(
                 Box(
@@ -399,17 +255,93 @@ class OverviewMenu(Box):
                         Label(
                             name="overview-workspace-label", label=f"Workspace {w_id}"
                         ),
-                        WorkspaceEventBox(
-                            w_id,
-                            self.workspace_boxes.get(w_id, None),
-                        ),
+                        self.workspace_boxes[w_id],
                     ],
                 )
             )
 
-    def do_update(self, *_):
-        logger.info(f"[Overview] Updating for :{_[1].name}")
-        self.update(signal_update=True)
+        # Only the buttons of windows named by the events are updated
+        bulk_connect(
+            self.state,
+            {
+                "client-added": self.update_client,
+                "client-moved": self.update_client,
+                "client-changed": self.update_title,
+                "client-removed": self.remove_client,
+                "monitors-changed": self.update,
+            },
+        )
+
+        self.update()
+
+    def find_app(self, app_identifier):
+        """Return the DesktopApp object by matching any app identifier."""
+        # Exact names only, substring matching picks wrong apps for flatpaks
+        return self.catalogue.find(app_identifier, fuzzy=False)
+
+    def update(self, *_):
+        """Place the buttons of all windows, as when monitors have changed."""
+        for address in self.clients.keys() - self.state.clients.keys():
+            self.remove_client(None, address)
+
+        for address in self.state.clients:
+            self.update_client(None, address)
+
+    def update_client(self, _, address: str):
+        client = self.state.clients.get(address)
+        # Special workspaces are excluded
+        workspace = (
+            self.workspace_boxes.get(client["workspace"]["id"]) if client else None
+        )
+        if workspace is None:
+            self.remove_client(None, address)
+            return
+
+        monitor = self.state.monitors.get(client["monitor"], {})
+        transform = monitor.get("transform", 0)
+        size = (client["size"][0] * SCALE, client["size"][1] * SCALE)
+        x = abs(client["at"][0] - monitor.get("x", 0)) * SCALE
+        y = abs(client["at"][1] - monitor.get("y", 0)) * SCALE
+
+        button = self.clients.get(address)
+        if button is None:
+            button = self.clients[address] = HyprlandWindowButton(
+                window=self,
+                title=client["title"],
+                address=address,
+                app_id=client["initialClass"],
+                size=size,
+                transform=transform,
+            )
+        else:
+            button.resize(size, transform)
+
+        if button.workspace is workspace:
+            workspace.move_window(button, x, y)
+        else:
+            if button.workspace is not None:
+                button.workspace.remove_window(button)
+            workspace.add_window(button, x, y)
+            button.workspace = workspace
+
+    def update_icons(self, *_):
+        for button in self.clients.values():
+            button.update_icon()
+
+    def update_title(self, _, address: str):
+        button = self.clients.get(address)
+        client = self.state.clients.get(address)
+        if button is not None and client is not None:
+            button.set_title(client["title"])
+
+    def remove_client(self, _, address: str):
+        button = self.clients.pop(address, None)
+        if button is None:
+            return
+
+        if button.workspace is not None:
+            button.workspace.remove_window(button)
+        button.destroy()
 
 
 class OverviewWidget(ButtonWidget):
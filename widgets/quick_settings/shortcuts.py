@@ -1,10 +1,8 @@
-import subprocess
-
 from fabric.widgets.box import Box
 from fabric.widgets.grid import Grid
 from fabric.widgets.label import Label
-from loguru import logger
 
+from services.hyprland_ipc import HyprlandIPC
 from shared.buttons import HoverButton
 from utils.widget_utils import nerd_font_icon
 
@@ -47,10 +45,7 @@ class ShortcutButton(HoverButton):
 
     def on_clicked(self, *_):
         """Execute the command when clicked."""
-        try:
-            subprocess.Popen(["hyprctl", "dispatch", "exec", self.command])
-        except Exception as e:
-            logger.exception(f"Error executing shortcut command: {e}")
+        HyprlandIPC().dispatch(f"exec {self.command}")
 
 
 class ShortcutsContainer(Box):
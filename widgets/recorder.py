@@ -46,6 +46,7 @@ class RecorderWidget(ButtonWidget):
                     f"{get_relative_path('../assets/icons/')}/recording.json",
                 ),
                 scale=0.30,
+                cache_frames=True,
                 h_align="center",
                 v_align="center",
             )
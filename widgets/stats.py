@@ -1,18 +1,15 @@
-import json
-
-from fabric.utils import exec_shell_command, exec_shell_command_async
+from fabric.utils import exec_shell_command_async
 from fabric.widgets.circularprogressbar import CircularProgressBar
 from fabric.widgets.label import Label
 from fabric.widgets.overlay import Overlay
 
 import utils.functions as helpers
-from services.networkspeed import NetworkSpeed
+from services.system_stats import SystemStatsService
 from shared.widget_container import ButtonWidget
 from utils.icons import text_icons
 from utils.widget_utils import (
     get_bar_graph,
     nerd_font_icon,
-    util_fabricator,
 )
 
 
@@ -81,17 +78,29 @@ class CpuWidget(ButtonWidget):
             )
             self.box.children = (self.icon, self.cpu_level_label)
 
-        # Set up a fabricator to call the update_label method when the CPU usage changes
-        util_fabricator.connect("changed", self.update_ui)
+        self.cpu_name = ""
+        self.frequency = None
+        self.temperature = None
+
+        # Only sample what this widget shows, the tooltip stats are slower
+        stats_service = SystemStatsService()
+        stats_service.subscribe("cpu_usage", self.update_ui, widget=self)
+
+        if self.config.get("tooltip", False):
+            stats_service.subscribe("cpu_freq", self.set_frequency, widget=self)
+            stats_service.subscribe("temperature", self.set_temperature, widget=self)
 
     def set_cpu_name(self, cpu_name):
         self.cpu_name = cpu_name.strip()
 
-    def update_ui(self, _, value: dict):
-        # Update the label with the current CPU usage if enabled
-        frequency = value.get("cpu_freq")
-        usage = value.get("cpu_usage")
+    def set_frequency(self, frequency):
+        self.frequency = frequency
 
+    def set_temperature(self, temperature: dict):
+        self.temperature = temperature
+
+    def update_ui(self, usage: float):
+        # Update the label with the current CPU usage if enabled
         if self.current_mode == "graph":
             self.graph_values.append(get_bar_graph(usage))
 
@@ -108,15 +117,16 @@ class CpuWidget(ButtonWidget):
 
         # Update the tooltip with the memory usage details if enabled
         if self.config.get("tooltip", False):
-            temp = value.get("temperature")
+            if self.temperature is None or self.frequency is None:
+                return True
 
-            temp = temp.get(self.config["sensor"])
+            temp = self.temperature.get(self.config["sensor"])
 
-            if temp is None:
+            if not temp:
                 return "N/A"
 
             # current temperature
-            temp = temp.pop()[1]
+            temp = temp[-1][1]
 
             temp = round(temp) if self.config.get("round", True) else temp
 
@@ -132,7 +142,7 @@ class CpuWidget(ButtonWidget):
                 f"{self.cpu_name}\n"
                 f" Temperature: {temp}\n"
                 f"󰾆 Utilization: {usage}\n"
-                f" Clock Speed: {round(frequency[0], 2)} MHz"
+                f" Clock Speed: {round(self.frequency[0], 2)} MHz"
             )
 
             self.set_tooltip_text(tooltip_text)
@@ -200,22 +210,12 @@ class GpuWidget(ButtonWidget):
             )
             self.box.children = (self.icon, self.gpu_level_label)
 
-        # Set up a fabricator to call the update_label method when the CPU usage changes
-        util_fabricator.connect("changed", self.update_ui)
+        # Sampled off the main loop and shared by the GPU widgets of every monitor
+        SystemStatsService().subscribe("gpu", self.update_ui, widget=self)
 
-    def update_ui(self, *_):
+    def update_ui(self, stats: dict):
         # Update the label with the current GPU usage if enabled
-
-        value = exec_shell_command("nvtop -s")
-
-        stats = json.loads(value.strip("\n"))
-
-        if type(stats) is list:
-            stats = stats[0]
-
-        frequency = stats.get("gpu_clock", "0MHz")
-        usage = stats.get("mem_util", "0").strip("%")
-        gpu_name = stats.get("device_name", "N/A")
+        usage = stats["usage"]
 
         if self.current_mode == "graph":
             self.graph_values.append(get_bar_graph(usage))
@@ -226,23 +226,21 @@ class GpuWidget(ButtonWidget):
             self.gpu_level_label.set_label("".join(self.graph_values))
 
         elif self.current_mode == "progress":
-            self.progress_bar.set_value(usage)
+            self.progress_bar.set_value(usage / 100.0)
 
         else:
-            self.gpu_level_label.set_label(usage)
+            self.gpu_level_label.set_label(f"{usage}%")
 
         # Update the tooltip with the memory usage details if enabled
         if self.config.get("tooltip", False):
-            temp = stats.get("temp")
-
-            if temp is None:
-                return "N/A"
+            temp = stats["temperature"]
+            frequency = stats["frequency"]
 
             tooltip_text = (
-                f"{gpu_name}\n"
-                f" Temperature: {temp}\n"
-                f"󰾆 Utilization: {usage}\n"
-                f" Clock Speed: {frequency}"
+                f"{stats['name']}\n"
+                f" Temperature: {'N/A' if temp is None else f'{temp} °C'}\n"
+                f"󰾆 Utilization: {usage}%\n"
+                f" Clock Speed: {'N/A' if frequency is None else f'{frequency} MHz'}"
             )
 
             self.set_tooltip_text(tooltip_text)
@@ -310,12 +308,11 @@ class MemoryWidget(ButtonWidget):
             )
             self.box.children = (self.icon, self.memory_level_label)
 
-        # Set up a fabricator to call the update_label method  at specified intervals
-        util_fabricator.connect("changed", self.update_ui)
+        # Sample the memory usage only while this widget is subscribed
+        SystemStatsService().subscribe("memory", self.update_ui, widget=self)
 
-    def update_ui(self, _, value: dict):
+    def update_ui(self, memory):
         # Get the current memory usage
-        memory = value.get("memory")
         self.used_memory = memory.used
         self.total_memory = memory.total
         self.percent_used = memory.percent
@@ -415,12 +412,12 @@ class StorageWidget(ButtonWidget):
 
             self.box.children = (self.icon, self.storage_level_label)
 
-        # Set up a fabricator to call the update_label method at specified intervals
-        util_fabricator.connect("changed", self.update_ui)
+        # Sample the disk usage only while this widget is subscribed
+        SystemStatsService().subscribe("disk", self.update_ui, widget=self)
 
-    def update_ui(self, _, value: dict):
+    def update_ui(self, disk):
         # Get the current disk usage
-        self.disk = value.get("disk")
+        self.disk = disk
         percent = self.disk.percent
 
         if self.current_mode == "graph":
@@ -503,17 +500,12 @@ class NetworkUsageWidget(ButtonWidget):
             self.download_label,
         )
 
-        self.client = NetworkSpeed()
+        # One reading is shared by every bar, so the counters are not reset per widget
+        SystemStatsService().subscribe("network", self.update_ui, widget=self)
 
-        # Set up a fabricator to call the update_label method at specified intervals
-        util_fabricator.connect("changed", self.update_ui)
-
-    def update_ui(self, *_):
+    def update_ui(self, network_speed: dict):
         """Update the network usage label with the current network usage."""
 
-        # Get the current network usage
-        network_speed = self.client.get_network_speed()
-
         if self.config.get("tooltip", False):
             tooltip_text = (
                 f"Download: {round(network_speed.get('download', 0), 2)} MB/s\n"
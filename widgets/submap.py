@@ -2,6 +2,7 @@ from fabric.hyprland.widgets import get_hyprland_connection
 from fabric.widgets.label import Label
 from loguru import logger
 
+from services.hyprland_ipc import HyprlandIPC
 from shared.widget_container import ButtonWidget
 from utils.widget_utils import nerd_font_icon
 
@@ -39,7 +40,13 @@ class SubMapWidget(ButtonWidget):
         )
 
     def get_submap(self, *_):
-        submap = str(self.connection.send_command("submap").reply.decode()).strip("\n")
+        HyprlandIPC().request_async("submap", self.update_submap)
+
+    def update_submap(self, reply: str | None):
+        if reply is None:
+            return
+
+        submap = reply.strip("\n")
 
         if submap == "unknown request":
             submap = "default"
@@ -1,17 +1,16 @@
-import json
-import os
 from typing import TypedDict
 
 import gi
 from fabric.hyprland.widgets import get_hyprland_connection
-from fabric.utils import exec_shell_command_async
 from fabric.widgets.image import Image
-from gi.repository import GdkPixbuf, GLib, Gtk
-from loguru import logger
+from gi.repository import GLib
 
+from services.app_catalogue import AppCatalogueService
+from services.hyprland_ipc import HyprlandIPC
+from services.hyprland_state import HyprlandStateService
 from shared.buttons import HoverButton
 from shared.widget_container import ButtonWidget
-from utils.colors import Colors
+from utils.icon_resolver import IconResolver
 
 gi.require_versions({"Gtk": "3.0"})
 
@@ -36,130 +35,96 @@ class TaskBarWidget(ButtonWidget):
             **kwargs,
         )
         self.connection = get_hyprland_connection()
+        self.state = HyprlandStateService()
+        self.icon_resolver = IconResolver()
+        self.ipc = HyprlandIPC()
 
-        self.icon_theme = Gtk.IconTheme.get_default()
+        # Buttons by window address, only those of changed windows are updated
+        self._buttons: dict[str, HoverButton] = {}
 
         if self.connection.ready:
             self.render_with_delay()
         else:
             self.connection.connect("event::ready", self.render_with_delay)
 
-        for event in (
-            "activewindow",
-            "openwindow",
-            "closewindow",
-            "changefloatingmode",
-        ):
-            self.connection.connect("event::" + event, self.render)
+        self.state.connect("client-added", self.update_client)
+        self.state.connect("client-changed", self.update_client)
+        self.state.connect("client-removed", self.remove_client)
+
+        # Windows listed before the desktop files were read get their icon then
+        AppCatalogueService().connect("changed", self.update_icons)
 
     def render_with_delay(self, *_):
         GLib.timeout_add(100, self.render)
 
     def render(self, *_):
-        self.box.children = []
-
-        clients = self.fetch_clients()
-        active_window_address = self.get_active_window_address()
-
-        visible_clients = [
-            client for client in clients if client["mapped"] and not client["hidden"]
-        ]
-
-        if visible_clients:
-            for client in visible_clients:
-                window_class = client["initialClass"].lower()
-                icon = self.bake_window_icon(window_class)
+        for button in self._buttons.values():
+            button.destroy()
+        self._buttons.clear()
+
+        for client in self.fetch_clients():
+            self.update_client(None, client["address"])
+
+        self.set_visible(bool(self._buttons))
+        return False
+
+    def update_client(self, _, address: str):
+        client = self.state.clients.get(address)
+        button = self._buttons.get(address)
+
+        if client is None or not client["mapped"] or client["hidden"]:
+            self.remove_client(None, address)
+            return
+
+        if button is None:
+            button = self._buttons[address] = self.bake_button(client)
+            self.box.add(button)
+            # Keep the buttons in the order windows are listed
+            position = [
+                other["address"]
+                for other in self.fetch_clients()
+                if other["address"] in self._buttons
+            ].index(address)
+            self.box.reorder_child(button, position)
+            button.show_all()
+            self.set_visible(True)
 
-                button = HoverButton(
-                    image=icon,
-                )
-                if self.config.get("tooltip", False):
-                    button.set_tooltip_text(client["title"])
+        if self.config.get("tooltip", False):
+            button.set_tooltip_text(client["title"])
 
-                if client["address"] != active_window_address:
-                    button.connect(
-                        "button-press-event",
-                        self.on_icon_click,
-                        client["address"],
-                    )
+    def update_icons(self, *_):
+        for address, button in self._buttons.items():
+            client = self.state.clients.get(address)
+            if client is not None:
+                button.set_image(self.bake_window_icon(client["initialClass"].lower()))
 
-                self.box.add(button)
+    def remove_client(self, _, address: str):
+        if (button := self._buttons.pop(address, None)) is not None:
+            button.destroy()
+            self.set_visible(bool(self._buttons))
 
-            self.set_visible(True)
-            self.show_all()
-        else:
-            self.set_visible(False)
+    def bake_button(self, client: PagerClient) -> HoverButton:
+        window_class = client["initialClass"].lower()
+        button = HoverButton(image=self.bake_window_icon(window_class))
+        button.connect("button-press-event", self.on_icon_click, client["address"])
+        return button
 
     def get_active_window_address(self) -> str:
-        # Fetch the address of the currently active window
-        active_window_info = json.loads(
-            self.connection.send_command("j/activewindow").reply.decode(),
-        )
-        return active_window_info.get("address", "")
+        return self.state.active_address
 
     def on_icon_click(self, widget, event, address):
-        exec_shell_command_async(
-            f"hyprctl dispatch focuswindow address:{address}", lambda *_: None
-        )
+        if address == self.get_active_window_address():
+            return
+        self.ipc.dispatch(f"focuswindow address:{address}")
 
     def fetch_clients(self) -> list[PagerClient]:
-        return json.loads(self.connection.send_command("j/clients").reply.decode())
-
-    def bake_window_icon(
-        self,
-        window_class: str,
-        fallback_icon: str = "image-missing",
-    ) -> Image:
-        icon_name = self.get_icon_from_desktop_entry(window_class)
-
-        if icon_name:
-            pixbuf = self.load_icon(icon_name)
-        else:
-            pixbuf = self.load_icon(window_class, fallback_icon)
-
-        return Image(pixbuf=pixbuf)
-
-    def get_icon_from_desktop_entry(self, window_class: str) -> str:
-        for data_dir in GLib.get_system_data_dirs():
-            applications_dir = os.path.join(data_dir, "applications")
-
-            if os.path.isdir(applications_dir):
-                for desktop_file in os.listdir(applications_dir):
-                    if desktop_file.endswith(".desktop"):
-                        file_path = os.path.join(applications_dir, desktop_file)
-                        try:
-                            with open(file_path) as f:
-                                app_name = None
-                                icon_name = None
-                                for line in f:
-                                    if line.startswith("Name="):
-                                        app_name = line.split("=", 2)[1].strip().lower()
-                                    elif line.startswith("Icon=") and app_name:
-                                        icon_name = line.split("=", 2)[1].strip()
-                                        if window_class in app_name:
-                                            return icon_name
-                        except Exception as e:
-                            logger.exception(
-                                f"{Colors.ERROR}Error reading {file_path}: {e}"
-                            )
-        return None
-
-    def load_icon(
-        self,
-        icon_name: str,
-        fallback_icon: str = "image-missing",
-    ) -> GdkPixbuf.Pixbuf:
-        icon_size = self.config.get("icon_size", 22)
-        try:
-            pixbuf = self.icon_theme.load_icon(
-                icon_name,
-                icon_size,
-                Gtk.IconLookupFlags.FORCE_SIZE,
-            )
-        except Exception:
-            pixbuf = self.icon_theme.load_icon(
-                fallback_icon,
-                icon_size,
-                Gtk.IconLookupFlags.FORCE_SIZE,
+        return list(self.state.clients.values())
+
+    def bake_window_icon(self, window_class: str) -> Image:
+        # Window classes are resolved once through the desktop file index, and
+        # pixbufs are shared by size
+        return Image(
+            pixbuf=self.icon_resolver.get_icon_pixbuf(
+                window_class, self.config.get("icon_size", 22)
             )
-        return pixbuf
+        )
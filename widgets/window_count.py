@@ -1,10 +1,9 @@
-import json
-
 from fabric.hyprland.widgets import get_hyprland_connection
 from fabric.utils import bulk_connect
 from fabric.widgets.label import Label
 from loguru import logger
 
+from services.hyprland_state import HyprlandStateService
 from shared.widget_container import ButtonWidget
 from utils.widget_utils import nerd_font_icon
 
@@ -16,6 +15,7 @@ class WindowCountWidget(ButtonWidget):
         super().__init__(name="window_count", **kwargs)
 
         self.connection = get_hyprland_connection()
+        self.state = HyprlandStateService()
 
         self.count_label = Label(label="0", style_classes="panel-text")
         self.box.add(self.count_label)
@@ -28,13 +28,12 @@ class WindowCountWidget(ButtonWidget):
             self.box.add(self.icon)
 
         bulk_connect(
-            self.connection,
+            self.state,
             {
-                "event::workspace": self.get_window_count,
-                "event::focusedmon": self.get_window_count,
-                "event::openwindow": self.get_window_count,
-                "event::closewindow": self.get_window_count,
-                "event::movewindow": self.get_window_count,
+                "workspace-changed": self.get_window_count,
+                "client-added": self.get_window_count,
+                "client-removed": self.get_window_count,
+                "client-moved": self.get_window_count,
             },
         )
 
@@ -51,21 +50,15 @@ class WindowCountWidget(ButtonWidget):
 
     def get_window_count(self, *_):
         """Get the number of windows in the active workspace."""
-        try:
-            response = self.connection.send_command("j/activeworkspace").reply.decode()
-            data = json.loads(response)
-        except Exception as e:
-            logger.error(f"[WindowCount] Failed to get active workspace: {e}")
-            return
-
-        count = data.get("windows", 0)
+        workspace_id = self.state.active_workspace
+        count = len(self.state.workspace_clients(workspace_id))
         label_format = self.config.get("label_format", "[{count}]")
         self.count_label.set_label(label_format.format(count=count))
 
         if self.config.get("tooltip", False):
-            self.set_tooltip_text(f"Workspace: {data.get('id')}, Windows: {count}")
+            self.set_tooltip_text(f"Workspace: {workspace_id}, Windows: {count}")
 
         if self.config.get("hide_when_zero", False):
             self.set_visible(count != 0)
 
-        logger.info(f"[WindowCount] Workspace: {data.get('id')} | Windows: {count}")
+        logger.info(f"[WindowCount] Workspace: {workspace_id} | Windows: {count}")